@@ -4,10 +4,31 @@ reduce library import overflow.
 
 # Specific dependency imports
 from time import sleep
-from random import random, choice
-from math import sqrt
+from random import random, choice, seed, getstate, setstate
+from math import sqrt, asin, sin, pi, erfc, exp, isfinite
+from itertools import count, chain, compress
+from operator import attrgetter
+from copy import copy
+from multiprocessing import shared_memory
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread, Event
 
 # General dependency imports
 import os
+import sys
 import json
+import pickle
+import mmap
+import struct
+import time
+import timeit
+import tempfile
+import multiprocessing
 import pandas
+import numpy
+
+# Optional dependency imports
+try:
+    import numba
+except ImportError:
+    numba = None
@@ -0,0 +1,323 @@
+"""Balance-regression harness comparing two versions of the item catalogs.
+
+The same seeded batch of headless tournaments is run against both catalog
+directories, split across worker processes, and every item's pick rate, win
+rate, and average damage are compared between the two versions. Changes are
+reported when a two-sided test is significant after a Bonferroni correction
+for the number of comparisons made.
+
+Run this module directly to compare two catalog directories:
+
+    python -m assessment.balance OLD_DIR NEW_DIR [TOURNAMENTS]
+
+### Classes
+----
+ItemRecorder()
+    arena listener counting picks, wins, and damage for every item
+
+### Functions
+----
+run_tournaments(directory : str, seeds : list, knights : int, max_fights : int) -> ItemRecorder
+    runs one headless tournament per seed with the catalogs of a directory
+compare_catalogs(old_dir : str, new_dir : str, tournaments : int, knights : int, processes : int, alpha : float) -> list
+    significant changes in item pick rate, win rate, and average damage
+report(changes : list) -> str
+    fixed-width table of changes
+
+### Parameters:
+----
+max_level
+    arena level at which a tournament ends, as in the main game
+metrics
+    metrics compared for every item
+"""
+
+# Import dependencies
+from assessment import os, sys, seed, sqrt, erfc, multiprocessing
+from assessment import classes
+from assessment.stats import RunningStats
+
+max_level = 8
+metrics = ['pick_rate', 'win_rate', 'damage']
+
+
+class ItemRecorder():
+    """Arena listener counting picks, wins, and damage for every item.
+
+    Items are identified by (item_type, name). A pick is a duel fought with
+    the item equipped, a win is a knockout won with the item equipped, and
+    damage is the damage dealt per attack for weapons and the damage taken per
+    attack for shields and armours.
+
+    ### Attributes:
+    ----
+    items : dict
+        picks, wins, and damage RunningStats for each item
+    slots : int
+        number of loadouts which fought a duel, twice the number of duels
+
+    ### Methods:
+    ----
+    merge(other: ItemRecorder)
+        adds the counts of another recorder
+    """
+
+    def __init__(self):
+        self.items = {}
+        self.slots = 0
+        self._loadouts = {}
+
+    def _item(self, item_type: str, item) -> dict:
+        """Counters for an item."""
+
+        key = (item_type, item.name)
+        if key not in self.items:
+            self.items[key] = {'picks': 0, 'wins': 0, 'damage': RunningStats()}
+
+        return self.items[key]
+
+    def __call__(self, event: str, data: dict):
+        if event == 'exchange':
+            # Loadouts are taken at the first exchange since winners are
+            # re-equipped on knockout
+            for knight in (data['attacker'], data['defender']):
+                if knight not in self._loadouts:
+                    self._loadouts[knight] = dict(knight.equipped)
+
+            attacker = self._loadouts[data['attacker']]
+            defender = self._loadouts[data['defender']]
+            self._item('weapons', attacker['weapons'])['damage'].add(data['damage'])
+            for item_type in ('shields', 'armours'):
+                self._item(item_type, defender[item_type])['damage'].add(data['damage'])
+
+        elif event == 'knockout':
+            # Fights resolved without any exchange (see Arena.predict() and
+            # rounds.py) take the loadouts before the winner is re-equipped
+            for knight in (data['winner'], data['loser']):
+                if knight not in self._loadouts:
+                    self._loadouts[knight] = dict(knight.equipped)
+
+            for item_type, item in self._loadouts[data['winner']].items():
+                self._item(item_type, item)['wins'] += 1
+
+        elif event == 'duel':
+            for knight in (data['player'], data['opponent']):
+                loadout = self._loadouts.pop(knight, None)
+                if loadout is None:
+                    loadout = dict(knight.equipped)
+
+                self.slots += 1
+                for item_type, item in loadout.items():
+                    self._item(item_type, item)['picks'] += 1
+
+    def merge(self, other):
+        """Adds the counts of another recorder.
+
+        ### Parameters:
+        ----
+        other : ItemRecorder
+            recorder to be merged in
+        """
+
+        self.slots += other.slots
+        for key, counts in other.items.items():
+            if key not in self.items:
+                self.items[key] = {'picks': 0, 'wins': 0, 'damage': RunningStats()}
+            self.items[key]['picks'] += counts['picks']
+            self.items[key]['wins'] += counts['wins']
+            self.items[key]['damage'].merge(counts['damage'])
+
+
+def run_tournaments(directory: str, seeds: list, knights: int = 8, max_fights: int = 100) -> ItemRecorder:
+    """Runs one headless tournament per seed with the catalogs of a directory.
+
+    ### Parameters:
+    ----
+    directory : str
+        directory holding the catalogs
+    seeds : list
+        random seed of each tournament
+    knights : int
+        number of knights in each tournament
+    max_fights : int
+        fights after which a tournament ends if max_level is not reached
+
+    ### Returns:
+    ----
+    ItemRecorder
+        counts for every item across the tournaments
+    """
+
+    classes.use_catalogs(directory)
+    recorder = ItemRecorder()
+    for tournament_seed in seeds:
+        seed(tournament_seed)
+        arena = classes.Arena()
+        for num in range(knights):
+            arena.add_knight(f'Knight {num}')
+        arena.add_listener(recorder)
+
+        fights = 0
+        while arena.level < max_level and fights < max_fights:
+            arena.fight(display=False)
+            fights += 1
+
+    return recorder
+
+def _run_batch(task: tuple) -> ItemRecorder:
+    """Runs a batch of tournaments in a worker process."""
+
+    return run_tournaments(*task)
+
+def _p_value(z: float) -> float:
+    """Two-sided p-value of a standard normal statistic."""
+
+    return erfc(abs(z) / sqrt(2))
+
+def _proportion_test(hits_a: int, total_a: int, hits_b: int, total_b: int) -> float:
+    """P-value of a two-proportion z-test, None if either sample is empty."""
+
+    if total_a == 0 or total_b == 0:
+        return None
+
+    pooled = (hits_a + hits_b) / (total_a + total_b)
+    error = sqrt(pooled * (1 - pooled) * (1 / total_a + 1 / total_b))
+    if error == 0:
+        return 1.0
+
+    return _p_value((hits_a / total_a - hits_b / total_b) / error)
+
+def _mean_test(stats_a: RunningStats, stats_b: RunningStats) -> float:
+    """P-value of a Welch test of two means (normal approximation), None if
+    either sample has fewer than 2 values."""
+
+    if stats_a.count < 2 or stats_b.count < 2:
+        return None
+
+    error = sqrt(stats_a.variance() / stats_a.count + stats_b.variance() / stats_b.count)
+    if error == 0:
+        return 1.0 if stats_a.mean == stats_b.mean else 0.0
+
+    return _p_value((stats_a.mean - stats_b.mean) / error)
+
+def _measure(recorder: ItemRecorder, key: tuple, metric: str):
+    """Value of a metric for an item, None if it cannot be measured."""
+
+    counts = recorder.items.get(key)
+    if metric == 'pick_rate':
+        picks = counts['picks'] if counts else 0
+        return picks / recorder.slots if recorder.slots else None
+    if not counts or not counts['picks']:
+        return None
+    if metric == 'win_rate':
+        return counts['wins'] / counts['picks']
+
+    return counts['damage'].mean if counts['damage'].count else None
+
+def compare_catalogs(old_dir: str, new_dir: str, tournaments: int = 200, knights: int = 8,
+                     processes: int = None, alpha: float = 0.01) -> list:
+    """Significant changes in item pick rate, win rate, and average damage
+    between two catalog directories.
+
+    ### Parameters:
+    ----
+    old_dir : str
+        directory holding the current catalogs
+    new_dir : str
+        directory holding the edited catalogs
+    tournaments : int
+        number of seeded tournaments run with each catalog version
+    knights : int
+        number of knights in each tournament
+    processes : int
+        number of worker processes, the number of CPUs if None
+    alpha : float
+        family-wise significance level, divided by the number of comparisons
+
+    ### Returns:
+    ----
+    list
+        dictionaries with item_type, name, metric, old, new, and p_value for
+        every significant change, largest changes first
+    """
+
+    processes = processes or os.cpu_count() or 1
+    seeds = list(range(tournaments))
+    chunks = [seeds[num::processes] for num in range(processes) if seeds[num::processes]]
+    tasks = [(directory, chunk, knights) for directory in (old_dir, new_dir) for chunk in chunks]
+
+    with multiprocessing.Pool(min(processes, len(tasks))) as pool:
+        recorders = pool.map(_run_batch, tasks)
+
+    # Combine each catalog version's batches
+    old, new = ItemRecorder(), ItemRecorder()
+    for num, recorder in enumerate(recorders):
+        (old if num < len(chunks) else new).merge(recorder)
+
+    tests = []
+    for key in sorted(set(old.items) | set(new.items)):
+        old_counts = old.items.get(key, {'picks': 0, 'wins': 0, 'damage': RunningStats()})
+        new_counts = new.items.get(key, {'picks': 0, 'wins': 0, 'damage': RunningStats()})
+        p_values = {
+            'pick_rate': _proportion_test(old_counts['picks'], old.slots, new_counts['picks'], new.slots),
+            'win_rate': _proportion_test(
+                old_counts['wins'], old_counts['picks'], new_counts['wins'], new_counts['picks']
+            ),
+            'damage': _mean_test(old_counts['damage'], new_counts['damage']),
+        }
+        for metric in metrics:
+            if p_values[metric] is not None:
+                tests.append((key, metric, p_values[metric]))
+
+    changes = []
+    for (item_type, name), metric, p_value in tests:
+        if p_value < alpha / len(tests):
+            changes.append({
+                'item_type': item_type,
+                'name': name,
+                'metric': metric,
+                'old': _measure(old, (item_type, name), metric),
+                'new': _measure(new, (item_type, name), metric),
+                'p_value': p_value,
+            })
+
+    changes.sort(key=lambda change: change['p_value'])
+    return changes
+
+def report(changes: list) -> str:
+    """Fixed-width table of changes.
+
+    ### Parameters:
+    ----
+    changes : list
+        changes returned by compare_catalogs()
+
+    ### Returns:
+    ----
+    str
+        one row per change, or a note if there are none
+    """
+
+    if not changes:
+        return 'No significant changes.'
+
+    layout = '{:<10}{:<28}{:<12}{:>10}{:>10}{:>12}'
+    rows = [layout.format('type', 'name', 'metric', 'old', 'new', 'p-value')]
+    for change in changes:
+        old = '-' if change['old'] is None else f'{change["old"]:.3f}'
+        new = '-' if change['new'] is None else f'{change["new"]:.3f}'
+        rows.append(layout.format(
+            change['item_type'], change['name'], change['metric'], old, new, f'{change["p_value"]:.2e}'
+        ))
+
+    return '\n'.join(rows)
+
+
+# Compare two catalog directories if run directly
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        print('Usage: python -m assessment.balance OLD_DIR NEW_DIR [TOURNAMENTS]')
+        sys.exit(1)
+
+    tournaments = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    print(report(compare_catalogs(sys.argv[1], sys.argv[2], tournaments)))
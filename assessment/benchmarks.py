@@ -0,0 +1,418 @@
+"""Micro-benchmarks for the knight game.
+
+Run this module directly to print every benchmark:
+
+    python -m assessment.benchmarks
+
+### Functions
+----
+time_per_call(function : callable, repeats : int) -> float
+    average seconds taken by a call to function
+benchmark_screens(repeats : int) -> dict
+    render time per screen
+benchmark_knockouts(sizes : list, repeats : int, cap : bool) -> dict
+    time to hand a loser's inventory to the winner as inventories grow
+benchmark_threads(threads : list, knights : int, rounds : int) -> dict
+    duels resolved per second by the combat kernel on each number of threads
+benchmark_random(count : int) -> dict
+    time per random number from random.random() and from numpy blocks
+benchmark_rounds(sizes : list, rounds : int, vectorized : bool) -> dict
+    duels resolved per second for each roster size, a round at a time
+benchmark_catalogs(sizes : list, compiled : bool) -> dict
+    time to load synthetic catalogs and generate the first item of each type
+benchmark_upgrades(repeats : int, level : int) -> dict
+    time to re-equip a winner replacing every item and with sparse upgrades
+benchmark_backends(duels : int) -> dict
+    duels resolved per second by the numpy engine and the duel loop
+"""
+
+# Import dependencies
+from assessment import pandas, numpy, timeit, os, tempfile, seed, random, ThreadPoolExecutor
+from assessment.classes import Arena, Knight, generate_item, use_catalogs
+from assessment.engine import backend, encode_knights, repeat, play_duels
+from assessment.kernel import resolve_duels, round_pairs, rolls_per_duel
+from assessment.rounds import resolve_round
+from assessment.synthetic import write_catalogs
+from assessment.render import (
+    combat_frame, knight_screen, train_screen, item_table, play_menu
+)
+
+
+def time_per_call(function, repeats: int = 1000) -> float:
+    """Average seconds taken by a call to function.
+
+    ### Parameters:
+    ----
+    function : callable
+        function to be timed, called without arguments
+    repeats : int
+        number of calls to average over
+
+    ### Returns:
+    ----
+    float
+        average seconds per call
+    """
+
+    return timeit.timeit(function, number=repeats) / repeats
+
+
+def benchmark_screens(repeats: int = 1000) -> dict:
+    """Render time per screen, with a pandas dataframe of the equipment as a
+    reference.
+
+    ### Parameters:
+    ----
+    repeats : int
+        number of renders to average over
+
+    ### Returns:
+    ----
+    dict
+        average seconds to render each screen
+    """
+
+    arena = Arena()
+    arena.add_knight('Player')
+    arena.add_knight('Opponent')
+    player, opponent = arena.knights
+    items = [player.equipped[item_type] for item_type in player.item_types]
+    chances = [0.5] * 5
+
+    return {
+        'play menu': time_per_call(lambda: str(play_menu), repeats),
+        'train menu': time_per_call(lambda: train_screen(player, chances), repeats),
+        'combat frame': time_per_call(lambda: '\n'.join(combat_frame(player, opponent, 'Start!')), repeats),
+        'win screen': time_per_call(lambda: knight_screen(player), repeats),
+        'equipment table': time_per_call(lambda: item_table(items, player.item_types), repeats),
+        'equipment table (pandas)': time_per_call(
+            lambda: str(pandas.DataFrame([item.__dict__ for item in items])),
+            max(repeats // 100, 1)
+        ),
+    }
+
+
+def benchmark_knockouts(sizes: list = None, repeats: int = 20, cap: bool = False) -> dict:
+    """Time to hand a loser's inventory to the winner (Knight._lose() and
+    Knight.win()) as inventories grow.
+
+    ### Parameters:
+    ----
+    sizes : list
+        number of items of each type held by both knights
+    repeats : int
+        number of knockouts to average over
+    cap : bool
+        whether the winner's inventory is capped at its starting size, so
+        each knockout also sells the least valuable items
+
+    ### Returns:
+    ----
+    dict
+        average seconds per knockout for each size
+    """
+
+    if sizes is None:
+        sizes = [10, 100, 1000, 10000, 100000]
+
+    # Items are shared between inventories, only the containers are timed
+    items = {item_type: generate_item(0, item_type) for item_type in Knight.item_types}
+    results = {}
+    for size in sizes:
+        seconds = 0
+        for _ in range(repeats):
+            winner = Knight('Winner')
+            loser = Knight('Loser')
+            for item_type, item in items.items():
+                winner.inventory.extend(item_type, [item] * size)
+                loser.inventory.extend(item_type, [item] * size)
+            if cap:
+                winner.inventory_cap = size * len(items)
+
+            seconds += time_per_call(lambda: winner.win(*loser._lose()), 1)
+        results[size] = seconds / repeats
+
+    return results
+
+
+def _kernel_round(arena: Arena, executor):
+    """Resolves a round of duels, restarting the tournament before the
+    arena runs out of loot levels."""
+
+    if arena.level >= 7:
+        arena.level = 0
+        arena.gold = 5
+    resolve_duels(arena, round_pairs(arena), executor)
+
+def benchmark_threads(threads: list = None, knights: int = 64, rounds: int = 20) -> dict:
+    """Duels resolved per second by the combat kernel on each number of
+    threads. Duels only run in parallel on a free-threaded Python build, on
+    other builds the rate shows the cost of handing duels to threads.
+
+    ### Parameters:
+    ----
+    threads : list
+        numbers of threads to run the duels on, 1 to the number of CPUs if
+        None
+    knights : int
+        number of knights in the arena, which fight knights // 2 duels per
+        round
+    rounds : int
+        number of rounds of duels to time
+
+    ### Returns:
+    ----
+    dict
+        duels per second for each number of threads
+    """
+
+    if threads is None:
+        threads = list(range(1, (os.cpu_count() or 1) + 1))
+
+    results = {}
+    for count in threads:
+        # Same tournament for every number of threads
+        seed(0)
+        arena = Arena()
+        for num in range(knights):
+            arena.add_knight(f'Knight {num}')
+
+        with ThreadPoolExecutor(count) as executor:
+            seconds = time_per_call(lambda: _kernel_round(arena, executor), rounds)
+        results[count] = (knights // 2) / seconds
+
+    return results
+
+
+def _read_rolls(rng, duels: int):
+    """Draws a block of rolls for duels and reads every roll through each
+    duel's cursor, as kernel.Duel does."""
+
+    for rolls in rng.random((duels, rolls_per_duel)).tolist():
+        rand = iter(rolls).__next__
+        for _ in range(rolls_per_duel):
+            rand()
+
+
+def benchmark_random(count: int = 1000000) -> dict:
+    """Time per random number from random.random() and from numpy blocks of
+    rolls_per_duel numbers per duel, as drawn by kernel.resolve_duels(),
+    generated on their own and then read one at a time by a duel's cursor.
+
+    ### Parameters:
+    ----
+    count : int
+        number of random numbers drawn by each source
+
+    ### Returns:
+    ----
+    dict
+        average seconds per random number for each source
+    """
+
+    rng = numpy.random.default_rng(0)
+    duels = max(count // rolls_per_duel, 1)
+    count = duels * rolls_per_duel
+
+    return {
+        'random.random()': time_per_call(lambda: [random() for _ in range(count)], 1) / count,
+        'block': time_per_call(lambda: rng.random((duels, rolls_per_duel)).tolist(), 1) / count,
+        'block and cursor': time_per_call(lambda: _read_rolls(rng, duels), 1) / count,
+    }
+
+
+def _roster_round(arena: Arena, rng, vectorized: bool):
+    """Resolves a round of duels for the whole roster from the start of a
+    tournament, so the pot and loot levels stay within the game's range."""
+
+    arena.level = 0
+    arena.gold = 5
+    if vectorized:
+        resolve_round(arena, rng=rng)
+    else:
+        resolve_duels(arena, round_pairs(arena))
+
+def benchmark_rounds(sizes: list = None, rounds: int = 5, vectorized: bool = True) -> dict:
+    """Duels resolved per second for each roster size, a round at a time,
+    by the vectorized round engine or by the combat kernel.
+
+    ### Parameters:
+    ----
+    sizes : list
+        numbers of knights in the arena, which fight knights // 2 duels per
+        round
+    rounds : int
+        number of rounds to time
+    vectorized : bool
+        whether rounds.resolve_round() is timed instead of
+        kernel.resolve_duels()
+
+    ### Returns:
+    ----
+    dict
+        duels per second for each roster size
+    """
+
+    if sizes is None:
+        sizes = [64, 1024, 8192]
+
+    results = {}
+    for size in sizes:
+        seed(0)
+        arena = Arena()
+        for num in range(size):
+            arena.add_knight(f'Knight {num}')
+        rng = numpy.random.default_rng(0)
+
+        seconds = time_per_call(lambda: _roster_round(arena, rng, vectorized), rounds)
+        results[size] = (size // 2) / seconds
+
+    return results
+
+def _first_items(directory: str):
+    """Generates an item of each type from freshly loaded catalogs."""
+
+    use_catalogs(directory)
+    for item_type in Knight.item_types:
+        generate_item(0, item_type)
+
+def benchmark_catalogs(sizes: list = None, compiled: bool = True) -> dict:
+    """Time to load synthetic catalogs and generate the first item of each
+    type, which validates the whole catalog and builds its loot table.
+
+    ### Parameters:
+    ----
+    sizes : list
+        number of items in each catalog
+    compiled : bool
+        whether compiled catalogs are read instead of the json files
+
+    ### Returns:
+    ----
+    dict
+        seconds to load the catalogs for each size
+    """
+
+    if sizes is None:
+        sizes = [10, 1000, 100000]
+
+    results = {}
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            write_catalogs(directory, size, catalog_seed=0, compiled=compiled)
+            results[size] = time_per_call(lambda: _first_items(directory), 1)
+            use_catalogs()
+
+    return results
+
+
+def benchmark_upgrades(repeats: int = 10000, level: int = 3) -> dict:
+    """Time to re-equip the winner of a knockout replacing every item and
+    with sparse upgrades (see Knight.upgrade()), along with the items each
+    mode pushes into the winner's inventory.
+
+    ### Parameters:
+    ----
+    repeats : int
+        number of re-equips to average over
+    level : int
+        loot level of the new items
+
+    ### Returns:
+    ----
+    dict
+        (seconds per re-equip, items added to the inventory) for each mode
+    """
+
+    results = {}
+    for sparse in [False, True]:
+        seed(0)
+        arena = Arena()
+        arena.add_knight('Winner')
+        arena.sparse_upgrades = sparse
+        knight = arena.knights[0]
+
+        seconds = time_per_call(lambda: arena._re_equip(knight, level), repeats)
+        results['sparse' if sparse else 'every item'] = (seconds, len(knight.inventory))
+
+    return results
+
+
+def benchmark_backends(duels: int = 20000) -> dict:
+    """Duels resolved per second by engine.play_duels() with numpy array
+    operations and with the duel loop, which is compiled when
+    engine.backend is 'numba' and is what play_duels() then picks.
+
+    ### Parameters:
+    ----
+    duels : int
+        number of duels resolved by each path
+
+    ### Returns:
+    ----
+    dict
+        duels per second for each path
+    """
+
+    seed(0)
+    arena = Arena()
+    for num in range(2):
+        arena.add_knight(f'Knight {num}')
+    player = repeat(encode_knights([arena.knights[0]]), duels)
+    opponent = repeat(encode_knights([arena.knights[1]]), duels)
+
+    results = {}
+    for name, compiled in [('numpy', False), (f'duel loop ({backend})', True)]:
+        rng = numpy.random.default_rng(0)
+        seconds = time_per_call(lambda: play_duels(player, opponent, rng, compiled), 1)
+        results[name] = duels / seconds
+
+    return results
+
+
+# Print every benchmark if run directly
+if __name__ == '__main__':
+    print('Render time per screen::')
+    for screen, seconds in benchmark_screens().items():
+        print(f'{screen:<28}{seconds * 1e6:>10.1f} us')
+
+    print()
+    print('Knockout cost per inventory size (uncapped, capped)::')
+    uncapped = benchmark_knockouts()
+    capped = benchmark_knockouts(cap=True)
+    for size, seconds in uncapped.items():
+        print(f'{size:<28}{seconds * 1e6:>10.1f} us{capped[size] * 1e6:>12.1f} us')
+
+    print()
+    print('Combat kernel duels per second per thread count::')
+    for count, rate in benchmark_threads().items():
+        print(f'{count:<28}{rate:>10.0f} /s')
+
+    print()
+    print('Time per random number::')
+    for source, seconds in benchmark_random().items():
+        print(f'{source:<28}{seconds * 1e9:>10.1f} ns')
+
+    print()
+    print('Duels per second per roster size (kernel, vectorized rounds)::')
+    kernel = benchmark_rounds(vectorized=False)
+    vectorized = benchmark_rounds()
+    for size, rate in kernel.items():
+        print(f'{size:<28}{rate:>10.0f} /s{vectorized[size]:>12.0f} /s')
+
+    print()
+    print('Re-equip time per knockout (items added to inventory)::')
+    for mode, (seconds, items) in benchmark_upgrades().items():
+        print(f'{mode:<28}{seconds * 1e6:>10.1f} us{items:>12}')
+
+    print()
+    print('Catalog load time per catalog size (json, compiled)::')
+    loaded = benchmark_catalogs(compiled=False)
+    mapped = benchmark_catalogs()
+    for size, seconds in loaded.items():
+        print(f'{size:<28}{seconds * 1e3:>10.1f} ms{mapped[size] * 1e3:>12.1f} ms')
+
+    print()
+    print(f'Duels per second per duel engine (play_duels() uses {"the duel loop" if backend == "numba" else "numpy"})::')
+    for name, rate in benchmark_backends().items():
+        print(f'{name:<28}{rate:>10.0f} /s')
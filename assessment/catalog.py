@@ -0,0 +1,864 @@
+"""Compiles equipment catalogs from json into fixed-width binary files which
+are read through a memory map, so that large catalogs can be searched by
+level without loading every item into Python objects.
+
+A compiled catalog contains a header, one fixed-width record per item sorted
+by level, and the utf-8 encoded names of all items:
+
+    header  : magic (4s), version (H), count (I)
+    record  : level (i), min_stat (d), max_stat (d), weight (d), value (i),
+              drop_weight (d), name offset (I), name length (H)
+    names   : names of all items, referenced by offset from the start of the
+              names section
+
+Run this module directly to compile the armours, shields, and weapons
+catalogs next to their json files:
+
+    python -m assessment.catalog
+
+Items may carry a 'drop_weight' (1.0 if missing) giving how often they are
+generated as loot relative to the other items within 1 level.
+
+### Classes
+----
+MappedCatalog(file_path : str)
+    read-only view of a compiled catalog
+AliasSampler(weights : list)
+    samples indexes in constant time with probability proportional to weights
+ItemCounters()
+    performance counters of a catalog entry
+CacheCounters()
+    hits and misses of a cache
+Template(item_type : str, level : int, drop_weight : float, item : Equipment)
+    validated catalog entry and the item built from it
+LootTable(item_type : str, item_class : type, entries : list, levels : list, weights : list)
+    weighted samplers for the window of entries within 1 level of each
+    level
+CatalogError(problems : list)
+    raised when a catalog contains invalid entries or level gaps
+
+### Functions
+----
+compile_catalog(json_path : str, bin_path : str) -> int
+    validates a json catalog and compiles it into a binary catalog
+validate_entry(entry : dict) -> list
+    checks a single catalog entry
+validate_catalog(entries : list, label : str) -> list
+    checks every entry of a catalog and the coverage of required_levels
+validate_records(catalog : MappedCatalog, label : str) -> list
+    checks every record of a compiled catalog and the coverage of
+    required_levels
+compile_loot_table(entries : list, item_type : str, item_class : type) -> LootTable
+    validates a catalog and builds its loot table
+
+### Parameters:
+----
+magic
+    bytes identifying a compiled catalog
+version
+    version of the compiled catalog layout
+header
+    struct for the header of a compiled catalog
+record
+    struct for each item of a compiled catalog
+record_dtype
+    numpy layout of record
+fields
+    type of every field required in a catalog entry
+required_levels
+    arena levels which need at least one item within 1 level
+"""
+
+# Import dependencies
+from assessment import numpy, os, json, mmap, struct, copy, isfinite
+
+magic = b'KCAT'
+version = 2
+header = struct.Struct('<4sHI')
+record = struct.Struct('<idddidIH')
+record_dtype = numpy.dtype([
+    ('level', '<i4'),
+    ('min_stat', '<f8'),
+    ('max_stat', '<f8'),
+    ('weight', '<f8'),
+    ('value', '<i4'),
+    ('drop_weight', '<f8'),
+    ('offset', '<u4'),
+    ('length', '<u2'),
+])
+fields = {
+    'name': 'string',
+    'min_stat': 'number',
+    'max_stat': 'number',
+    'weight': 'number',
+    'value': 'integer',
+    'level': 'integer'
+}
+required_levels = range(0, 9)
+
+
+def compile_catalog(json_path: str, bin_path: str) -> int:
+    """Compiles a json catalog into a binary catalog, after checking it with
+    validate_catalog() as it is checked when loaded.
+
+    ### Parameters:
+    ----
+    json_path : str
+        path of the json catalog to be compiled
+    bin_path : str
+        path of the binary catalog to be written
+
+    ### Returns:
+    ----
+    int
+        number of items compiled
+
+    ### Raises:
+    ----
+    CatalogError
+        if any entry is invalid or a required level has no items, in which
+        case nothing is written
+    """
+
+    with open(json_path, mode='r', encoding='utf-8') as file:
+        items = json.load(file)
+
+    problems = validate_catalog(items, os.path.splitext(os.path.basename(json_path))[0])
+    if problems:
+        raise CatalogError(problems)
+
+    # Records are sorted by level so level ranges are contiguous
+    items.sort(key=lambda item: item['level'])
+
+    names = bytearray()
+    records = bytearray()
+    for item in items:
+        name = item['name'].encode('utf-8')
+        records += record.pack(
+            item['level'], item['min_stat'], item['max_stat'], item['weight'],
+            item['value'], item.get('drop_weight', 1.0), len(names), len(name)
+        )
+        names += name
+
+    # Write to a temporary file first so readers never see a partial catalog
+    temp_path = bin_path + '.tmp'
+    with open(temp_path, mode='wb') as file:
+        file.write(header.pack(magic, version, len(items)))
+        file.write(records)
+        file.write(names)
+    os.replace(temp_path, bin_path)
+
+    return len(items)
+
+
+class MappedCatalog():
+    """Read-only view of a compiled catalog.
+
+    ### Attributes:
+    ----
+    file_path : str
+        path of the compiled catalog
+    count : int
+        number of items in the catalog
+
+    ### Methods:
+    ----
+    level(index: int) -> int
+        level of the item at index
+    level_range(lower: int, upper: int) -> range
+        indexes of all items with a level between lower and upper
+    item(index: int) -> dict
+        serialized item at index
+    items(lower: int, upper: int) -> list
+        serialized items with a level between lower and upper
+    records() -> numpy.ndarray
+        every record, as a numpy view of the memory map
+    close()
+        closes the memory map
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        with open(file_path, mode='rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        file_magic, file_version, self.count = header.unpack_from(self._map, 0)
+        if file_magic != magic or file_version != version:
+            self._map.close()
+            raise ValueError(f'{file_path} is not a version {version} compiled catalog.')
+
+        self._names = header.size + self.count * record.size
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> dict:
+        return self.item(index)
+
+    def level(self, index: int) -> int:
+        """Level of the item at index.
+
+        ### Parameters:
+        ----
+        index : int
+            index of the item
+
+        ### Returns:
+        ----
+        int
+            level of the item
+        """
+
+        return struct.unpack_from('<i', self._map, header.size + index * record.size)[0]
+
+    def _bisect(self, level: int) -> int:
+        """Index of the first item with a level greater than or equal to
+        level."""
+
+        lower, upper = 0, self.count
+        while lower < upper:
+            middle = (lower + upper) // 2
+            if self.level(middle) < level:
+                lower = middle + 1
+            else:
+                upper = middle
+
+        return lower
+
+    def level_range(self, lower: int, upper: int) -> range:
+        """Indexes of all items with a level between lower and upper.
+
+        ### Parameters:
+        ----
+        lower : int
+            lowest level to include
+        upper : int
+            highest level to include
+
+        ### Returns:
+        ----
+        range
+            indexes of the items
+        """
+
+        return range(self._bisect(lower), self._bisect(upper + 1))
+
+    def item(self, index: int) -> dict:
+        """Serialized item at index.
+
+        ### Parameters:
+        ----
+        index : int
+            index of the item
+
+        ### Returns:
+        ----
+        dict
+            item in the same form as the json catalog
+        """
+
+        level, min_stat, max_stat, weight, value, drop_weight, offset, length = record.unpack_from(
+            self._map, header.size + index * record.size
+        )
+        start = self._names + offset
+        return {
+            'name': self._map[start:start + length].decode('utf-8'),
+            'min_stat': min_stat,
+            'max_stat': max_stat,
+            'weight': weight,
+            'value': value,
+            'drop_weight': drop_weight,
+            'level': level
+        }
+
+    def items(self, lower: int, upper: int) -> list:
+        """Serialized items with a level between lower and upper.
+
+        ### Parameters:
+        ----
+        lower : int
+            lowest level to include
+        upper : int
+            highest level to include
+
+        ### Returns:
+        ----
+        list
+            items in the same form as the json catalog
+        """
+
+        return [self.item(index) for index in self.level_range(lower, upper)]
+
+    def records(self) -> numpy.ndarray:
+        """Every record, as a numpy view of the memory map. Views must be
+        released before the catalog is closed.
+
+        ### Returns:
+        ----
+        numpy.ndarray
+            records with the fields of record_dtype, sorted by level
+        """
+
+        return numpy.frombuffer(self._map, dtype=record_dtype, count=self.count, offset=header.size)
+
+    def close(self):
+        """Closes the memory map."""
+
+        self._map.close()
+
+
+class AliasSampler():
+    """Samples indexes in constant time with probability proportional to
+    weights, using Vose's alias method.
+
+    ### Attributes:
+    ----
+    count : int
+        number of indexes that can be sampled
+
+    ### Methods:
+    ----
+    sample(rand: float) -> int
+        index selected by a uniform random number in [0, 1)
+    """
+
+    def __init__(self, weights: list):
+        weights = numpy.asarray(weights, dtype=float)
+        self.count = len(weights)
+        if self.count == 0:
+            raise ValueError('Cannot build a sampler without any weights.')
+        if weights.min() < 0:
+            raise ValueError('Drop weights cannot be negative.')
+
+        # Fall back to a uniform distribution if every weight is 0
+        total = weights.sum()
+        if total == 0:
+            weights = numpy.ones(self.count)
+            total = self.count
+
+        scaled_array = weights * (self.count / total)
+        small = numpy.flatnonzero(scaled_array < 1).tolist()
+        large = numpy.flatnonzero(scaled_array >= 1).tolist()
+        scaled = scaled_array.tolist()
+        self._prob = [1.0] * self.count
+        self._alias = list(range(self.count))
+
+        # Pair each under-full column with an over-full column
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self._prob[less] = scaled[less]
+            self._alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1
+            if scaled[more] < 1:
+                small.append(more)
+            else:
+                large.append(more)
+
+    def sample(self, rand: float) -> int:
+        """Index selected by a uniform random number in [0, 1).
+
+        ### Parameters:
+        ----
+        rand : float
+            uniform random number in [0, 1)
+
+        ### Returns:
+        ----
+        int
+            sampled index
+        """
+
+        column = rand * self.count
+        index = min(int(column), self.count - 1)
+        if column - index < self._prob[index]:
+            return index
+
+        return self._alias[index]
+
+
+class ItemCounters():
+    """Performance counters of a catalog entry, shared by every item built
+    from it and updated by an ItemTelemetry listener.
+
+    ### Attributes:
+    ----
+    knockouts : int
+        knockouts won with the item equipped
+    knocked_out : int
+        knockouts lost with the item equipped
+    attacks : int
+        attacks made with the item equipped
+    defences : int
+        attacks defended with the item equipped
+    damage_dealt : float
+        damage dealt by attacks made with the item equipped
+    damage_blocked : float
+        damage blocked or dodged by defences made with the item equipped
+    crits : int
+        critical hits rolled by the item
+    failures : int
+        critical failures rolled by the item
+    """
+
+    def __init__(self):
+        self.knockouts = 0
+        self.knocked_out = 0
+        self.attacks = 0
+        self.defences = 0
+        self.damage_dealt = 0
+        self.damage_blocked = 0
+        self.crits = 0
+        self.failures = 0
+
+
+class CacheCounters():
+    """Hits and misses of a cache.
+
+    ### Attributes:
+    ----
+    hits : int
+        lookups answered from the cache
+    misses : int
+        lookups which had to build the cached value
+
+    ### Methods:
+    ----
+    hit_rate() -> float
+        share of lookups answered from the cache
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def hit_rate(self) -> float:
+        """Share of lookups answered from the cache.
+
+        ### Returns:
+        ----
+        float
+            hits over lookups, None before the first lookup
+        """
+
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return None
+
+        return self.hits / lookups
+
+
+class Template():
+    """Validated catalog entry and the item built from it, which is copied
+    each time the entry is generated as loot. The item, and so every copy,
+    refers back to the template through its template attribute.
+
+    ### Attributes:
+    ----
+    item_type : str
+        can be 'weapons', 'shields', or 'armours' - type of item
+    level : int
+        level of the entry
+    drop_weight : float
+        how often the entry is generated relative to other entries
+    item : Equipment
+        item built from the entry
+    counters : ItemCounters
+        performance counters of the entry
+    expected_attack : float
+        average attack stat of the item, cached from its expected_attack()
+    expected_defence : float
+        average defence stat of the item, cached from its expected_defence()
+
+    ### Methods:
+    ----
+    build() -> Equipment
+        new item with the stats of the entry
+    """
+
+    def __init__(self, item_type: str, level: int, drop_weight: float, item):
+        self.item_type = item_type
+        self.level = level
+        self.drop_weight = drop_weight
+        self.item = item
+        self.counters = ItemCounters()
+        self.expected_attack = item.expected_attack()
+        self.expected_defence = item.expected_defence()
+        item.template = self
+
+    def build(self):
+        """New item with the stats of the entry.
+
+        ### Returns:
+        ----
+        Equipment
+            copy of the template's item
+        """
+
+        return copy(self.item)
+
+
+class LootTable():
+    """Weighted samplers for the window of entries within 1 level of each
+    level, built once when the catalog is loaded.
+
+    Entries are sorted by level, so each level is a contiguous slice of the
+    catalog found by bisection and has a single sampler over its own drop
+    weights. A draw picks one of the (at most 3) levels of the window by
+    their total drop weight and then an entry from that level's sampler, so
+    it stays constant-time. Templates are only built for the entries drawn
+    or listed, and are kept so every entry has a single template.
+
+    ### Attributes:
+    ----
+    item_type : str
+        can be 'weapons', 'shields', or 'armours' - type of item
+    item_class : type
+        class used to build each item
+    entries : list
+        serialized items sorted by level, or a MappedCatalog
+    templates : dict
+        templates built so far, by index of their entry
+    windows : dict
+        range of indexes of the entries within 1 level, for each level that
+        has any
+
+    ### Methods:
+    ----
+    template(index: int) -> Template
+        template of the entry at index
+    window(level: int) -> list
+        all templates within 1 level of level
+    draw(level: int, rand: float) -> Template
+        template within 1 level of level
+    """
+
+    def __init__(self, item_type: str, item_class, entries, levels, weights):
+        self.item_type = item_type
+        self.item_class = item_class
+        self.entries = entries
+        self.templates = {}
+        self.windows = {}
+        levels = numpy.asarray(levels)
+        weights = numpy.asarray(weights, dtype=float)
+
+        # Slice and sampler of each level
+        slices = {}
+        for level in numpy.unique(levels).tolist():
+            start = int(numpy.searchsorted(levels, level, side='left'))
+            stop = int(numpy.searchsorted(levels, level, side='right'))
+            level_weights = weights[start:stop]
+            slices[level] = (start, stop, float(level_weights.sum()), AliasSampler(level_weights))
+
+        # Levels of each window with any drop weight, and the window's total
+        self._parts = {}
+        for level in range(min(slices, default=0) - 1, max(slices, default=0) + 2):
+            parts = [slices[near] for near in (level - 1, level, level + 1) if near in slices]
+            if parts:
+                self.windows[level] = range(parts[0][0], parts[-1][1])
+                weighted = [(start, total, sampler) for start, _, total, sampler in parts if total > 0]
+                self._parts[level] = (weighted, sum(total for _, total, _ in weighted))
+
+    def template(self, index: int) -> Template:
+        """Template of the entry at index, built the first time it is
+        needed.
+
+        ### Parameters:
+        ----
+        index : int
+            index of the entry
+
+        ### Returns:
+        ----
+        Template
+            template of the entry
+        """
+
+        if index not in self.templates:
+            entry = self.entries[index]
+            item = self.item_class(
+                entry['name'], entry['min_stat'], entry['max_stat'], entry['weight'], int(entry['value'])
+            )
+            self.templates[index] = Template(
+                self.item_type, int(entry['level']), entry.get('drop_weight', 1.0), item
+            )
+
+        return self.templates[index]
+
+    def window(self, level: int) -> list:
+        """All templates within 1 level of level.
+
+        ### Parameters:
+        ----
+        level : int
+            level of the arena's loot pool
+
+        ### Returns:
+        ----
+        list
+            templates sorted by level, empty if there are none
+        """
+
+        if level not in self.windows:
+            return []
+
+        return [self.template(index) for index in self.windows[level]]
+
+    def draw(self, level: int, rand: float) -> Template:
+        """Template within 1 level of level.
+
+        ### Parameters:
+        ----
+        level : int
+            level of the arena's loot pool
+        rand : float
+            uniform random number in [0, 1)
+
+        ### Returns:
+        ----
+        Template
+            template selected by drop weight
+        """
+
+        if level not in self.windows:
+            raise IndexError(f'No items within 1 level of level {level}.')
+
+        # Every entry is equally likely if the whole window has no weight
+        parts, window_total = self._parts[level]
+        if window_total == 0:
+            window = self.windows[level]
+            return self.template(window[min(int(rand * len(window)), len(window) - 1)])
+
+        # Pick a level by total weight, then reuse the rest of rand within it
+        point = rand * window_total
+        for start, total, sampler in parts:
+            if point < total:
+                break
+            point -= total
+
+        return self.template(start + sampler.sample(min(point / total, 1.0)))
+
+
+class CatalogError(ValueError):
+    """Raised when a catalog contains invalid entries or level gaps.
+
+    ### Attributes:
+    ----
+    problems : list
+        description of every problem found in the catalog
+    """
+
+    def __init__(self, problems: list):
+        self.problems = problems
+        super().__init__('\n'.join(problems))
+
+
+def _is_number(value) -> bool:
+    """Checks if a json value is a finite number (booleans excluded), as
+    json.load() reads NaN and Infinity as floats."""
+
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return False
+
+    return isinstance(value, int) or isfinite(value)
+
+
+def validate_entry(entry) -> list:
+    """Checks a single catalog entry.
+
+    ### Parameters:
+    ----
+    entry : dict
+        serialized item from a catalog
+
+    ### Returns:
+    ----
+    list
+        description of each problem found, empty if the entry is valid
+    """
+
+    if not isinstance(entry, dict):
+        return ['entry is not an object']
+
+    problems = []
+    missing = [field for field in fields if field not in entry]
+    unknown = [field for field in entry if field not in fields and field != 'drop_weight']
+    if missing:
+        problems.append(f'missing {", ".join(missing)}')
+    if unknown:
+        problems.append(f'unknown {", ".join(unknown)}')
+
+    # Check the type of every field present
+    for field, kind in fields.items():
+        if field not in entry:
+            continue
+        value = entry[field]
+        if kind == 'number' and not _is_number(value):
+            problems.append(f'{field} must be a finite number')
+        elif kind == 'integer' and (not _is_number(value) or value != int(value)):
+            problems.append(f'{field} must be an integer')
+        elif kind == 'string' and (not isinstance(value, str) or len(value) == 0):
+            problems.append(f'{field} must be a non-empty string')
+
+    if 'drop_weight' in entry and (not _is_number(entry['drop_weight']) or entry['drop_weight'] < 0):
+        problems.append('drop_weight must be a finite number of at least 0')
+
+    # Check values used by the combat formulas for fields of the right type
+    numbers = {field for field in fields if field in entry and _is_number(entry[field])}
+    if 'weight' in numbers and entry['weight'] <= 0:
+        problems.append('weight must be greater than 0')
+    if {'min_stat', 'max_stat'} <= numbers and not 0 <= entry['min_stat'] <= entry['max_stat']:
+        problems.append('min_stat must be between 0 and max_stat')
+    if 'value' in numbers and entry['value'] < 0:
+        problems.append('value cannot be negative')
+
+    return problems
+
+
+def validate_catalog(entries, label: str = 'catalog') -> list:
+    """Checks every entry of a catalog and the coverage of required_levels.
+
+    ### Parameters:
+    ----
+    entries : list
+        serialized items from a catalog
+    label : str
+        name of the catalog used in the problem descriptions
+
+    ### Returns:
+    ----
+    list
+        description of each problem found, empty if the catalog is valid
+    """
+
+    if not isinstance(entries, list):
+        return [f'{label}: catalog is not a list']
+
+    problems = []
+    levels = set()
+    for num, entry in enumerate(entries):
+        entry_problems = validate_entry(entry)
+        if entry_problems:
+            name = entry.get('name', '?') if isinstance(entry, dict) else '?'
+            problems.append(f'{label}[{num}] ({name}): {"; ".join(entry_problems)}')
+        else:
+            levels.add(int(entry['level']))
+
+    # Every arena level needs at least one item within 1 level
+    for level in required_levels:
+        if not levels & {level - 1, level, level + 1}:
+            problems.append(f'{label}: no items within 1 level of level {level}')
+
+    return problems
+
+
+def validate_records(catalog: MappedCatalog, label: str = 'catalog') -> list:
+    """Checks every record of a compiled catalog and the coverage of
+    required_levels, as validate_catalog() checks a json catalog, using
+    numpy over the mapped records.
+
+    ### Parameters:
+    ----
+    catalog : MappedCatalog
+        compiled catalog to check
+    label : str
+        name of the catalog used in the problem descriptions
+
+    ### Returns:
+    ----
+    list
+        description of each problem found, empty if the catalog is valid
+    """
+
+    records = catalog.records()
+    finite = numpy.ones(len(records), dtype=bool)
+    for field in ['min_stat', 'max_stat', 'weight', 'drop_weight']:
+        finite &= numpy.isfinite(records[field])
+
+    # Same checks as validate_entry(), for the fields a record can hold
+    checks = [
+        (~finite, 'stats, weight, and drop_weight must be finite numbers'),
+        (records['length'] == 0, 'name must be a non-empty string'),
+        (records['drop_weight'] < 0, 'drop_weight must be a number of at least 0'),
+        (records['weight'] <= 0, 'weight must be greater than 0'),
+        ((records['min_stat'] < 0) | (records['min_stat'] > records['max_stat']),
+         'min_stat must be between 0 and max_stat'),
+        (records['value'] < 0, 'value cannot be negative'),
+    ]
+    invalid = numpy.zeros(len(records), dtype=bool)
+    for failed, _ in checks:
+        invalid |= failed
+
+    problems = []
+    for num in numpy.flatnonzero(invalid).tolist():
+        entry_problems = [problem for failed, problem in checks if failed[num]]
+        problems.append(f'{label}[{num}] ({catalog.item(num)["name"] or "?"}): {"; ".join(entry_problems)}')
+
+    # Every arena level needs at least one item within 1 level
+    levels = set(numpy.unique(records['level'][~invalid]).tolist())
+    for level in required_levels:
+        if not levels & {level - 1, level, level + 1}:
+            problems.append(f'{label}: no items within 1 level of level {level}')
+
+    return problems
+
+
+def compile_loot_table(entries, item_type: str, item_class) -> LootTable:
+    """Validates a catalog and builds its loot table. The levels and drop
+    weights of a compiled catalog are read as numpy views of the memory map,
+    so no Python objects are built for the entries until they are drawn.
+
+    ### Parameters:
+    ----
+    entries : list
+        serialized items from a json catalog, or a MappedCatalog
+    item_type : str
+        can be 'weapons', 'shields', or 'armours' - type of item
+    item_class : type
+        class used to build each item
+
+    ### Returns:
+    ----
+    LootTable
+        loot table of the catalog
+
+    ### Raises:
+    ----
+    CatalogError
+        if any entry is invalid or a required level has no items
+    """
+
+    if isinstance(entries, MappedCatalog):
+        problems = validate_records(entries, item_type)
+        if problems:
+            raise CatalogError(problems)
+
+        records = entries.records()
+        return LootTable(item_type, item_class, entries, records['level'], records['drop_weight'])
+
+    problems = validate_catalog(entries, item_type)
+    if problems:
+        raise CatalogError(problems)
+
+    entries = sorted(entries, key=lambda entry: entry['level'])
+    levels = [int(entry['level']) for entry in entries]
+    weights = [entry.get('drop_weight', 1.0) for entry in entries]
+
+    return LootTable(item_type, item_class, entries, levels, weights)
+
+
+# Validate and compile the catalogs next to this file if run directly
+if __name__ == '__main__':
+    catalog_dir = os.path.dirname(os.path.abspath(__file__))
+    for item_type in ['armours', 'shields', 'weapons']:
+        file_path = os.path.join(catalog_dir, item_type)
+
+        # Report problems instead of compiling an invalid catalog
+        try:
+            count = compile_catalog(file_path + '.json', file_path + '.bin')
+        except CatalogError as error:
+            print(f'Skipped {item_type}, {len(error.problems)} problems found:')
+            for problem in error.problems:
+                print(f'    {problem}')
+        else:
+            print(f'Compiled {count} {item_type}.')
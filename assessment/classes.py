@@ -23,20 +23,46 @@ display_combat(player : Knight, opponent : Knight, message : str)
 load_file(file_name : str) -> list
     loads json file to product a list of dictionaries representing
     serialized equipment
+load_catalog(file_name : str) -> list
+    loads all serialized equipment of a catalog, reading the compiled
+    catalog if one is available
+load_level_range(file_name : str, lower : int, upper : int) -> list
+    loads the serialized equipment with a level between lower and upper,
+    reading the compiled catalog if one is available
+use_catalogs(directory : str)
+    reads the catalogs from another directory, dropping cached catalogs
+loot_table(item_type : str) -> LootTable
+    weighted loot table for an item type, built from the validated catalog
+    the first time it is needed
 generate_item(level : int, item_type : str)
     generate a piece of equipment based on the level of the arena and type
     of weapon
+draw_templates(level : int, item_types : list, clamp : bool) -> dict
+    draw a catalog template of each item type without building the items
 
 ### Parameters:
 ----
 root_dir
     location of armours, shields, and weapons serialized values
+item_classes
+    class used to build an item for each item type
+cache_counters
+    hits and misses of the compiled catalog, loot table, and shop caches
 """
 
 # Import dependencies
 from assessment import random, choice, os, sqrt, json, pandas, sleep
+from assessment.catalog import MappedCatalog, LootTable, CacheCounters, compile_loot_table
+from assessment.inventory import Inventory
+from assessment.loadout import loadout_score
+from assessment.render import (
+    renderer, combat_frame, combat_message, draw_message, knight_screen, item_table
+)
 
 root_dir = os.path.dirname(os.path.abspath(__file__)) + '/'
+_mapped_catalogs = {}
+_loot_tables = {}
+cache_counters = {'compiled_catalogs': CacheCounters(), 'loot_tables': CacheCounters(), 'shop': CacheCounters()}
 
 
 class Equipment():
@@ -51,6 +77,11 @@ class Equipment():
         maximum stat of the item
     weight : float
         weight of the item
+    template : Template
+        catalog template the item was built from, None if not built from a
+        catalog
+    roll : float
+        random roll of the last call to defend() or attack()
 
     ### Methods:
     ----
@@ -58,12 +89,28 @@ class Equipment():
         provides combined defense stat for the item
     attack() -> float
         provides combined attack stat for the item
+    expected_defence() -> float
+        provides the average defence stat produced by defend()
+    expected_attack() -> float
+        provides the average attack stat produced by attack()
+    defence_range() -> tuple
+        provides the lowest and highest defence stat defend() can produce
+    attack_range() -> tuple
+        provides the lowest and highest attack stat attack() can produce
+    outcome(roll: float) -> str
+        branch of defend() and attack() taken for a roll
     """
 
+    # Slots keep the template and roll out of __dict__, which holds only
+    # the serialized stats shown in item tables
+    __slots__ = ('template', 'roll', '__dict__')
+
     def __init__(self, min_stat: float, max_stat: float, weight: float):
         self.min_stat = min_stat
         self.max_stat = max_stat
         self.weight = weight
+        self.template = None
+        self.roll = None
 
     def defend(self) -> float:
         """Provides combined defense stat for the armour.
@@ -75,6 +122,7 @@ class Equipment():
         """
 
         rand = random()
+        self.roll = rand
         defence = 0
         # Critical Hit
         if rand <= 0.1:
@@ -101,6 +149,7 @@ class Equipment():
         """
 
         rand = random()
+        self.roll = rand
         damage = 0
         # Critical Hit
         if rand <= 0.1:
@@ -116,6 +165,81 @@ class Equipment():
 
         return damage
 
+    def expected_defence(self) -> float:
+        """Provides the average defence stat produced by defend().
+
+        ### Returns:
+        ----
+        float
+            average defence stat for the item
+        """
+
+        # 10% critical hit, 10% critical failure, 80% standard hit
+        critical = self.max_stat * 2.5 * self.weight / 50
+        standard = (self.max_stat + self.min_stat) / 2 * self.weight / 50
+        return 0.1 * critical + 0.8 * standard
+
+    def expected_attack(self) -> float:
+        """Provides the average attack stat produced by attack().
+
+        ### Returns:
+        ----
+        float
+            average attack stat for the item
+        """
+
+        # 10% critical hit, 10% critical failure, 80% standard hit
+        critical = self.max_stat / sqrt(self.weight)
+        standard = self.min_stat / sqrt(self.weight)
+        return 0.1 * critical + 0.8 * standard
+
+    def defence_range(self) -> tuple:
+        """Provides the lowest and highest defence stat defend() can
+        produce.
+
+        ### Returns:
+        ----
+        tuple
+            (lowest, highest) defence stat for the item
+        """
+
+        # Critical failure gives nothing, critical hit the most
+        return (0, self.max_stat * 2.5 * self.weight / 50)
+
+    def attack_range(self) -> tuple:
+        """Provides the lowest and highest attack stat attack() can
+        produce.
+
+        ### Returns:
+        ----
+        tuple
+            (lowest, highest) attack stat for the item
+        """
+
+        # Critical failure gives nothing, critical hit the most
+        return (0, self.max_stat / sqrt(self.weight))
+
+    def outcome(self, roll: float) -> str:
+        """Branch of defend() and attack() taken for a roll.
+
+        ### Parameters:
+        ----
+        roll : float
+            random roll of defend() or attack()
+
+        ### Returns:
+        ----
+        str
+            'critical', 'failure', or 'standard'
+        """
+
+        if roll <= 0.1:
+            return 'critical'
+        if roll >= 0.9:
+            return 'failure'
+
+        return 'standard'
+
 
 class Armour(Equipment):
     """Class to define pieces of armour.
@@ -179,6 +303,7 @@ class Weapon(Equipment):
         """
 
         rand = random()
+        self.roll = rand
         defence = 0
         # Critical Hit
         if rand <= 0.1:
@@ -205,6 +330,7 @@ class Weapon(Equipment):
         """
 
         rand = random()
+        self.roll = rand
         damage = 0
         # Critical Hit
         if rand <= 0.1:
@@ -221,6 +347,84 @@ class Weapon(Equipment):
 
         return damage
 
+    def expected_defence(self) -> float:
+        """Provides the average defence stat produced by defend().
+
+        ### Returns:
+        ----
+        float
+            average defence stat for the weapon
+        """
+
+        # Any roll above 0.1 takes the critical failure branch in defend()
+        critical = self.max_stat * 1.5 * self.weight / 100
+        failure = self.min_stat * 0.5 * self.weight / 100
+        return 0.1 * critical + 0.9 * failure
+
+    def expected_attack(self) -> float:
+        """Provides the average attack stat produced by attack().
+
+        ### Returns:
+        ----
+        float
+            average attack stat for the weapon
+        """
+
+        # Any roll above 0.1 takes the critical failure branch in attack()
+        critical = self.max_stat * 3.5 / sqrt(self.weight)
+        failure = self.min_stat * 1.5 / sqrt(self.weight)
+        return 0.1 * critical + 0.9 * failure
+
+    def defence_range(self) -> tuple:
+        """Provides the lowest and highest defence stat defend() can
+        produce.
+
+        ### Returns:
+        ----
+        tuple
+            (lowest, highest) defence stat for the weapon
+        """
+
+        # Only the critical hit and critical failure branches are reachable
+        critical = self.max_stat * 1.5 * self.weight / 100
+        failure = self.min_stat * 0.5 * self.weight / 100
+        return (min(critical, failure), max(critical, failure))
+
+    def attack_range(self) -> tuple:
+        """Provides the lowest and highest attack stat attack() can
+        produce.
+
+        ### Returns:
+        ----
+        tuple
+            (lowest, highest) attack stat for the weapon
+        """
+
+        # Only the critical hit and critical failure branches are reachable
+        critical = self.max_stat * 3.5 / sqrt(self.weight)
+        failure = self.min_stat * 1.5 / sqrt(self.weight)
+        return (min(critical, failure), max(critical, failure))
+
+    def outcome(self, roll: float) -> str:
+        """Branch of defend() and attack() taken for a roll.
+
+        ### Parameters:
+        ----
+        roll : float
+            random roll of defend() or attack()
+
+        ### Returns:
+        ----
+        str
+            'critical' or 'failure'
+        """
+
+        # Any roll above 0.1 takes the critical failure branch
+        if roll <= 0.1:
+            return 'critical'
+
+        return 'failure'
+
 
 class Knight():
     """Class to define a knight fighting in the tournament.
@@ -247,8 +451,11 @@ class Knight():
         starting base speed
     speed : int
         speed of the knight
-    inventory : dict
+    inventory : Inventory
         contains all extra pieces of equipment awarded by the tournement
+    inventory_cap : int
+        most items kept in the inventory, the least valuable items are sold
+        when loot exceeds it (no limit if None)
 
     ### Methods:
     ----
@@ -260,13 +467,21 @@ class Knight():
         produces a tuple of speed stat and combined attack stat
     defend() -> tuple
         produces a tuple of speed stat and combined defence stat
+    upgrade(templates: dict) -> int
+        equips the items of the templates which improve the loadout
+    attack_range() -> tuple
+        lowest and highest combined attack stat attack() can produce
+    defence_range() -> tuple
+        lowest and highest combined defence stat defend() can produce
     take_damage(damage: float) -> tuple
         applies damage inflicted; if it exceeds remaining health return
         items and gold
-    win(loot: dict, gold: int)
+    win(loot: Inventory, gold: int)
         distributes loot and gold from winning a round to the inventory
-    sell_item(name: str, gold: int, item_type: str)
+    sell_item(item_id: int, item_type: str)
         removes an item from the inventory in exchange for gold
+    sell_below(value: int, item_types: list)
+        sells every item in the inventory worth less than value
     display_items(item_type: str)
         displays all items in knight's inventory using a pandas dataframe
         corresponding to the item_type
@@ -275,11 +490,12 @@ class Knight():
     item_types = ['weapons', 'shields', 'armours']
     gold = 0
     weight = 0
-    equipped = {'weapons': None, 'shields': None, 'armours': None}
-    inventory = {'weapons': [], 'shields': [], 'armours': []}
+    inventory_cap = None
 
     def __init__(self, name: str):
         self.name = name
+        self.equipped = {'weapons': None, 'shields': None, 'armours': None}
+        self.inventory = Inventory()
         self.base_health = int(75 * random() + 75)
         self.base_damage = int(10 * random() + 10)
         self.base_defence = int(5 * random() + 5)
@@ -290,46 +506,7 @@ class Knight():
     def win_string(self):
         """String to display if the knight wins."""
 
-        # get equipped items for display
-        items = []
-        for item_type in self.item_types:
-            # Add dictionary of item equipped in item_type slot
-            if self.equipped[item_type] is not None:
-                item = self.equipped[item_type].__dict__
-
-            # Build empty dictionary if no item is equipped in item_type slot
-            else:
-                item = {
-                    'name': None,
-                    'min_stat': None,
-                    'max_stat': None,
-                    'weight': None,
-                    'value': None
-                }
-
-            # Add slot name to dictionary
-            item['item_type'] = item_type
-            items.append(item)
-
-        # Build and print display string containing knight stats
-        display = ''
-        display += f'Name: {self.name}'
-        display += ' ' * (30 - len(self.name))
-        display += f'Gold: {self.gold}\n'
-        display += f'Base Speed: {self.base_speed}'
-        display += ' ' * (23 - len(str(self.base_speed)))
-        display += f'Speed: {self.speed}\n'
-        display += f'Health: {self.base_health}'
-        display += ' ' * (22 - len(str(self.base_health)))
-        display += f'Max Health: {self.max_health}\n'
-        display += f'Base Damage: {self.base_damage}'
-        display += ' ' * (15 - len(str(self.base_damage)))
-        display += f'Base Defence: {self.base_defence}\n'
-        display += 'Equipped::\n'
-        print(display)
-
-        # Build and print display of equipped items
-        print(pandas.read_json(json.dumps(items)))
+        print(knight_screen(self))
 
     def unequip_item(self, item_type: str):
         """Unequip an equipped item and store in the knight's inventory.
@@ -341,7 +518,7 @@ class Knight():
         """
 
         self.weight -= self.equipped[item_type].weight
-        self.inventory[item_type].append(self.equipped[item_type])
+        self.inventory.add(item_type, self.equipped[item_type])
         self.equipped[item_type] = None
 
     def equip_item(self, item: Equipment, item_type: str):
@@ -362,6 +539,66 @@ class Knight():
         self.equipped[item_type] = item
         self.weight += item.weight
 
+    def upgrade(self, templates: dict) -> int:
+        """Equips the items of the templates which improve the loadout, as
+        scored by loadout.loadout_score() against the knight as equipped, so
+        the speed lost to a heavier item counts against it. Expected attack
+        and defence are read from the cache on each template. Other
+        templates are dropped without building their items, so they are
+        neither equipped nor added to the inventory; replaced items go to
+        the inventory as with equip_item().
+
+        ### Parameters:
+        ----
+        templates : dict
+            candidate template for each item type
+
+        ### Returns:
+        ----
+        int
+            number of items equipped
+        """
+
+        # Expected attack, defence, and weight of each slot
+        slots = {item_type: _expected(self.equipped[item_type]) for item_type in self.item_types}
+        attack = sum(slot[0] for slot in slots.values())
+        defence = sum(slot[1] for slot in slots.values())
+        weight = self.weight
+        score = None
+
+        swaps = 0
+        for item_type, template in templates.items():
+            current = self.equipped[item_type]
+            # Same entry as the equipped item, the loadout is unchanged
+            if current is not None and current.template is template:
+                continue
+
+            # The score never rises without more attack, more defence, or
+            # less weight, so such templates are skipped without scoring
+            old_attack, old_defence, old_weight = slots[item_type]
+            if (template.expected_attack <= old_attack and template.expected_defence <= old_defence
+                    and template.item.weight >= old_weight):
+                continue
+
+            # Scored against the knight as equipped before any swap
+            if score is None:
+                self._calculate_speed()
+                profiles = [(self.speed, self.base_damage + attack, self.base_defence + defence, self.base_health)]
+                score = loadout_score(self, attack, defence, weight, profiles)
+            new_attack = attack - old_attack + template.expected_attack
+            new_defence = defence - old_defence + template.expected_defence
+            new_weight = weight - old_weight + template.item.weight
+            new_score = loadout_score(self, new_attack, new_defence, new_weight, profiles)
+            if new_score <= score:
+                continue
+
+            self.equip_item(template.build(), item_type)
+            slots[item_type] = (template.expected_attack, template.expected_defence, template.item.weight)
+            attack, defence, weight, score = new_attack, new_defence, new_weight, new_score
+            swaps += 1
+
+        return swaps
+
     def _calculate_speed(self):
         """Calculuate speed stat."""
 
@@ -408,6 +645,42 @@ class Knight():
 
         return (self.speed, int(defence))
 
+    def attack_range(self) -> tuple:
+        """Lowest and highest combined attack stat attack() can produce.
+
+        ### Returns:
+        ----
+        tuple
+            (lowest, highest) attack stat
+        """
+
+        lowest = highest = self.base_damage
+        for item_type in self.item_types:
+            if self.equipped[item_type] is not None:
+                low, high = self.equipped[item_type].attack_range()
+                lowest += low
+                highest += high
+
+        return (int(lowest), int(highest))
+
+    def defence_range(self) -> tuple:
+        """Lowest and highest combined defence stat defend() can produce.
+
+        ### Returns:
+        ----
+        tuple
+            (lowest, highest) defence stat
+        """
+
+        lowest = highest = self.base_defence
+        for item_type in self.item_types:
+            if self.equipped[item_type] is not None:
+                low, high = self.equipped[item_type].defence_range()
+                lowest += low
+                highest += high
+
+        return (int(lowest), int(highest))
+
     def take_damage(self, damage: float) -> tuple:
         """Applies damage inflicted; if it exceeds remaining health return
         items and gold.
@@ -442,16 +715,15 @@ class Knight():
             returns all items and gold as a tuple (items, gold)
         """
 
-        # Stores gold and all items as tuple
-        gold_lost = int(self.gold / 2)
+        # Stores gold and all items as tuple; integer arithmetic matches
+        # int(gold / 2) without overflowing floats once gold grows large
+        gold_lost = self.gold // 2 if self.gold >= 0 else -(-self.gold // 2)
         forfeit = (self.inventory, gold_lost)
 
         # Reset character health, gold, and inventory
         self.base_health = self.max_health
         self.gold -= gold_lost
-        self.inventory['weapons'] = []
-        self.inventory['shields'] = []
-        self.inventory['armours'] = []
+        self.inventory = Inventory()
 
         # Train to improve for the next combat round
         self.base_speed += 2
@@ -466,39 +738,53 @@ class Knight():
 
         ### Parameters:
         ----
-        loot : dict
-            dictionary containing all items from the loser of the round
+        loot : Inventory
+            inventory containing all items from the loser of the round
         gold : int
             gold from the loser of the round
         """
 
-        # If there are any weapons in the loot bag, adds them to the inventory.
-        if len(loot['weapons']) > 0:
-            self.inventory['weapons'].extend(loot['weapons'])
+        # Moves every item in the loot bag to the inventory
+        self.inventory.transfer(loot)
 
-        # If there are any shields in the loot bag, adds them to the inventory.
-        if len(loot['shields']) > 0:
-            self.inventory['shields'].extend(loot['shields'])
-
-        # If there are any armours in the loot bag, adds them to the inventory.
-        if len(loot['armours']) > 0:
-            self.inventory['armours'].extend(loot['armours'])
+        # Sells the least valuable items if the inventory is over its cap
+        if self.inventory_cap is not None:
+            self.gold += self.inventory.liquidate(self.inventory_cap)
 
         self.gold += gold
 
-    def sell_item(self, index: int, item_type: str):
+    def sell_item(self, item_id: int, item_type: str):
         """Remove an item from the inventory in exchange for gold.
 
         ### Parameters:
         ----
-        index : int
-            index of the item to be sold in the inventory
+        item_id : int
+            id of the item to be sold in the inventory
         item_type: str
             type of item, either weapons, shields, or armours
         """
 
-        self.gold += self.inventory[item_type][index].value
-        self.inventory[item_type].remove(self.inventory[item_type][index])
+        self.gold += self.inventory.remove(item_type, item_id).value
+
+    def sell_below(self, value: int, item_types: list = None) -> int:
+        """Sells every item in the inventory worth less than value.
+
+        ### Parameters:
+        ----
+        value : int
+            items worth less than this are sold
+        item_types : list
+            item types to sell from, every type if None
+
+        ### Returns:
+        ----
+        int
+            gold received
+        """
+
+        gold = self.inventory.sell_below(value, item_types)
+        self.gold += gold
+        return gold
 
     def display_items(self, item_type: str):
         """Displays all items in knight's inventory using a pandas dataframe
@@ -507,7 +793,7 @@ class Knight():
 
         items = []
         # Converts Weapon objects into dictionaries
-        for item in self.inventory[item_type]:
+        for item in self.inventory.items(item_type):
             items.append(item.__dict__)
 
         # Prints title and dataframe for visualization
@@ -526,22 +812,103 @@ class Arena():
         list of knights in the arena queued up to fight
     gold : int
         amount of gold to reward the winner of each round
+    listeners : list
+        callables receiving each combat event as (event: str, data: dict);
+        events are 'exchange' for each attack (before its damage is applied),
+        'knockout' when a knight is knocked out (before the winner is
+        re-equipped), and 'duel' at the end of each fight, each carrying the
+        arena level the fight started at
+    duels : int
+        fights resolved in the arena
+    precheck : bool
+        whether headless fights whose outcome is certain are resolved without
+        rolling any attacks (see predict()); such fights send no 'exchange'
+        events and their 'duel' event is marked 'predicted'
+    predicted_draws : int
+        fights resolved as draws by the precheck
+    predicted_knockouts : int
+        fights resolved as knockouts by the precheck
+    turns_saved : int
+        attacks not rolled thanks to the precheck (the most a predicted
+        knockout could have taken)
+    sparse_upgrades : bool
+        whether winners only equip new items which improve their loadout
+        (see Knight.upgrade()) instead of replacing every item
+    upgrades : int
+        items equipped by winners
+    upgrades_skipped : int
+        items not equipped because they would not improve the loadout
 
     ### Methods:
     ----
+    shop(item_type: str) -> tuple
+        items on sale at the current level and their rendered table
+    add_listener(listener: callable)
+        registers a callable to receive combat events
     add_knight(name: str)
         builds a Knight object to add to the knights attribute
-    fight()
+    fight(display: bool)
         manages combat between first knight (player) and a random other knight
         (opponent)
+    predict(player: Knight, opponent: Knight) -> tuple
+        outcome of a fight if it is certain before any attack is rolled
     """
 
     item_types = ['armours', 'shields', 'weapons']
+    max_rounds = 11
+    precheck = False
+    sparse_upgrades = False
 
     def __init__(self):
         self.level = 0
         self.knights = []
         self.gold = 5
+        self.listeners = []
+        self.duels = 0
+        self.predicted_draws = 0
+        self.predicted_knockouts = 0
+        self.turns_saved = 0
+        self.upgrades = 0
+        self.upgrades_skipped = 0
+
+        # Validate the catalogs before the tournament rather than during it
+        for item_type in self.item_types:
+            loot_table(item_type)
+
+        # Shop stock for _shop_level, rebuilt when the level changes
+        self._shop = {}
+        self._shop_level = None
+
+    def shop(self, item_type: str) -> tuple:
+        """Items on sale at the current level and their rendered table, built
+        once per level.
+
+        ### Parameters:
+        ----
+        item_type : str
+            can be 'weapons', 'shields', or 'armours' - type of item
+
+        ### Returns:
+        ----
+        tuple
+            (templates, table) where templates build the items on sale and
+            table lists them followed by the option to go back
+        """
+
+        if self._shop_level != self.level:
+            self._shop = {}
+            self._shop_level = self.level
+
+        if item_type in self._shop:
+            cache_counters['shop'].hits += 1
+        else:
+            cache_counters['shop'].misses += 1
+            templates = loot_table(item_type).window(self.level)
+            table = item_table([template.item for template in templates])
+            table += f'\n{len(templates)}. Back'
+            self._shop[item_type] = (templates, table)
+
+        return self._shop[item_type]
 
     def add_knight(self, name: str):
         """Builds a Knight object to add to the knights attribute.
@@ -562,9 +929,31 @@ class Arena():
         # Add knight to arena
         self.knights.append(knight)
 
-    def fight(self):
+    def add_listener(self, listener):
+        """Registers a callable to receive combat events.
+
+        ### Parameters:
+        ----
+        listener : callable
+            called with (event: str, data: dict) for each combat event
+        """
+
+        self.listeners.append(listener)
+
+    def _emit(self, event: str, data: dict):
+        """Sends a combat event to every listener."""
+
+        for listener in self.listeners:
+            listener(event, data)
+
+    def fight(self, display: bool = True):
         """Manages combat between first knight (player) and a random other
         knight (opponent).
+
+        ### Parameters:
+        ----
+        display : bool
+            whether combat is displayed, False to run the fight headless
         """
 
         player = self.knights[0]
@@ -572,15 +961,33 @@ class Arena():
         opponent = choice(self.knights[1:])
 
         still_going = True
+        won = False
+        turns = 0
+        level = self.level
         # Combat visual header
-        print('\n' * 10)
-        print('*' * 10)
-        print(f'ROUND {self.level + 1}')
-        print(f'{self.gold} gold in the pot')
-        print('*' * 10)
+        if display:
+            renderer.write(
+                '\n' * 10 + '\n' + '*' * 10 + f'\nROUND {self.level + 1}\n'
+                + f'{self.gold} gold in the pot\n' + '*' * 10
+            )
+            # First display of combat visual
+            display_combat(player, opponent, 'Start!')
+
+        # Resolve headless fights whose outcome is certain without rolling
+        prediction = self.predict(player, opponent) if self.precheck and not display else None
+        if prediction is not None:
+            winner, turns = prediction
+            self.turns_saved += turns
+            still_going = False
+            if winner is None:
+                self.predicted_draws += 1
+            else:
+                self.predicted_knockouts += 1
+                won = True
+                loser = opponent if winner is player else player
+                self._knockout(winner, loser, loser._lose())
+
         timer = 0
-        # First display of combat visual
-        display_combat(player, opponent, 'Start!')
         while still_going:
             # Alternate between who is attacking and who is defending
             for num in [0, 1]:
@@ -591,17 +998,87 @@ class Arena():
                     win, message = self._combat(opponent, player)
 
                 # Display combat visual with status change
-                display_combat(player, opponent, message)
+                turns += 1
+                if display:
+                    display_combat(player, opponent, message)
                 if win:
                     still_going = False
+                    won = True
                     break
 
-            if timer > 9:
+            if timer >= self.max_rounds - 1:
                 still_going = False
-                print('The duel was a draw. Neither side wins!')
+                if display:
+                    renderer.write(draw_message)
 
             timer += 1
 
+        self.duels += 1
+        if self.listeners:
+            self._emit('duel', {
+                'level': level,
+                'player': player,
+                'opponent': opponent,
+                'turns': turns,
+                'result': 'knockout' if won else 'draw',
+                'predicted': prediction is not None
+            })
+
+    def _damage_range(self, attacker: Knight, defender: Knight) -> tuple:
+        """Lowest and highest damage an attack can deal, following the
+        branches of _combat()."""
+
+        attacker._calculate_speed()
+        defender._calculate_speed()
+        lowest, highest = attacker.attack_range()
+
+        # Unblocked attacks deal the full attack, dodged attacks nothing
+        if attacker.speed >= defender.speed * 2:
+            return (lowest, highest)
+        if defender.speed >= attacker.speed * 2:
+            return (0, 0)
+
+        lowest_defence, highest_defence = defender.defence_range()
+        return (max(lowest - highest_defence, 0), max(highest - lowest_defence, 0))
+
+    def predict(self, player: Knight, opponent: Knight) -> tuple:
+        """Outcome of a fight if it is certain before any attack is rolled:
+        a draw if neither knight can deal damage, or a knockout if only one
+        knight can deal damage and every one of its attacks deals enough to
+        knock out the other within max_rounds.
+
+        ### Parameters:
+        ----
+        player : Knight
+            knight attacking first
+        opponent : Knight
+            knight attacking second
+
+        ### Returns:
+        ----
+        tuple
+            (winner, turns) where winner is None for a draw and turns is the
+            number of attacks the fight would take (at most, for a
+            knockout), or None if the outcome is not certain
+        """
+
+        player_damage = self._damage_range(player, opponent)
+        opponent_damage = self._damage_range(opponent, player)
+        if player_damage[1] <= 0 and opponent_damage[1] <= 0:
+            return (None, self.max_rounds * 2)
+
+        # A one-sided fight where every attack lands
+        for winner, loser, damage, other, first in [
+            (player, opponent, player_damage, opponent_damage, True),
+            (opponent, player, opponent_damage, player_damage, False)
+        ]:
+            if other[1] <= 0 and damage[0] > 0:
+                attacks = -(-loser.base_health // damage[0])
+                if attacks <= self.max_rounds:
+                    return (winner, attacks * 2 - (1 if first else 0))
+
+        return None
+
     def _combat(self, attacker: Knight, defender: Knight) -> tuple:
         """Manages each combat between an attacker and a defender.
 
@@ -622,53 +1099,112 @@ class Arena():
         attack_speed, attack_damage = attacker.attack()
         defend_speed, defend_defence = defender.defend()
 
-        loot = None
+        damage = 0
         # Account for greater attacker speed
         if attack_speed >= defend_speed * 2:
-            loot = defender.take_damage(attack_damage)
-            message = f'{defender.name} wasn\'t fast enough and couldn\'t block'
-            message += f' {attacker.name}\'s attack! {attack_damage} damage delt.'
+            branch = 'unblocked'
+            damage = attack_damage
 
         # Account for greater defender speed
         elif defend_speed >= attack_speed * 2:
-            message = f'{defender.name} was too fast and successfully'
-            message += f' dodged {attacker.name}\'s attack! 0 damage delt.'
+            branch = 'dodged'
 
         # Standard skirmish - attacker lands a blow
         elif attack_damage > defend_defence:
-            loot = defender.take_damage(attack_damage - defend_defence)
-            message = f'{defender.name} was able to block {attacker.name}\'s'
-            message += f' attack! {attack_damage - defend_defence} damage made it through.'
+            branch = 'blocked'
+            damage = attack_damage - defend_defence
 
         # Standard skirmish - attacker blocked successfully
         elif defend_defence >= attack_damage:
-            message = f'{defender.name} was able to completely block'
-            message += f' {attacker.name}\'s attack! 0 damage delt.'
+            branch = 'absorbed'
+
+        message = combat_message(branch, attacker.name, defender.name, damage)
+
+        if self.listeners:
+            self._emit('exchange', {
+                'level': self.level,
+                'attacker': attacker,
+                'defender': defender,
+                'attack_speed': attack_speed,
+                'defend_speed': defend_speed,
+                'attack': attack_damage,
+                'defence': defend_defence,
+                'branch': branch,
+                'damage': damage,
+                'health': defender.base_health
+            })
+
+        # Apply the damage of a landed blow
+        loot = None
+        if branch in ('unblocked', 'blocked'):
+            loot = defender.take_damage(damage)
 
         if loot is not None:
             # Generate display message
-            message = f'{defender.name} was knocked out! {attacker.name} WON!!'
+            message = combat_message('knockout', attacker.name, defender.name, damage)
+            self._knockout(attacker, defender, loot)
 
-            # Distribute loot from defender to attacker
-            attacker.win(loot[0], loot[1])
-            attacker.gold += self.gold
-
-            # Increment level
-            self.level += 1
+        return ((loot is not None), message)
 
-            # Re-equip attacker with better equipment
+    def _knockout(self, attacker: Knight, defender: Knight, loot: tuple, clamp: bool = False,
+                  requeue: bool = True):
+        """Rewards the winner of a knockout, moves the loser to the end of
+        the queue, and grows the pot. With clamp, the winner is re-equipped
+        within each catalog's levels (see _re_equip()). Without requeue, the
+        caller moves the loser, such as a round moving all its losers at
+        once."""
+
+        # Distribute loot from defender to attacker
+        attacker.win(loot[0], loot[1])
+        attacker.gold += self.gold
+
+        # Increment level
+        level = self.level
+        self.level += 1
+
+        # Move defender to end of list of knights
+        if requeue and defender != self.knights[0]:
+            self.knights.remove(defender)
+            self.knights.append(defender)
+
+        # Increment gold pool; integer arithmetic matches
+        # int(pot + pot * 1.25) without overflowing floats in long rounds
+        pot = self.gold
+        self.gold = self.gold + self.gold * 5 // 4
+
+        if self.listeners:
+            self._emit('knockout', {
+                'level': level,
+                'winner': attacker,
+                'loser': defender,
+                'gold': loot[1],
+                'pot': pot,
+                'new_pot': self.gold
+            })
+
+        # Re-equip attacker with better equipment
+        self._re_equip(attacker, self.level, clamp)
+
+    def _re_equip(self, knight: Knight, level: int, clamp: bool = False):
+        """Equips the winner of a knockout with items of level, replacing
+        every item or, with sparse_upgrades, only those which improve the
+        loadout. With clamp, the level is kept within each catalog."""
+
+        if not self.sparse_upgrades:
             for item_type in self.item_types:
-                attacker.equip_item(generate_item(self.level, item_type), item_type)
+                if clamp:
+                    item_level = min(level, max(loot_table(item_type).windows))
+                else:
+                    item_level = level
+                knight.equip_item(generate_item(item_level, item_type), item_type)
+            return
 
-            # Move defender to end of list of knights
-            if defender != self.knights[0]:
-                self.knights.remove(defender)
-                self.knights.append(defender)
+        swaps = knight.upgrade(draw_templates(level, self.item_types, clamp))
+        self.upgrades += swaps
+        self.upgrades_skipped += len(self.item_types) - swaps
 
-            # Increment gold pool
-            self.gold = int(self.gold + self.gold * 1.25)
 
-        return ((loot is not None), message)
+item_classes = {'weapons': Weapon, 'shields': Shield, 'armours': Armour}
 
 
 def display_combat(player: Knight, opponent: Knight, message: str):
@@ -680,39 +1216,29 @@ def display_combat(player: Knight, opponent: Knight, message: str):
         knight representing the player
     opponent : Knight
         knight opposing the player
+    message : str
+        status of the combat
     """
 
-    print('\n' * 3)
+    # Compose the whole frame and draw it in a single write
+    renderer.draw(combat_frame(player, opponent, message))
 
-    # Player information
-    display_name = f'Player: {player.name}'
-    display_name += ' ' * (30 - len(player.name))
-    display_name += f'Gold: {player.gold}'
-    print(display_name)
-    print(f'Health: {player.base_health} / {player.max_health}')
+    # Keep display fixed on screen for 3 seconds
+    sleep(3)
 
-    # Player health bar
-    health_bar = int(player.base_health / player.max_health * 50)
-    print(' ' * (50 - health_bar) + '=' * health_bar)
 
-    # Combat stage information
-    print()
-    print(message)
-    print()
+def _expected(item) -> tuple:
+    """Expected attack, expected defence, and weight of an equipped item,
+    read from its template's cache if it has one, or zeros for an empty
+    slot."""
 
-    # Opponent information
-    display_name = f'Opponent: {opponent.name}'
-    display_name += ' ' * (30 - len(opponent.name))
-    display_name += f'Gold: {opponent.gold}'
-    print(display_name)
-    print(f'Health: {opponent.base_health} / {opponent.max_health}')
+    if item is None:
+        return (0, 0, 0)
+    if item.template is not None:
+        return (item.template.expected_attack, item.template.expected_defence, item.weight)
 
-    # Opponent health bar
-    health_bar = int(opponent.base_health / opponent.max_health * 50)
-    print(' ' * (50 - health_bar) + '=' * health_bar)
+    return (item.expected_attack(), item.expected_defence(), item.weight)
 
-    # Keep display fixed on screen for 3 seconds
-    sleep(3)
 
 def load_file(file_name: str) -> list:
     """Loads json file to product a list of dictionaries representing
@@ -733,6 +1259,129 @@ def load_file(file_name: str) -> list:
     with open(file_path, mode='r+', encoding='utf-8') as file:
         return json.load(file)
 
+def _mapped_catalog(file_name: str) -> MappedCatalog:
+    """Compiled catalog for file_name, None if it is missing, older than the
+    json file (if there is one), or compiled with another layout."""
+
+    json_path = root_dir + file_name + '.json'
+    bin_path = root_dir + file_name + '.bin'
+
+    if file_name in _mapped_catalogs:
+        cache_counters['compiled_catalogs'].hits += 1
+    else:
+        cache_counters['compiled_catalogs'].misses += 1
+        mapped = None
+        if os.path.exists(bin_path) and (
+            not os.path.exists(json_path) or os.path.getmtime(bin_path) >= os.path.getmtime(json_path)
+        ):
+            try:
+                mapped = MappedCatalog(bin_path)
+            except ValueError:
+                mapped = None
+        _mapped_catalogs[file_name] = mapped
+
+    return _mapped_catalogs[file_name]
+
+def load_catalog(file_name: str) -> list:
+    """Loads all serialized equipment of a catalog, reading the compiled
+    catalog if one is available.
+
+    ### Parameters:
+    ----
+    file_name : str
+        name of file to be loaded
+
+    ### Returns:
+    ----
+    list
+        list of dictionaries representing serialized equipment
+    """
+
+    mapped = _mapped_catalog(file_name)
+    if mapped is not None:
+        return [mapped.item(index) for index in range(len(mapped))]
+
+    return load_file(file_name)
+
+def load_level_range(file_name: str, lower: int, upper: int) -> list:
+    """Loads the serialized equipment with a level between lower and upper,
+    reading the compiled catalog if one is available.
+
+    ### Parameters:
+    ----
+    file_name : str
+        name of file to be loaded
+    lower : int
+        lowest level to include
+    upper : int
+        highest level to include
+
+    ### Returns:
+    ----
+    list
+        list of dictionaries representing serialized equipment
+    """
+
+    mapped = _mapped_catalog(file_name)
+    if mapped is not None:
+        return mapped.items(lower, upper)
+
+    return [item for item in load_file(file_name) if lower <= item['level'] <= upper]
+
+def use_catalogs(directory: str = None):
+    """Reads the catalogs from another directory, dropping cached catalogs
+    and loot tables so the next items are generated from the new catalogs.
+
+    ### Parameters:
+    ----
+    directory : str
+        directory holding armours, shields, and weapons serialized values,
+        the package directory if None
+    """
+
+    global root_dir
+    if directory is None:
+        directory = os.path.dirname(os.path.abspath(__file__))
+    root_dir = os.path.join(os.path.abspath(directory), '')
+
+    # Loot tables read the mapped catalogs, so they are dropped first
+    _loot_tables.clear()
+    for mapped in _mapped_catalogs.values():
+        if mapped is not None:
+            mapped.close()
+    _mapped_catalogs.clear()
+
+def loot_table(item_type: str) -> LootTable:
+    """Weighted loot table for an item type, built from the validated catalog
+    the first time it is needed. A compiled catalog is read through its
+    memory map, and only the entries drawn are built into templates.
+
+    ### Parameters:
+    ----
+    item_type : str
+        type of item in the loot table
+
+    ### Returns:
+    ----
+    LootTable
+        loot table for the item type
+
+    ### Raises:
+    ----
+    CatalogError
+        if the catalog contains invalid entries or level gaps
+    """
+
+    if item_type in _loot_tables:
+        cache_counters['loot_tables'].hits += 1
+    else:
+        cache_counters['loot_tables'].misses += 1
+        mapped = _mapped_catalog(item_type)
+        entries = mapped if mapped is not None else load_file(item_type)
+        _loot_tables[item_type] = compile_loot_table(entries, item_type, item_classes[item_type])
+
+    return _loot_tables[item_type]
+
 def generate_item(level: int, item_type: str) -> Equipment:
     """Generate a piece of equipment based on the level of the arena and type
     of weapon.
@@ -750,27 +1399,34 @@ def generate_item(level: int, item_type: str) -> Equipment:
         piece of equipment produced within 1 level of arena level
     """
 
-    keep = []
-    # Get all items belonging to item type within 1 level of arena level
-    for item in load_file(item_type):
-        if item['level'] in [level - 1, level, level + 1]:
-            keep.append(item)
+    # Randomly choose one of the items within 1 level of arena level,
+    # weighted by drop weight, and copy its pre-built template
+    return loot_table(item_type).draw(level, random()).build()
 
-    # Randomly choose one of the items selected
-    item = choice(keep)
-    item.pop('level')
+def draw_templates(level: int, item_types: list, clamp: bool = False) -> dict:
+    """Draw a catalog template of each item type without building the
+    items, using the same random numbers as generate_item() for each type in
+    turn.
 
-    # Generate weapon
-    equipmt = None
-    if item_type == 'weapons':
-        equipmt = Weapon(**item)
+    ### Parameters:
+    ----
+    level : int
+        level of the arena's loot pool
+    item_types : list
+        types of item to draw
+    clamp : bool
+        whether the level is kept within each catalog
 
-    # Generate shield
-    elif item_type == 'shields':
-        equipmt = Shield(**item)
+    ### Returns:
+    ----
+    dict
+        template drawn for each item type
+    """
 
-    # Generate armour
-    elif item_type == 'armours':
-        equipmt = Armour(**item)
+    templates = {}
+    for item_type in item_types:
+        table = loot_table(item_type)
+        item_level = min(level, max(table.windows)) if clamp else level
+        templates[item_type] = table.draw(item_level, random())
 
-    return equipmt
+    return templates
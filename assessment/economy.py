@@ -0,0 +1,259 @@
+"""Model of the gold economy of a tournament, without running any combat.
+
+Only the gold rules of the arena are modelled: every fight is between the
+player (who always stays first in Arena.knights) and a random opponent, and
+ends in a knockout with probability knockout_rate, won by the player with
+probability win_rate. On a knockout the loser gives up part of their purse
+(half, see Knight._lose()) and the winner takes it along with the pot, which
+then grows by the pot multiplier (see Arena._combat()). Before each fight
+the player can spend gold on healing (see menu.heal_damage()) and items.
+
+The gold of every knight after a number of fights can be found in two ways:
+Economy.simulate() plays many tournaments at once as numpy array operations,
+and Economy.expected() propagates the expected gold of every knight for each
+possible number of knockouts, which gives exact expectations (apart from
+rounding and capped spending) in a single pass.
+
+### Classes
+----
+Economy(multiplier : float, purse_share : float, heal_price : float, healing : float, shop_spend : float, pot : int, max_level : int)
+    gold rules of a tournament
+
+### Functions
+----
+fight_rates(arena : Arena, duels : int, seed : int) -> tuple
+    knockout and win rates of the player against the rest of an arena
+"""
+
+# Import dependencies
+from assessment import numpy, sys
+from assessment.classes import Arena
+from assessment.engine import encode_knights, repeat, run_duels
+
+
+class Economy():
+    """Gold rules of a tournament, defaulting to those of the game.
+
+    ### Attributes:
+    ----
+    multiplier : float
+        growth of the pot after each knockout, as a fraction of the pot
+    purse_share : float
+        share of the loser's gold taken by the winner
+    heal_price : float
+        gold per health point healed
+    healing : float
+        health points the player heals before each fight
+    shop_spend : float
+        gold the player spends on items before each fight
+    pot : int
+        gold in the pot at the start of the tournament
+    max_level : int
+        knockouts after which the tournament ends, None to never end
+
+    ### Methods:
+    ----
+    simulate(gold: list, fights: int, knockout_rate: float, win_rate: float, runs: int, seed: int) -> tuple
+        plays many tournaments at once
+    expected(gold: list, fights: int, knockout_rate: float, win_rate: float) -> tuple
+        expected gold of every knight and of the pot
+    """
+
+    def __init__(self, multiplier: float = 1.25, purse_share: float = 0.5, heal_price: float = 1,
+                 healing: float = 0, shop_spend: float = 0, pot: int = 5, max_level: int = 8):
+        self.multiplier = multiplier
+        self.purse_share = purse_share
+        self.heal_price = heal_price
+        self.healing = healing
+        self.shop_spend = shop_spend
+        self.pot = pot
+        self.max_level = max_level
+
+    def _spending(self) -> float:
+        """Gold the player spends before each fight."""
+
+        return self.heal_price * self.healing + self.shop_spend
+
+    def _pots(self, levels: int) -> numpy.ndarray:
+        """Gold in the pot after each number of knockouts."""
+
+        pots = [self.pot]
+        for _ in range(levels):
+            pots.append(int(pots[-1] + pots[-1] * self.multiplier))
+
+        return numpy.array(pots, dtype=float)
+
+    def simulate(self, gold: list, fights: int, knockout_rate: float, win_rate: float,
+                 runs: int = 10000, seed: int = None) -> tuple:
+        """Plays many tournaments at once, one per row of the arrays.
+
+        ### Parameters:
+        ----
+        gold : list
+            starting gold of each knight, the player first
+        fights : int
+            number of fights in each tournament
+        knockout_rate : float
+            probability of a fight ending in a knockout
+        win_rate : float
+            probability of the player winning a knockout
+        runs : int
+            number of tournaments
+        seed : int
+            seed for the random number generator
+
+        ### Returns:
+        ----
+        tuple
+            (gold, pot) arrays with the gold of each knight, shaped
+            (runs, knights), and the gold left in the pot, shaped (runs,)
+        """
+
+        rng = numpy.random.default_rng(seed)
+        knights = len(gold)
+        gold = numpy.tile(numpy.asarray(gold, dtype=float), (runs, 1))
+        pot = numpy.full(runs, float(self.pot))
+        levels = numpy.zeros(runs, dtype=numpy.int64)
+        spending = self._spending()
+
+        for _ in range(fights):
+            active = levels < self.max_level if self.max_level is not None else numpy.ones(runs, dtype=bool)
+
+            # The player heals and shops while they can afford it
+            if spending:
+                gold[:, 0] -= numpy.where(active, numpy.minimum(gold[:, 0], spending), 0)
+
+            rows = numpy.flatnonzero(active & (rng.random(runs) < knockout_rate))
+            opponent = rng.integers(1, knights, len(rows))
+            won = rng.random(len(rows)) < win_rate
+            winner = numpy.where(won, 0, opponent)
+            loser = numpy.where(won, opponent, 0)
+
+            # Same rounding as Knight._lose() and Arena._combat()
+            lost = numpy.floor(gold[rows, loser] * self.purse_share)
+            gold[rows, loser] -= lost
+            gold[rows, winner] += lost + pot[rows]
+            pot[rows] = numpy.floor(pot[rows] + pot[rows] * self.multiplier)
+            levels[rows] += 1
+
+        return gold, pot
+
+    def expected(self, gold: list, fights: int, knockout_rate: float, win_rate: float) -> tuple:
+        """Expected gold of every knight and of the pot. The gold rules are
+        linear in gold, so expectations are propagated exactly for each
+        number of knockouts; only the rounding of purses and the cap on the
+        player's spending are approximated.
+
+        ### Parameters:
+        ----
+        gold : list
+            starting gold of each knight, the player first
+        fights : int
+            number of fights in the tournament
+        knockout_rate : float
+            probability of a fight ending in a knockout
+        win_rate : float
+            probability of the player winning a knockout
+
+        ### Returns:
+        ----
+        tuple
+            (gold, pot) with the expected gold of each knight as an array and
+            the expected gold left in the pot
+        """
+
+        knights = len(gold)
+        levels = fights if self.max_level is None else min(fights, self.max_level)
+        pots = self._pots(levels)
+        share = self.purse_share
+        spending = self._spending()
+
+        # Chance of each number of knockouts, and each knight's gold
+        # weighted by that chance
+        chance = numpy.zeros(levels + 1)
+        chance[0] = 1
+        weighted = numpy.zeros((levels + 1, knights))
+        weighted[0] = gold
+
+        # Fights only continue below the last level
+        active = numpy.ones(levels + 1)
+        if self.max_level is not None and levels == self.max_level:
+            active[-1] = 0
+
+        player_wins = knockout_rate * win_rate / (knights - 1)
+        player_loses = knockout_rate * (1 - win_rate) / (knights - 1)
+        for _ in range(fights):
+            if spending:
+                weighted[:, 0] -= numpy.minimum(weighted[:, 0], spending * chance * active)
+
+            # Gold moved by a knockout against each opponent
+            paid = (pots * chance)[:, None]
+            knocked = numpy.zeros_like(weighted)
+            for opponent in range(1, knights):
+                won = weighted.copy()
+                won[:, 0] += share * weighted[:, opponent] + paid[:, 0]
+                won[:, opponent] -= share * weighted[:, opponent]
+                lost = weighted.copy()
+                lost[:, opponent] += share * weighted[:, 0] + paid[:, 0]
+                lost[:, 0] -= share * weighted[:, 0]
+                knocked += player_wins * won + player_loses * lost
+
+            # Draws keep the level, knockouts move up one level
+            stay = 1 - knockout_rate * active
+            new_weighted = weighted * stay[:, None]
+            new_weighted[1:] += (knocked * active[:, None])[:-1]
+            new_chance = chance * stay
+            new_chance[1:] += (chance * knockout_rate * active)[:-1]
+            weighted, chance = new_weighted, new_chance
+
+        return weighted.sum(axis=0), float((chance * pots).sum())
+
+
+def fight_rates(arena, duels: int = 500, seed: int = None) -> tuple:
+    """Knockout and win rates of the player against the rest of an arena,
+    estimated with the batched duel engine for the knights as they are now.
+
+    ### Parameters:
+    ----
+    arena : Arena
+        arena whose first knight is the player
+    duels : int
+        number of duels simulated against each opponent
+    seed : int
+        seed for the random number generator
+
+    ### Returns:
+    ----
+    tuple
+        (knockout_rate, win_rate) where win_rate is the player's share of
+        the knockouts
+    """
+
+    opponents = arena.knights[1:]
+    player = repeat(encode_knights([arena.knights[0]]), len(opponents) * duels)
+    opponent = repeat(encode_knights(opponents), duels)
+    outcome, _ = run_duels(player, opponent, numpy.random.default_rng(seed))
+
+    knockouts = (outcome != 0).sum()
+    win_rate = (outcome == 1).sum() / knockouts if knockouts else 0.5
+
+    return float(knockouts / len(outcome)), float(win_rate)
+
+
+# Compare both models for a tournament of the game if run directly
+if __name__ == '__main__':
+    fights = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    arena = Arena()
+    for num in range(8):
+        arena.add_knight(f'Knight {num}')
+    knockout_rate, win_rate = fight_rates(arena, seed=0)
+    economy = Economy()
+    gold = [knight.gold for knight in arena.knights]
+
+    simulated, simulated_pot = economy.simulate(gold, fights, knockout_rate, win_rate, seed=0)
+    expected, expected_pot = economy.expected(gold, fights, knockout_rate, win_rate)
+    print(f'Knockout rate {knockout_rate:.3f}, player win rate {win_rate:.3f}, {fights} fights::')
+    print('{:<12}{:>14}{:>14}'.format('knight', 'simulated', 'expected'))
+    for num, knight in enumerate(arena.knights):
+        print('{:<12}{:>14.1f}{:>14.1f}'.format(knight.name, simulated[:, num].mean(), expected[num]))
+    print('{:<12}{:>14.1f}{:>14.1f}'.format('pot', simulated_pot.mean(), expected_pot))
@@ -0,0 +1,455 @@
+"""Batched duel engine which resolves many duels at once as numpy array
+operations, without displaying combat.
+
+Knights are encoded as a dictionary of arrays (one row per duel) holding
+their base stats and a table of the values each equipped item can roll for
+attack and defence. Every exchange follows the same branches as
+Arena._combat(), Knight.attack(), Knight.defend(), and the attack() and
+defend() methods of the equipment classes.
+
+Duels can also be resolved by a loop over plain numeric arrays, one duel per
+row of a block of random numbers, which numba compiles when it is installed.
+backend tells which is in use: with 'numba', play_duels() (and so every
+caller, such as rounds.py and economy.py) and kernel.resolve_duels() run the
+compiled loop, otherwise they keep their numpy and Python paths, as the loop
+run as plain Python is slower than either.
+
+### Functions
+----
+encode_item(item : Equipment) -> tuple
+    values an item can roll for attack and defence
+encode_knights(knights : list) -> dict
+    encodes knights as arrays with one row per knight
+repeat(encoded : dict, count : int) -> dict
+    repeats each row of encoded knights
+concat(encoded : list) -> dict
+    joins encoded knights into a single set of rows
+speeds(encoded : dict) -> numpy.ndarray
+    speed stat of encoded knights
+run_duels(player : dict, opponent : dict, rng : numpy.random.Generator) -> tuple
+    resolves a duel between each row of the player and opponent arrays
+play_duels(player : dict, opponent : dict, rng : numpy.random.Generator, compiled : bool) -> tuple
+    resolves the duels of run_duels() and also returns the health left
+kernel_arrays(player : dict, opponent : dict) -> tuple
+    arrays of encoded knights used by the duel loop
+run_kernel(arrays : tuple, rolls : numpy.ndarray) -> tuple
+    resolves one duel per row of rolls with the duel loop
+
+### Parameters:
+----
+max_rounds
+    number of rounds before a duel is declared a draw (see Arena.fight())
+stats
+    base stats stored for each encoded knight
+rolls
+    item values stored for each encoded knight
+backend
+    'numba' if the duel loop is compiled, 'python' otherwise
+kernel_chunk
+    most duels given random numbers at once by the compiled path of
+    play_duels()
+"""
+
+# Import dependencies
+from assessment import numpy, numba, sqrt
+from assessment.classes import Weapon
+
+max_rounds = 11
+stats = ['health', 'max_health', 'damage', 'defence', 'base_speed', 'weight']
+rolls = [
+    'attack_crit', 'attack_fail', 'attack_low', 'attack_span',
+    'defence_crit', 'defence_fail', 'defence_low', 'defence_span'
+]
+kernel_chunk = 4096
+
+
+def encode_item(item) -> tuple:
+    """Values an item can roll for attack and defence.
+
+    ### Parameters:
+    ----
+    item : Equipment
+        item to be encoded, None for an empty slot
+
+    ### Returns:
+    ----
+    tuple
+        (attack_crit, attack_fail, attack_low, attack_span, defence_crit,
+        defence_fail, defence_low, defence_span) where a standard roll is
+        low + span * random()
+    """
+
+    if item is None:
+        return (0, 0, 0, 0, 0, 0, 0, 0)
+
+    root = sqrt(item.weight)
+    # Weapons take the critical failure branch on any roll above 0.1
+    if isinstance(item, Weapon):
+        attack_fail = item.min_stat * 1.5 / root
+        defence_fail = item.min_stat * 0.5 * item.weight / 100
+        return (
+            item.max_stat * 3.5 / root, attack_fail, attack_fail, 0,
+            item.max_stat * 1.5 * item.weight / 100, defence_fail, defence_fail, 0
+        )
+
+    return (
+        item.max_stat / root, 0, item.min_stat / root, 0,
+        item.max_stat * 2.5 * item.weight / 50, 0,
+        item.min_stat * item.weight / 50, (item.max_stat - item.min_stat) * item.weight / 50
+    )
+
+
+def encode_knights(knights: list) -> dict:
+    """Encodes knights as arrays with one row per knight.
+
+    ### Parameters:
+    ----
+    knights : list
+        knights to be encoded
+
+    ### Returns:
+    ----
+    dict
+        arrays of shape (knights,) for each stat and (knights, slots) for
+        each roll
+    """
+
+    encoded = {
+        'health': [knight.base_health for knight in knights],
+        'max_health': [knight.max_health for knight in knights],
+        'damage': [knight.base_damage for knight in knights],
+        'defence': [knight.base_defence for knight in knights],
+        'base_speed': [knight.base_speed for knight in knights],
+        'weight': [knight.weight for knight in knights],
+    }
+    encoded = {key: numpy.array(value, dtype=float) for key, value in encoded.items()}
+
+    # Table of item values with shape (knights, slots, rolls)
+    table = numpy.array([
+        [encode_item(knight.equipped[item_type]) for item_type in knight.item_types]
+        for knight in knights
+    ], dtype=float).reshape(len(knights), -1, len(rolls))
+    for num, roll in enumerate(rolls):
+        encoded[roll] = table[:, :, num]
+
+    return encoded
+
+
+def repeat(encoded: dict, count: int) -> dict:
+    """Repeats each row of encoded knights.
+
+    ### Parameters:
+    ----
+    encoded : dict
+        encoded knights
+    count : int
+        number of times each row is repeated
+
+    ### Returns:
+    ----
+    dict
+        encoded knights with count rows for each original row
+    """
+
+    return {key: numpy.repeat(value, count, axis=0) for key, value in encoded.items()}
+
+
+def concat(encoded: list) -> dict:
+    """Joins encoded knights into a single set of rows.
+
+    ### Parameters:
+    ----
+    encoded : list
+        encoded knights to be joined
+
+    ### Returns:
+    ----
+    dict
+        encoded knights containing the rows of each entry in order
+    """
+
+    return {key: numpy.concatenate([entry[key] for entry in encoded]) for key in encoded[0]}
+
+
+def speeds(encoded: dict) -> numpy.ndarray:
+    """Speed stat of encoded knights (see Knight._calculate_speed()).
+
+    ### Parameters:
+    ----
+    encoded : dict
+        encoded knights
+
+    ### Returns:
+    ----
+    numpy.ndarray
+        speed of each row
+    """
+
+    weight = encoded['weight']
+    root = numpy.sqrt(numpy.where(weight > 0, weight, 1))
+    return numpy.where(weight > 0, numpy.floor(encoded['base_speed'] ** 2 / root), encoded['base_speed'])
+
+
+def _roll(encoded: dict, prefix: str, rows: numpy.ndarray, rng) -> numpy.ndarray:
+    """Rolls the combined attack or defence stat for the selected rows."""
+
+    crit = encoded[prefix + '_crit'][rows]
+    rand = rng.random(crit.shape)
+    standard = encoded[prefix + '_low'][rows] + encoded[prefix + '_span'][rows] * rng.random(crit.shape)
+    value = numpy.where(rand <= 0.1, crit, numpy.where(rand >= 0.9, encoded[prefix + '_fail'][rows], standard))
+    base = encoded['damage' if prefix == 'attack' else 'defence'][rows]
+
+    return numpy.floor(base + value.sum(axis=1))
+
+
+def _exchange(attacker: dict, defender: dict, attack_speed, defend_speed, health,
+              rows: numpy.ndarray, rng) -> numpy.ndarray:
+    """Resolves one attack for the selected rows, updating the defender's
+    health, and returns the rows in which the defender was knocked out."""
+
+    attack = _roll(attacker, 'attack', rows, rng)
+    defence = _roll(defender, 'defence', rows, rng)
+    attack_speed = attack_speed[rows]
+    defend_speed = defend_speed[rows]
+
+    # Same branches as Arena._combat()
+    damage = numpy.where(
+        attack_speed >= defend_speed * 2, attack,
+        numpy.where(defend_speed >= attack_speed * 2, 0, numpy.maximum(attack - defence, 0))
+    )
+    knocked_out = damage >= health[rows]
+    health[rows] = numpy.where(knocked_out, health[rows], health[rows] - damage)
+
+    return rows[knocked_out]
+
+
+def run_duels(player: dict, opponent: dict, rng) -> tuple:
+    """Resolves a duel between each row of the player and opponent arrays.
+
+    ### Parameters:
+    ----
+    player : dict
+        encoded knights attacking first
+    opponent : dict
+        encoded knights attacking second, same number of rows as player
+    rng : numpy.random.Generator
+        random number generator for every roll
+
+    ### Returns:
+    ----
+    tuple
+        (outcome, turns) arrays where outcome is 1 if the player won, -1 if
+        the opponent won, and 0 for a draw, and turns is the number of
+        attacks made
+    """
+
+    outcome, turns, _, _ = play_duels(player, opponent, rng)
+    return (outcome, turns)
+
+
+def play_duels(player: dict, opponent: dict, rng, compiled: bool = None) -> tuple:
+    """Resolves the duels of run_duels() and also returns the health left
+    to each knight.
+
+    ### Parameters:
+    ----
+    player : dict
+        encoded knights attacking first
+    opponent : dict
+        encoded knights attacking second, same number of rows as player
+    rng : numpy.random.Generator
+        random number generator for every roll
+    compiled : bool
+        whether the duel loop is used instead of numpy array operations,
+        only if backend is 'numba' when None
+
+    ### Returns:
+    ----
+    tuple
+        (outcome, turns, player_health, opponent_health) arrays, where the
+        health of a knocked out knight is the health it had before the final
+        blow
+    """
+
+    if compiled is None:
+        compiled = backend == 'numba'
+    if compiled:
+        return _play_compiled(player, opponent, rng)
+
+    count = len(player['health'])
+    outcome = numpy.zeros(count, dtype=int)
+    turns = numpy.zeros(count, dtype=int)
+    player_health = player['health'].copy()
+    opponent_health = opponent['health'].copy()
+    player_speed = speeds(player)
+    opponent_speed = speeds(opponent)
+
+    rows = numpy.arange(count)
+    for _ in range(max_rounds):
+        # Player attacks
+        turns[rows] += 1
+        won = _exchange(player, opponent, player_speed, opponent_speed, opponent_health, rows, rng)
+        outcome[won] = 1
+        rows = rows[outcome[rows] == 0]
+
+        # Opponent attacks
+        turns[rows] += 1
+        won = _exchange(opponent, player, opponent_speed, player_speed, player_health, rows, rng)
+        outcome[won] = -1
+        rows = rows[outcome[rows] == 0]
+
+        if len(rows) == 0:
+            break
+
+    return (outcome, turns, player_health, opponent_health)
+
+
+def _duel_batch(speed, base, items, health, rolls, outcome, turns):
+    """Resolves one duel per row of rolls, writing outcome, turns, and the
+    remaining health of each duel in place.
+
+    speed has shape (duels, 2), base (duels, 2, 2) holding damage and
+    defence, items (duels, 2, slots, 8) holding the values of encode_item(),
+    health (duels, 2) holding the starting health, and rolls (duels, width)
+    with enough random numbers for every attack of a duel.
+    """
+
+    for duel in range(rolls.shape[0]):
+        cursor = 0
+        outcome[duel] = 0
+        for turn in range(max_rounds * 2):
+            attacker = turn % 2
+            defender = 1 - attacker
+            turns[duel] = turn + 1
+
+            # Combined attack stat, same branches as the items' attack()
+            attack = base[duel, attacker, 0]
+            for slot in range(items.shape[2]):
+                roll = rolls[duel, cursor]
+                cursor += 1
+                if roll <= 0.1:
+                    attack += items[duel, attacker, slot, 0]
+                elif roll >= 0.9:
+                    attack += items[duel, attacker, slot, 1]
+                else:
+                    attack += items[duel, attacker, slot, 2] + items[duel, attacker, slot, 3] * rolls[duel, cursor]
+                    cursor += 1
+            attack = float(int(attack))
+
+            # Combined defence stat, same branches as the items' defend()
+            defence = base[duel, defender, 1]
+            for slot in range(items.shape[2]):
+                roll = rolls[duel, cursor]
+                cursor += 1
+                if roll <= 0.1:
+                    defence += items[duel, defender, slot, 4]
+                elif roll >= 0.9:
+                    defence += items[duel, defender, slot, 5]
+                else:
+                    defence += items[duel, defender, slot, 6] + items[duel, defender, slot, 7] * rolls[duel, cursor]
+                    cursor += 1
+            defence = float(int(defence))
+
+            # Same branches as Arena._combat()
+            damage = 0.0
+            hit = False
+            if speed[duel, attacker] >= speed[duel, defender] * 2:
+                damage = attack
+                hit = True
+            elif speed[duel, defender] >= speed[duel, attacker] * 2:
+                hit = False
+            elif attack > defence:
+                damage = attack - defence
+                hit = True
+
+            # Same as Knight.take_damage()
+            if hit:
+                if damage < health[duel, defender]:
+                    health[duel, defender] -= damage
+                else:
+                    outcome[duel] = 1 if attacker == 0 else -1
+                    break
+
+
+if numba is not None:
+    backend = 'numba'
+    _duel_kernel = numba.njit(cache=True)(_duel_batch)
+else:
+    backend = 'python'
+    _duel_kernel = _duel_batch
+
+
+def kernel_arrays(player: dict, opponent: dict) -> tuple:
+    """Arrays of encoded knights used by the duel loop.
+
+    ### Parameters:
+    ----
+    player : dict
+        encoded knights attacking first
+    opponent : dict
+        encoded knights attacking second, same number of rows as player
+
+    ### Returns:
+    ----
+    tuple
+        (speed, base, items, health) arrays with the player of each duel
+        first along axis 1
+    """
+
+    knights = [player, opponent]
+    speed = numpy.stack([speeds(knight) for knight in knights], axis=1)
+    base = numpy.stack([numpy.stack([knight['damage'], knight['defence']], axis=1) for knight in knights], axis=1)
+    items = numpy.stack([numpy.stack([knight[roll] for roll in rolls], axis=2) for knight in knights], axis=1)
+    health = numpy.stack([knight['health'] for knight in knights], axis=1)
+
+    return speed, base, items, health
+
+
+def run_kernel(arrays: tuple, block: numpy.ndarray) -> tuple:
+    """Resolves one duel per row of block with the duel loop, compiled if
+    backend is 'numba'. A duel uses its row's random numbers in the same
+    order as kernel.Duel, so both give the same result for the same row.
+
+    ### Parameters:
+    ----
+    arrays : tuple
+        (speed, base, items, health) arrays from kernel_arrays()
+    block : numpy.ndarray
+        random numbers in [0, 1) of shape (duels, width), where width is at
+        least 8 * max_rounds * slots
+
+    ### Returns:
+    ----
+    tuple
+        (outcome, turns, health) arrays as play_duels(), with the health of
+        the player and the opponent in the columns of health
+    """
+
+    speed, base, items, health = arrays
+    count = block.shape[0]
+    outcome = numpy.zeros(count, dtype=numpy.int64)
+    turns = numpy.zeros(count, dtype=numpy.int64)
+    health = numpy.array(health, dtype=float)
+    _duel_kernel(speed, base, items, health, block, outcome, turns)
+
+    return outcome, turns, health
+
+
+def _play_compiled(player: dict, opponent: dict, rng) -> tuple:
+    """Resolves the duels of play_duels() with the duel loop, kernel_chunk
+    duels at a time."""
+
+    speed, base, items, health = kernel_arrays(player, opponent)
+    width = 8 * max_rounds * items.shape[2]
+    outcome = numpy.zeros(len(speed), dtype=numpy.int64)
+    turns = numpy.zeros(len(speed), dtype=numpy.int64)
+    health = health.copy()
+
+    for start in range(0, len(speed), kernel_chunk):
+        rows = slice(start, start + kernel_chunk)
+        block = rng.random((len(speed[rows]), width))
+        outcome[rows], turns[rows], health[rows] = run_kernel(
+            (speed[rows], base[rows], items[rows], health[rows]), block
+        )
+
+    return (outcome, turns, health[:, 0], health[:, 1])
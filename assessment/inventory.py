@@ -0,0 +1,380 @@
+"""Inventory container used to store a knight's spare equipment.
+
+Each item is stored against a stable id in insertion-ordered dictionaries
+(chunks) per item type, so items can be found, removed, or sold without
+searching through every item. When a knight is knocked out, the chunks of
+their inventory are spliced onto the winner's chunks instead of copying the
+items. Once there are more than max_chunks chunks of a type, the smallest
+chunk is merged into the next smallest, so lookups stay bounded while the
+cost of merging stays proportional to the smallest chunks. Each chunk also
+keeps the values of its items in a numpy array, filled when items are
+stored in bulk or when the inventory is liquidated, and dropped when a
+single item is added or removed. Liquidation finds the items to sell with
+numpy over those arrays, reading the values of only the chunks which
+changed since, then keeps or sells whole chunks where it can and filters
+the others in a single pass.
+
+### Classes
+----
+Inventory()
+    spare items of a knight, by item type and id
+
+### Parameters:
+----
+max_chunks
+    number of chunks per item type before the smallest chunks are merged
+"""
+
+# Import dependencies
+from assessment import numpy, count, chain, compress, attrgetter
+
+max_chunks = 32
+
+# Ids are unique across every inventory so items keep their id when moved
+_ids = count()
+_value = attrgetter('value')
+
+
+class _Chunk(dict):
+    """Items of a chunk by id, with the values of the items in the same
+    order (None until they are read)."""
+
+    __slots__ = ('values_array',)
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.values_array = None
+
+    def __reduce__(self):
+        return (_Chunk, (dict(self),))
+
+
+def _values(chunk) -> numpy.ndarray:
+    """Values of the items of a chunk, read once and kept on the chunk."""
+
+    if chunk.values_array is None:
+        chunk.values_array = numpy.fromiter(map(_value, chunk.values()), dtype=float, count=len(chunk))
+
+    return chunk.values_array
+
+
+class Inventory():
+    """Spare items of a knight, by item type and id.
+
+    ### Attributes:
+    ----
+    item_types : list
+        item types which can be stored
+
+    ### Methods:
+    ----
+    add(item_type: str, item: Equipment) -> int
+        stores an item and returns its id
+    extend(item_type: str, items: list)
+        stores many items of the same type
+    get(item_type: str, item_id: int) -> Equipment
+        item stored against an id
+    remove(item_type: str, item_id: int) -> Equipment
+        removes an item and returns it
+    ids(item_type: str) -> list
+        ids of the items of a type in display order
+    items(item_type: str) -> iterable
+        items of a type in display order
+    count(item_type: str) -> int
+        number of items of a type
+    counts() -> dict
+        number of items of each type
+    transfer(other: Inventory)
+        moves every item of another inventory into this inventory
+    sell_below(value: int) -> int
+        removes every item worth less than value and returns their worth
+    liquidate(cap: int) -> int
+        removes the least valuable items until at most cap items remain
+    clear()
+        removes every item
+    """
+
+    item_types = ['weapons', 'shields', 'armours']
+
+    def __init__(self):
+        self._chunks = {item_type: [] for item_type in self.item_types}
+
+    def __setstate__(self, state: dict):
+        # Chunks of inventories pickled before chunks kept their values
+        state['_chunks'] = {
+            item_type: [chunk if isinstance(chunk, _Chunk) else _Chunk(chunk) for chunk in chunks]
+            for item_type, chunks in state['_chunks'].items()
+        }
+        self.__dict__.update(state)
+
+    def __len__(self) -> int:
+        return sum(self.counts().values())
+
+    def _last(self, item_type: str) -> dict:
+        """Chunk new items of a type are stored in."""
+
+        chunks = self._chunks[item_type]
+        if not chunks:
+            chunks.append(_Chunk())
+
+        return chunks[-1]
+
+    def _find(self, item_type: str, item_id: int) -> dict:
+        """Chunk holding an item, searching the newest chunks first."""
+
+        for chunk in reversed(self._chunks[item_type]):
+            if item_id in chunk:
+                return chunk
+
+        raise KeyError(item_id)
+
+    def add(self, item_type: str, item) -> int:
+        """Stores an item and returns its id.
+
+        ### Parameters:
+        ----
+        item_type : str
+            can be 'weapons', 'shields', or 'armours' - type of item
+        item : Equipment
+            item to be stored
+
+        ### Returns:
+        ----
+        int
+            id of the item
+        """
+
+        item_id = next(_ids)
+        chunk = self._last(item_type)
+        chunk[item_id] = item
+        chunk.values_array = None
+        return item_id
+
+    def extend(self, item_type: str, items: list):
+        """Stores many items of the same type.
+
+        ### Parameters:
+        ----
+        item_type : str
+            can be 'weapons', 'shields', or 'armours' - type of item
+        items : list
+            items to be stored
+        """
+
+        chunk = self._last(item_type)
+        known = len(chunk) == 0 or chunk.values_array is not None
+        for item in items:
+            chunk[next(_ids)] = item
+
+        # Values of the new items are read while they are at hand
+        if known:
+            values = numpy.fromiter(map(_value, items), dtype=float, count=len(items))
+            chunk.values_array = values if chunk.values_array is None else numpy.concatenate([chunk.values_array, values])
+
+    def get(self, item_type: str, item_id: int):
+        """Item stored against an id.
+
+        ### Parameters:
+        ----
+        item_type : str
+            can be 'weapons', 'shields', or 'armours' - type of item
+        item_id : int
+            id of the item
+
+        ### Returns:
+        ----
+        Equipment
+            item stored against the id
+        """
+
+        return self._find(item_type, item_id)[item_id]
+
+    def remove(self, item_type: str, item_id: int):
+        """Removes an item and returns it.
+
+        ### Parameters:
+        ----
+        item_type : str
+            can be 'weapons', 'shields', or 'armours' - type of item
+        item_id : int
+            id of the item
+
+        ### Returns:
+        ----
+        Equipment
+            item removed
+        """
+
+        chunk = self._find(item_type, item_id)
+        chunk.values_array = None
+        return chunk.pop(item_id)
+
+    def ids(self, item_type: str) -> list:
+        """Ids of the items of a type in display order (the order items were
+        stored, chunk by chunk).
+
+        ### Parameters:
+        ----
+        item_type : str
+            can be 'weapons', 'shields', or 'armours' - type of item
+
+        ### Returns:
+        ----
+        list
+            ids of the items
+        """
+
+        return list(chain.from_iterable(self._chunks[item_type]))
+
+    def items(self, item_type: str):
+        """Items of a type in display order, matching ids().
+
+        ### Parameters:
+        ----
+        item_type : str
+            can be 'weapons', 'shields', or 'armours' - type of item
+
+        ### Returns:
+        ----
+        iterable
+            items, which must not be iterated while items are added or
+            removed
+        """
+
+        return chain.from_iterable(chunk.values() for chunk in self._chunks[item_type])
+
+    def count(self, item_type: str) -> int:
+        """Number of items of a type.
+
+        ### Parameters:
+        ----
+        item_type : str
+            can be 'weapons', 'shields', or 'armours' - type of item
+
+        ### Returns:
+        ----
+        int
+            number of items
+        """
+
+        return sum(len(chunk) for chunk in self._chunks[item_type])
+
+    def counts(self) -> dict:
+        """Number of items of each type.
+
+        ### Returns:
+        ----
+        dict
+            number of items for each item type
+        """
+
+        return {item_type: self.count(item_type) for item_type in self.item_types}
+
+    def transfer(self, other):
+        """Moves every item of another inventory into this inventory, keeping
+        their ids. The other inventory's chunks are spliced onto this
+        inventory's chunks rather than copied.
+
+        ### Parameters:
+        ----
+        other : Inventory
+            inventory to be emptied
+        """
+
+        for item_type in self.item_types:
+            chunks = self._chunks[item_type]
+            chunks.extend(chunk for chunk in other._chunks[item_type] if chunk)
+            other._chunks[item_type] = []
+
+            # Merge the smallest chunk into the next smallest to bound lookups
+            while len(chunks) > max_chunks:
+                smallest, other_chunk = sorted(chunks, key=len)[:2]
+                if other_chunk.values_array is not None and smallest.values_array is not None:
+                    values = numpy.concatenate([other_chunk.values_array, smallest.values_array])
+                else:
+                    values = None
+                other_chunk.update(smallest)
+                other_chunk.values_array = values
+                chunks.remove(smallest)
+
+    def sell_below(self, value: int, item_types: list = None) -> int:
+        """Removes every item worth less than value and returns their worth.
+
+        ### Parameters:
+        ----
+        value : int
+            items worth less than this are removed
+        item_types : list
+            item types to sell from, every type if None
+
+        ### Returns:
+        ----
+        int
+            combined value of the items removed
+        """
+
+        gold = 0
+        for item_type in item_types or self.item_types:
+            kept = _Chunk()
+            for chunk in self._chunks[item_type]:
+                for item_id, item in chunk.items():
+                    if item.value < value:
+                        gold += item.value
+                    else:
+                        kept[item_id] = item
+            self._chunks[item_type] = [kept] if kept else []
+
+        return gold
+
+    def liquidate(self, cap: int) -> int:
+        """Removes the least valuable items until at most cap items remain and
+        returns their worth.
+
+        ### Parameters:
+        ----
+        cap : int
+            maximum number of items kept across all item types
+
+        ### Returns:
+        ----
+        int
+            combined value of the items removed
+        """
+
+        excess = len(self) - cap
+        if excess <= 0:
+            return 0
+
+        # Values of every item, chunk by chunk in display order
+        chunks = [(item_type, chunk) for item_type in self.item_types for chunk in self._chunks[item_type]]
+        values = numpy.concatenate([_values(chunk) for _, chunk in chunks])
+
+        # Sell everything below the value of the most valuable item to be
+        # sold, and the first items at that value until excess are sold
+        threshold = numpy.partition(values, excess - 1)[excess - 1]
+        at_threshold = values == threshold
+        sold = values < threshold
+        sold |= at_threshold & (numpy.cumsum(at_threshold) <= excess - sold.sum())
+
+        # Keep or sell whole chunks where possible, filter the others once
+        gold = int(values[sold].sum())
+        sizes = [len(chunk) for _, chunk in chunks]
+        starts = numpy.cumsum([0] + sizes[:-1])
+        self._chunks = {item_type: [] for item_type in self.item_types}
+        for (item_type, chunk), start, size, sold_count in zip(
+            chunks, starts.tolist(), sizes, numpy.add.reduceat(sold, starts).tolist()
+        ):
+            if sold_count == 0:
+                self._chunks[item_type].append(chunk)
+            elif sold_count < size:
+                kept_mask = ~sold[start:start + size]
+                kept = _Chunk(compress(chunk.items(), kept_mask.tolist()))
+                kept.values_array = chunk.values_array[kept_mask]
+                self._chunks[item_type].append(kept)
+
+        return gold
+
+    def clear(self):
+        """Removes every item."""
+
+        self._chunks = {item_type: [] for item_type in self.item_types}
@@ -0,0 +1,206 @@
+"""Compiled duel kernel with a pure-Python fallback.
+
+The whole of a duel (Arena.fight() -> Arena._combat() -> Knight.attack() and
+Knight.defend() -> the items' attack() and defend() -> Knight.take_damage())
+is written as one loop over plain numeric arrays in engine.py: the two
+knights' stats, a table of the values each item can roll, and a block of
+pre-generated random numbers. When numba is installed the loop is compiled
+the first time it runs and is picked automatically by engine.play_duels()
+and kernel.resolve_duels(), otherwise the same function runs as plain
+Python here and those paths keep their numpy and Python implementations.
+backend tells which one is in use.
+
+equivalence_check() compares the kernel with the Python paths: it must
+match the thread-friendly kernel.Duel exactly when both are given the same
+random numbers, and match the outcome and length distributions of real
+Arena fights statistically.
+
+### Functions
+----
+run_jit_duels(player : Knight, opponent : Knight, duels : int, block_seed : int) -> tuple
+    resolves many duels between two knights with the kernel
+equivalence_check(player : Knight, opponent : Knight, duels : int, block_seed : int, alpha : float) -> dict
+    compares the kernel with the Python combat paths
+
+### Parameters:
+----
+backend
+    'numba' if the kernel is compiled, 'python' otherwise (see engine.py)
+"""
+
+# Import dependencies
+from assessment import numpy, copy, sqrt, erfc, exp
+from assessment.classes import Arena
+from assessment.engine import backend, encode_knights, repeat, kernel_arrays, run_kernel
+from assessment.inventory import Inventory
+from assessment.kernel import Duel, rolls_per_duel
+from assessment.stats import RunningStats
+
+
+def _run(player, opponent, rolls: numpy.ndarray) -> tuple:
+    """Runs the kernel for two knights over a block of rolls."""
+
+    count = rolls.shape[0]
+    arrays = kernel_arrays(repeat(encode_knights([player]), count), repeat(encode_knights([opponent]), count))
+
+    return run_kernel(arrays, rolls)
+
+
+def run_jit_duels(player, opponent, duels: int, block_seed: int = None) -> tuple:
+    """Resolves many duels between two knights with the kernel, without
+    changing either knight.
+
+    ### Parameters:
+    ----
+    player : Knight
+        knight attacking first
+    opponent : Knight
+        knight attacking second
+    duels : int
+        number of duels
+    block_seed : int
+        seed of the random numbers, random if None
+
+    ### Returns:
+    ----
+    tuple
+        (outcome, turns) arrays where outcome is 1 if the player won, -1 if
+        the opponent won, and 0 for a draw, and turns is the number of
+        attacks made (as engine.run_duels())
+    """
+
+    rolls = numpy.random.default_rng(block_seed).random((duels, rolls_per_duel))
+    outcome, turns, _ = _run(player, opponent, rolls)
+
+    return outcome, turns
+
+
+def _clone(knight):
+    """Copy of a knight which can fight without changing the original."""
+
+    clone = copy(knight)
+    clone.equipped = dict(knight.equipped)
+    clone.inventory = Inventory()
+
+    return clone
+
+
+def _arena_duels(player, opponent, duels: int) -> tuple:
+    """Outcome and turns of real Arena fights between copies of two
+    knights."""
+
+    arena = Arena()
+    results = []
+    arena.add_listener(lambda event, data: results.append((event, data)))
+
+    outcome = numpy.zeros(duels, dtype=numpy.int64)
+    turns = numpy.zeros(duels, dtype=numpy.int64)
+    for duel in range(duels):
+        results.clear()
+        arena.knights = [_clone(player), _clone(opponent)]
+        arena.level = 0
+        arena.gold = 5
+        arena.fight(display=False)
+
+        # The last event is the duel, preceded by a knockout if there was one
+        event, data = results[-2] if len(results) > 1 else (None, None)
+        if event == 'knockout':
+            outcome[duel] = 1 if data['winner'] is arena.knights[0] else -1
+        turns[duel] = results[-1][1]['turns']
+
+    return outcome, turns
+
+
+def _outcome_test(outcome_a: numpy.ndarray, outcome_b: numpy.ndarray) -> float:
+    """P-value of a chi-squared test that two samples of outcomes (wins,
+    losses, and draws) come from the same distribution."""
+
+    table = numpy.array([
+        [(outcome == value).sum() for value in (1, -1, 0)] for outcome in (outcome_a, outcome_b)
+    ], dtype=float)
+    expected = table.sum(axis=1, keepdims=True) * table.sum(axis=0, keepdims=True) / table.sum()
+    used = table.sum(axis=0) > 0
+    statistic = (((table - expected) ** 2)[:, used] / expected[:, used]).sum()
+    freedom = used.sum() - 1
+    if freedom <= 0:
+        return 1.0
+
+    # Survival function of the chi-squared distribution (1 or 2 degrees)
+    if freedom == 1:
+        return erfc(sqrt(statistic / 2))
+
+    return exp(-statistic / 2)
+
+
+def _mean_test(sample_a: numpy.ndarray, sample_b: numpy.ndarray) -> float:
+    """P-value of a Welch test (normal approximation) that two samples have
+    the same mean."""
+
+    stats_a, stats_b = RunningStats(), RunningStats()
+    for value in sample_a.tolist():
+        stats_a.add(value)
+    for value in sample_b.tolist():
+        stats_b.add(value)
+
+    error = sqrt(stats_a.variance() / stats_a.count + stats_b.variance() / stats_b.count)
+    if error == 0:
+        return 1.0 if stats_a.mean == stats_b.mean else 0.0
+
+    return erfc(abs(stats_a.mean - stats_b.mean) / error / sqrt(2))
+
+
+def equivalence_check(player, opponent, duels: int = 5000, block_seed: int = 0, alpha: float = 0.001) -> dict:
+    """Compares the kernel with the Python combat paths. The kernel must give
+    exactly the same result as kernel.Duel for every duel when both use the
+    same random numbers, and its distribution of outcomes and turns must not
+    differ significantly from real Arena fights.
+
+    ### Parameters:
+    ----
+    player : Knight
+        knight attacking first
+    opponent : Knight
+        knight attacking second
+    duels : int
+        number of duels run on each path
+    block_seed : int
+        seed of the kernel's random numbers
+    alpha : float
+        significance level below which the distributions are considered
+        different
+
+    ### Returns:
+    ----
+    dict
+        backend, exact (bool), outcome_p, turns_p, win and draw rates of
+        both paths, and equivalent (bool)
+    """
+
+    rolls = numpy.random.default_rng(block_seed).random((duels, rolls_per_duel))
+    outcome, turns, _ = _run(player, opponent, rolls)
+
+    # Exact check against the thread-friendly Python kernel
+    exact = True
+    for duel in range(duels):
+        result = Duel(player, opponent, iter(rolls[duel].tolist()).__next__).run()
+        expected = 0 if result.winner is None else (1 if result.winner == 0 else -1)
+        if (expected, result.turns) != (outcome[duel], turns[duel]):
+            exact = False
+            break
+
+    # Statistical check against real fights
+    arena_outcome, arena_turns = _arena_duels(player, opponent, duels)
+    outcome_p = _outcome_test(outcome, arena_outcome)
+    turns_p = _mean_test(turns, arena_turns)
+
+    return {
+        'backend': backend,
+        'exact': exact,
+        'outcome_p': outcome_p,
+        'turns_p': turns_p,
+        'kernel_win_rate': float((outcome == 1).mean()),
+        'arena_win_rate': float((arena_outcome == 1).mean()),
+        'kernel_draw_rate': float((outcome == 0).mean()),
+        'arena_draw_rate': float((arena_outcome == 0).mean()),
+        'equivalent': exact and outcome_p >= alpha and turns_p >= alpha,
+    }
@@ -0,0 +1,353 @@
+"""Thread-friendly combat kernel which resolves independent duels
+concurrently and applies their results to the arena afterwards.
+
+Arena._combat() updates the arena (level, gold pot, and order of knights)
+and both knights on every knockout, so two duels of the same arena cannot be
+resolved at the same time. Here a Duel copies everything it needs from its
+two knights when it is created and then runs on local state only, drawing
+from its own row of a block of random numbers generated by numpy for the
+whole round. Duels can therefore be run on any number of threads, for
+example by a concurrent.futures.ThreadPoolExecutor, and they scale on a
+free-threaded Python build. Their results are then committed to the arena
+one at a time, in the order the duels were created, with the same updates
+and events as Arena.fight(). The results are the same for any number of
+threads. When engine.backend is 'numba' and no listener needs the
+exchanges of each duel, the duels are instead resolved together by the
+compiled duel loop from the same random numbers, which gives the same
+results.
+
+### Classes
+----
+Duel(player : Knight, opponent : Knight, rand : callable, level : int, trace : bool)
+    duel between two knights resolved on local state
+
+### Functions
+----
+round_pairs(arena : Arena) -> list
+    random disjoint pairs of the arena's knights
+resolve_duels(arena : Arena, pairs : list, executor : Executor, compiled : bool, rng : numpy.random.Generator) -> list
+    resolves duels concurrently and commits their results to the arena
+commit(arena : Arena, duel : Duel)
+    applies the result of a duel to its knights and the arena
+
+### Parameters:
+----
+rolls_per_duel
+    most random numbers a duel can use: two per item for the attacker and
+    the defender in every attack
+"""
+
+# Import dependencies
+from assessment import random, choice, sqrt, numpy
+from assessment.classes import Knight
+from assessment.engine import backend, encode_item, encode_knights, kernel_arrays, run_kernel, max_rounds
+
+rolls_per_duel = max_rounds * 2 * 4 * len(Knight.item_types)
+_generator = None
+
+
+class Duel():
+    """Duel between two knights resolved on local state, drawing its random
+    numbers from rand, such as the __next__ method of an iterator over
+    rolls_per_duel numbers.
+
+    ### Attributes:
+    ----
+    player : Knight
+        knight attacking first
+    opponent : Knight
+        knight attacking second
+    level : int
+        arena level the duel was fought at
+    health : list
+        remaining health of the player and the opponent after the duel
+    winner : int
+        0 if the player won, 1 if the opponent won, None for a draw
+    turns : int
+        number of attacks made
+    exchanges : list
+        exchange event data of each attack, kept if trace is True
+    rolls : list
+        first roll of each item of the attacker and of the defender in each
+        attack, as (attack_rolls, defence_rolls), kept if trace is True
+
+    ### Methods:
+    ----
+    run() -> Duel
+        resolves the duel
+    """
+
+    def __init__(self, player, opponent, rand, level: int = 0, trace: bool = False):
+        self.player = player
+        self.opponent = opponent
+        self.level = level
+        self.health = [player.base_health, opponent.base_health]
+        self.winner = None
+        self.turns = 0
+        self.exchanges = [] if trace else None
+        self.rolls = [] if trace else None
+        self._rand = rand
+        self._knights = [self._encode(player), self._encode(opponent)]
+
+    def _encode(self, knight) -> tuple:
+        """Stats and item values of a knight (see Knight.attack() and
+        Knight.defend())."""
+
+        if knight.weight > 0:
+            speed = int(knight.base_speed ** 2 / sqrt(knight.weight))
+        else:
+            speed = knight.base_speed
+        items = [encode_item(knight.equipped[item_type]) for item_type in knight.item_types]
+
+        return (
+            speed, knight.base_damage, knight.base_defence,
+            [item[0:4] for item in items], [item[4:8] for item in items]
+        )
+
+    def _roll(self, base: float, items: list, rolls: list = None) -> int:
+        """Combined attack or defence stat, rolling each item in turn and
+        adding each item's first roll to rolls."""
+
+        rand = self._rand
+        total = base
+        for crit, fail, low, span in items:
+            roll = rand()
+            if rolls is not None:
+                rolls.append(roll)
+            # Critical hit, critical failure, or standard hit
+            if roll <= 0.1:
+                total += crit
+            elif roll >= 0.9:
+                total += fail
+            else:
+                total += low + span * rand()
+
+        return int(total)
+
+    def _exchange(self, attacker: int) -> bool:
+        """Resolves one attack, returning True if the defender was knocked
+        out."""
+
+        defender = 1 - attacker
+        attack_speed, attack_base, _, attack_items, _ = self._knights[attacker]
+        defend_speed, _, defend_base, _, defend_items = self._knights[defender]
+        attack_rolls = [] if self.rolls is not None else None
+        defence_rolls = [] if self.rolls is not None else None
+        attack = self._roll(attack_base, attack_items, attack_rolls)
+        defence = self._roll(defend_base, defend_items, defence_rolls)
+
+        # Same branches as Arena._combat()
+        if attack_speed >= defend_speed * 2:
+            branch, damage = 'unblocked', attack
+        elif defend_speed >= attack_speed * 2:
+            branch, damage = 'dodged', 0
+        elif attack > defence:
+            branch, damage = 'blocked', attack - defence
+        else:
+            branch, damage = 'absorbed', 0
+
+        if self.exchanges is not None:
+            knights = [self.player, self.opponent]
+            self.exchanges.append({
+                'level': self.level,
+                'attacker': knights[attacker],
+                'defender': knights[defender],
+                'attack_speed': attack_speed,
+                'defend_speed': defend_speed,
+                'attack': attack,
+                'defence': defence,
+                'branch': branch,
+                'damage': damage,
+                'health': self.health[defender]
+            })
+            self.rolls.append((attack_rolls, defence_rolls))
+
+        # Same as Knight.take_damage()
+        if branch in ('unblocked', 'blocked'):
+            if damage < self.health[defender]:
+                self.health[defender] -= damage
+            else:
+                return True
+
+        return False
+
+    def run(self):
+        """Resolves the duel.
+
+        ### Returns:
+        ----
+        Duel
+            the duel itself, so it can be mapped over by an executor
+        """
+
+        for _ in range(max_rounds):
+            for attacker in [0, 1]:
+                self.turns += 1
+                if self._exchange(attacker):
+                    self.winner = attacker
+                    return self
+
+        return self
+
+
+def round_pairs(arena) -> list:
+    """Random disjoint pairs of the arena's knights, leaving one knight out
+    if there is an odd number.
+
+    ### Parameters:
+    ----
+    arena : Arena
+        arena whose knights are paired
+
+    ### Returns:
+    ----
+    list
+        (player, opponent) tuples
+    """
+
+    knights = list(arena.knights)
+    pairs = []
+    while len(knights) > 1:
+        player = choice(knights)
+        knights.remove(player)
+        opponent = choice(knights)
+        knights.remove(opponent)
+        pairs.append((player, opponent))
+
+    return pairs
+
+
+def _set_rolls(knight, rolls: list):
+    """Leaves each item's roll of an attack on the item, as
+    Equipment.attack() and Equipment.defend() do, so listeners read the
+    same rolls as with Arena.fight()."""
+
+    for item_type, roll in zip(knight.item_types, rolls):
+        item = knight.equipped[item_type]
+        if item is not None:
+            item.roll = roll
+
+
+def commit(arena, duel: Duel):
+    """Applies the result of a duel to its knights and the arena, with the
+    same updates and events as Arena.fight() and Arena._combat().
+
+    ### Parameters:
+    ----
+    arena : Arena
+        arena the duel was fought in
+    duel : Duel
+        resolved duel
+    """
+
+    knights = [duel.player, duel.opponent]
+    arena.duels += 1
+    if duel.exchanges:
+        for data, (attack_rolls, defence_rolls) in zip(duel.exchanges, duel.rolls):
+            _set_rolls(data['attacker'], attack_rolls)
+            _set_rolls(data['defender'], defence_rolls)
+            arena._emit('exchange', data)
+
+    if duel.winner is None:
+        duel.player.base_health, duel.opponent.base_health = duel.health
+
+    else:
+        winner = knights[duel.winner]
+        loser = knights[1 - duel.winner]
+        winner.base_health = duel.health[duel.winner]
+
+        # A round of duels can take the arena past the highest loot level,
+        # so the winner is re-equipped within the catalog
+        arena._knockout(winner, loser, loser._lose(), clamp=True)
+
+    if arena.listeners:
+        arena._emit('duel', {
+            'level': duel.level,
+            'player': duel.player,
+            'opponent': duel.opponent,
+            'turns': duel.turns,
+            'result': 'draw' if duel.winner is None else 'knockout',
+            'predicted': False
+        })
+
+
+def _run_compiled(duels: list, block: numpy.ndarray):
+    """Resolves duels with the compiled duel loop, one row of block each,
+    giving the same results as Duel.run()."""
+
+    arrays = kernel_arrays(
+        encode_knights([duel.player for duel in duels]), encode_knights([duel.opponent for duel in duels])
+    )
+    outcome, turns, health = run_kernel(arrays, block)
+    for duel, result, duel_turns, duel_health in zip(duels, outcome.tolist(), turns.tolist(), health.tolist()):
+        duel.winner = None if result == 0 else (0 if result == 1 else 1)
+        duel.turns = duel_turns
+        duel.health = [int(value) for value in duel_health]
+
+
+def _default_generator():
+    """Generator used by resolve_duels() when none is given, seeded from
+    random() the first time it is needed so random.seed() still makes runs
+    repeatable."""
+
+    global _generator
+    if _generator is None:
+        _generator = numpy.random.default_rng(int(random() * 2 ** 32))
+
+    return _generator
+
+
+def resolve_duels(arena, pairs: list, executor=None, compiled: bool = None, rng=None) -> list:
+    """Resolves duels concurrently and commits their results to the arena.
+
+    ### Parameters:
+    ----
+    arena : Arena
+        arena the duels are fought in
+    pairs : list
+        (player, opponent) tuples, no knight may appear in more than one pair
+    executor : Executor
+        executor the duels are run on, such as a ThreadPoolExecutor, or None
+        to run them on the calling thread
+    compiled : bool
+        whether duels are resolved by the duel loop of engine.py, only if
+        engine.backend is 'numba' when None; never while the arena has
+        listeners, which receive every exchange
+    rng : numpy.random.Generator
+        random number generator for every roll, one kept by this module for
+        every round if None
+
+    ### Returns:
+    ----
+    list
+        resolved duels in the order of pairs
+    """
+
+    # Random numbers are drawn for the whole round up front so results do
+    # not depend on thread scheduling
+    if rng is None:
+        rng = _default_generator()
+    block = rng.random((len(pairs), rolls_per_duel))
+    trace = bool(arena.listeners)
+    if compiled is None:
+        compiled = backend == 'numba'
+    compiled = compiled and not trace and len(pairs) > 0
+
+    # Each duel reads its own row, converted to floats once for the round
+    rows = [None] * len(pairs) if compiled else block.tolist()
+    duels = [
+        Duel(player, opponent, None if rolls is None else iter(rolls).__next__, arena.level, trace)
+        for (player, opponent), rolls in zip(pairs, rows)
+    ]
+
+    if compiled:
+        _run_compiled(duels, block)
+    elif executor is None:
+        duels = [duel.run() for duel in duels]
+    else:
+        duels = list(executor.map(Duel.run, duels))
+
+    for duel in duels:
+        commit(arena, duel)
+
+    return duels
@@ -0,0 +1,411 @@
+"""Functions used to search for the best combination of equipment for a knight
+from their equipped items, their inventory, and the items in the shop.
+
+Each weapon, shield, and armour is reduced to its expected attack, expected
+defence, weight, and cost (0 gold for items the knight already owns). Items
+that are beaten on all four values by another item in the same slot can never
+be part of the best loadout, so they are pruned before combinations are
+scored. The score of a loadout never falls as its attack, defence, or speed
+grow, so combinations are then searched slot by slot with branch and bound:
+a partial loadout is dropped as soon as adding the most attack, the most
+defence, the least weight, and the least cost any remaining slot offers
+could not beat the best loadout found or would exceed the knight's gold.
+
+### Classes
+----
+Candidate(item : Equipment, item_type : str, source : str, cost : int, item_id : int)
+    item that could be placed in an equipment slot
+Loadout(candidates : tuple, base_speed : int)
+    combination of one candidate (or an empty slot) per equipment slot
+
+### Functions
+----
+shop_items(arena : Arena) -> dict
+    builds the items on sale at the level of the arena
+profile(knight : Knight) -> tuple
+    expected speed, attack, defence, and health of a knight as equipped
+loadout_score(knight : Knight, attack : float, defence : float, weight : float, profiles : list) -> float
+    expected exchange of a knight wearing equipment against profiled opponents
+optimise_loadout(knight : Knight, shop : dict, opponents : list) -> Loadout
+    finds the loadout with the best expected exchange against the opponents
+apply_loadout(knight : Knight, loadout : Loadout)
+    buys and equips the items of a loadout
+"""
+
+# Import dependencies
+from assessment import sqrt
+
+
+class Candidate():
+    """Item that could be placed in an equipment slot.
+
+    ### Attributes:
+    ----
+    item : Equipment
+        item to be equipped, None for an empty slot
+    item_type : str
+        can be 'weapons', 'shields', or 'armours' - type of item
+    source : str
+        where the item comes from, either 'equipped', 'inventory', or 'shop'
+    cost : int
+        gold needed to own the item
+    item_id : int
+        id of the item in the knight's inventory, None for other sources
+    attack : float
+        expected attack stat of the item
+    defence : float
+        expected defence stat of the item
+    weight : float
+        weight of the item
+    """
+
+    def __init__(self, item, item_type: str, source: str, cost: int = 0, item_id: int = None):
+        self.item = item
+        self.item_type = item_type
+        self.source = source
+        self.cost = cost
+        self.item_id = item_id
+        if item is None:
+            self.attack = 0
+            self.defence = 0
+            self.weight = 0
+        else:
+            self.attack = item.expected_attack()
+            self.defence = item.expected_defence()
+            self.weight = item.weight
+
+    def dominates(self, other) -> bool:
+        """Checks if this candidate is at least as good as another on every
+        value.
+
+        ### Parameters:
+        ----
+        other : Candidate
+            candidate to compare against
+
+        ### Returns:
+        ----
+        bool
+            true if the other candidate can be pruned
+        """
+
+        return (self.attack >= other.attack and self.defence >= other.defence
+                and self.weight <= other.weight and self.cost <= other.cost)
+
+
+class Loadout():
+    """Combination of one candidate (or an empty slot) per equipment slot.
+
+    ### Attributes:
+    ----
+    candidates : tuple
+        candidate selected for each equipment slot
+    attack : float
+        expected attack from equipment (excludes base damage)
+    defence : float
+        expected defence from equipment (excludes base defence)
+    weight : float
+        total weight of the equipment
+    cost : int
+        gold needed to buy the items from the shop
+    speed : int
+        speed of the knight wearing the loadout
+    score : float
+        expected exchange against the opponents, higher is better
+    """
+
+    def __init__(self, candidates: tuple, base_speed: int):
+        self.candidates = candidates
+        self.attack = sum(candidate.attack for candidate in candidates)
+        self.defence = sum(candidate.defence for candidate in candidates)
+        self.weight = sum(candidate.weight for candidate in candidates)
+        self.cost = sum(candidate.cost for candidate in candidates)
+        self.speed = _speed(base_speed, self.weight)
+        self.score = 0
+
+    def __str__(self) -> str:
+        lines = []
+        for candidate in self.candidates:
+            name = candidate.item.name if candidate.item is not None else 'nothing'
+            lines.append(f'{candidate.item_type.capitalize()}: {name} ({candidate.source})')
+        lines.append(f'Speed: {self.speed}    Cost: {self.cost} gold')
+        return '\n'.join(lines)
+
+
+def _speed(base_speed: int, weight: float) -> int:
+    """Speed stat as calculated by Knight._calculate_speed()."""
+
+    if weight > 0:
+        return int(base_speed ** 2 / sqrt(weight))
+
+    return base_speed
+
+
+def _exchange(speed: int, attack: float, defence: float, opp_speed: int,
+              opp_attack: float, opp_defence: float) -> float:
+    """Expected damage landed by an attacker on a defender in one exchange,
+    following the branches of Arena._combat()."""
+
+    if speed >= opp_speed * 2:
+        return attack
+
+    if opp_speed >= speed * 2:
+        return 0
+
+    return max(attack - opp_defence, 0)
+
+
+def _score(speed: int, attack: float, defence: float, health: int, profiles: list) -> float:
+    """Expected exchange of a knight against the profiled opponents, higher
+    is better."""
+
+    score = 0
+    for opp_speed, opp_attack, opp_defence, opp_health in profiles:
+        dealt = _exchange(speed, attack, defence, opp_speed, opp_attack, opp_defence)
+        taken = _exchange(opp_speed, opp_attack, opp_defence, speed, attack, defence)
+        score += dealt / max(opp_health, 1) - taken / max(health, 1)
+
+    return score
+
+
+class _Search():
+    """Branch and bound over the candidates of each slot, in the order of
+    itertools.product() so ties are broken as a full search would."""
+
+    def __init__(self, knight, fronts: list, profiles: list):
+        self.knight = knight
+        self.fronts = fronts
+        self.profiles = profiles
+        self.best = None
+        self.best_score = None
+
+        # Most attack and defence, and least weight and cost, the slots from
+        # each slot onwards can add
+        self.rest = [(0, 0, 0, 0)]
+        for front in reversed(fronts):
+            attack, defence, weight, cost = self.rest[0]
+            self.rest.insert(0, (
+                attack + max(candidate.attack for candidate in front),
+                defence + max(candidate.defence for candidate in front),
+                weight + min(candidate.weight for candidate in front),
+                cost + min(candidate.cost for candidate in front)
+            ))
+
+    def _bound(self, num: int, attack: float, defence: float, weight: float) -> float:
+        """Highest score any loadout completing a partial loadout of the
+        slots before num can reach."""
+
+        rest_attack, rest_defence, rest_weight, _ = self.rest[num]
+        return loadout_score(
+            self.knight, attack + rest_attack, defence + rest_defence, weight + rest_weight, self.profiles
+        )
+
+    def branch(self, num: int = 0, chosen: tuple = (), attack: float = 0, defence: float = 0,
+               weight: float = 0, cost: int = 0):
+        """Extends a partial loadout with each candidate of slot num."""
+
+        knight = self.knight
+        if num == len(self.fronts):
+            score = loadout_score(knight, attack, defence, weight, self.profiles)
+            if self.best is None or score > self.best_score:
+                self.best, self.best_score = chosen, score
+            return
+
+        for candidate in self.fronts[num]:
+            next_attack = attack + candidate.attack
+            next_defence = defence + candidate.defence
+            next_weight = weight + candidate.weight
+            next_cost = cost + candidate.cost
+            if next_cost + self.rest[num + 1][3] > knight.gold:
+                continue
+
+            # A small margin keeps rounding in the bound from dropping ties
+            if (self.best is not None
+                    and self._bound(num + 1, next_attack, next_defence, next_weight) < self.best_score - 1e-9):
+                continue
+
+            self.branch(num + 1, chosen + (candidate,), next_attack, next_defence, next_weight, next_cost)
+
+
+def _prune(candidates: list) -> list:
+    """Removes every candidate dominated by another candidate of the slot.
+
+    ### Parameters:
+    ----
+    candidates : list
+        candidates for a single equipment slot
+
+    ### Returns:
+    ----
+    list
+        pareto front of the candidates
+    """
+
+    # Cheapest, lightest, strongest candidates first so that dominating
+    # candidates are kept before the candidates they dominate
+    ordered = sorted(candidates, key=lambda c: (c.cost, c.weight, -c.attack, -c.defence))
+    front = []
+    for candidate in ordered:
+        if not any(kept.dominates(candidate) for kept in front):
+            front.append(candidate)
+
+    return front
+
+
+def shop_items(arena) -> dict:
+    """Builds the items on sale at the level of the arena.
+
+    ### Parameters:
+    ----
+    arena : Arena
+        arena whose shop is used
+
+    ### Returns:
+    ----
+    dict
+        list of items on sale for each item type
+    """
+
+    shop = {}
+    for item_type in arena.item_types:
+        templates, _ = arena.shop(item_type)
+        shop[item_type] = [template.build() for template in templates]
+
+    return shop
+
+
+def profile(knight) -> tuple:
+    """Expected speed, attack, defence, and health of a knight as equipped.
+
+    ### Parameters:
+    ----
+    knight : Knight
+        knight to be profiled
+
+    ### Returns:
+    ----
+    tuple
+        (speed, attack, defence, health)
+    """
+
+    attack = knight.base_damage
+    defence = knight.base_defence
+    weight = 0
+    for item in knight.equipped.values():
+        if item is not None:
+            attack += item.expected_attack()
+            defence += item.expected_defence()
+            weight += item.weight
+
+    return (_speed(knight.base_speed, weight), attack, defence, knight.base_health)
+
+
+def loadout_score(knight, attack: float, defence: float, weight: float, profiles: list) -> float:
+    """Expected exchange of a knight wearing equipment against profiled
+    opponents, with the speed the weight of the equipment leaves the knight.
+
+    ### Parameters:
+    ----
+    knight : Knight
+        knight wearing the equipment
+    attack : float
+        expected attack from equipment (excludes base damage)
+    defence : float
+        expected defence from equipment (excludes base defence)
+    weight : float
+        total weight of the equipment
+    profiles : list
+        (speed, attack, defence, health) of each opponent, as profile()
+
+    ### Returns:
+    ----
+    float
+        score of the equipment, higher is better
+    """
+
+    return _score(
+        _speed(knight.base_speed, weight), knight.base_damage + attack, knight.base_defence + defence,
+        knight.base_health, profiles
+    )
+
+
+def optimise_loadout(knight, shop: dict = None, opponents: list = None):
+    """Finds the loadout with the best expected exchange against the
+    opponents, using equipped items, the inventory, and any items from the
+    shop the knight can afford.
+
+    ### Parameters:
+    ----
+    knight : Knight
+        knight to equip
+    shop : dict
+        list of items on sale for each item type, no shop if None
+    opponents : list
+        knights likely to be fought, the knight as currently equipped if None
+
+    ### Returns:
+    ----
+    Loadout
+        best loadout found
+    """
+
+    if shop is None:
+        shop = {}
+
+    # Profile opponents before anything changes on the knight
+    if opponents:
+        profiles = [profile(opponent) for opponent in opponents]
+    else:
+        profiles = [profile(knight)]
+
+    # Build the pareto front of candidates for each slot
+    fronts = []
+    for item_type in knight.item_types:
+        candidates = [Candidate(None, item_type, 'empty')]
+        if knight.equipped[item_type] is not None:
+            candidates.append(Candidate(knight.equipped[item_type], item_type, 'equipped'))
+        for item_id in knight.inventory.ids(item_type):
+            item = knight.inventory.get(item_type, item_id)
+            candidates.append(Candidate(item, item_type, 'inventory', item_id=item_id))
+        for item in shop.get(item_type, []):
+            if item.value <= knight.gold:
+                candidates.append(Candidate(item, item_type, 'shop', item.value))
+        fronts.append(_prune(candidates))
+
+    # Search the affordable combinations of the remaining candidates,
+    # dropping partial loadouts which cannot beat the best one found
+    search = _Search(knight, fronts, profiles)
+    search.branch()
+    best = Loadout(search.best, knight.base_speed)
+    best.score = loadout_score(knight, best.attack, best.defence, best.weight, profiles)
+
+    return best
+
+
+def apply_loadout(knight, loadout: Loadout):
+    """Buys and equips the items of a loadout.
+
+    ### Parameters:
+    ----
+    knight : Knight
+        knight to equip
+    loadout : Loadout
+        loadout to be applied
+    """
+
+    for candidate in loadout.candidates:
+        item_type = candidate.item_type
+        # Empty the slot
+        if candidate.source == 'empty':
+            if knight.equipped[item_type] is not None:
+                knight.unequip_item(item_type)
+
+        # Move item from inventory to the slot
+        elif candidate.source == 'inventory':
+            knight.inventory.remove(item_type, candidate.item_id)
+            knight.equip_item(candidate.item, item_type)
+
+        # Buy item from the shop and place it in the slot
+        elif candidate.source == 'shop':
+            knight.gold -= candidate.cost
+            knight.equip_item(candidate.item, item_type)
@@ -28,6 +28,8 @@ sell_item(item_type : str, knight : Knight)
     select items to sell from a knight's inventory
 heal_damage(arena : Arena)
     heal damage for player knight from Arena combat
+optimise_menu(arena : Arena)
+    suggest the best loadout for the player knight and optionally apply it
 get_name() -> str
     use error handling to retrieve name of a knight from user input
 get_index(lower : int, upper : int) -> int
@@ -39,7 +41,10 @@ find_winner(arena : Arena)
 
 # Import dependencies
 from assessment import pandas, json
-from assessment.classes import Arena, Knight, Weapon, Shield, Armour, load_file
+from assessment.classes import Arena, Knight
+from assessment.loadout import optimise_loadout, apply_loadout, shop_items
+from assessment.training import evaluate_training, apply_training
+from assessment.render import setup_menu, play_menu, item_menu, train_screen
 
 item_types = ['weapons', 'shields', 'armours']
 
@@ -52,9 +57,7 @@ def setup():
     # Setup menu loop
     while True:
         # Setup menu options
-        print('0. Create New Knight')
-        print('1. Start the Tournament')
-        print('2. Exit')
+        print(setup_menu)
         index = get_index(0, 2)
 
         # Add knight
@@ -91,16 +94,8 @@ def play(arena: Arena):
     train = True
     while arena.level < 8:
         # Menu display
-        print('\n' * 5)
-        print('0. Begin Combat Round')
-        print('1. Select Knight')
-        print('2. Train Knight')
-        print('3. Equip Items')
-        print('4. Buy Items')
-        print('5. Sell Items')
-        print('6. Heal Damage')
-        print('7. Exit')
-        index = get_index(0, 7)
+        print(play_menu)
+        index = get_index(0, 8)
 
         # Begin combat round
         if index == 0:
@@ -136,8 +131,12 @@ def play(arena: Arena):
         elif index == 6:
             heal_damage(arena)
 
-        # Exit game
+        # Move to loadout suggestion for player knight
         elif index == 7:
+            optimise_menu(arena)
+
+        # Exit game
+        elif index == 8:
             print()
             print('Thanks for playing!')
             break
@@ -193,40 +192,22 @@ def train_menu(arena: Arena) -> bool:
         if a stat was increased return true, otherwise return false
     """
 
-    # Build Training Menu
+    # Estimate win chance against the arena after each option
     trained = False
     knight = arena.knights[0]
-    print('\n' * 5)
-    print(f'0. Improve Max Health ..... {knight.max_health}')
-    print(f'1. Improve Base Speed ..... {knight.base_speed}')
-    print(f'2. Improve Base Damage .... {knight.base_damage}')
-    print(f'3. Improve Base Defence ... {knight.base_defence}')
-    print('4. Back')
+    chances = evaluate_training(knight, arena.knights[1:])
+
+    # Build Training Menu
+    print(train_screen(knight, chances))
     index = get_index(0, 4)
 
     # Go back to main menu
     if index == 4:
         trained = False
 
-    # Improve max health
-    elif index == 0:
-        arena.knights[0].base_health = arena.knights[0].base_health + 10
-        arena.knights[0].max_health = arena.knights[0].max_health + 10
-        trained = True
-
-    # Improve base speed
-    elif index == 1:
-        arena.knights[0].base_speed = arena.knights[0].base_speed + 2
-        trained = True
-
-    # Improve base damage
-    elif index == 2:
-        arena.knights[0].base_damage = arena.knights[0].base_damage + 5
-        trained = True
-
-    # Improve base defence
-    elif index == 3:
-        arena.knights[0].base_defence = arena.knights[0].base_defence + 5
+    # Improve max health, base speed, base damage, or base defence
+    else:
+        apply_training(knight, index)
         trained = True
 
     return trained
@@ -247,9 +228,7 @@ def sub_menu(arena: Arena, menu_type: int):
     # Menu loop
     while True:
         # Menu display
-        for num, item_type in enumerate(item_types):
-            print(f'{num}. {item_type.capitalize()}')
-        print('3. Back')
+        print(item_menu)
         index = get_index(0, 3)
 
         if index != 3:
@@ -291,7 +270,8 @@ def equip_items(item_type: str, knight: Knight):
             print(f'No {item_type} equipped.')
 
         # Display list of items in inventory
-        num_items = len(knight.inventory[item_type])
+        item_ids = knight.inventory.ids(item_type)
+        num_items = len(item_ids)
         if num_items > 0:
             print('Inventory::')
             knight.display_items(item_type)
@@ -311,8 +291,7 @@ def equip_items(item_type: str, knight: Knight):
 
         # Equip item
         elif index < num_items and num_items > 0:
-            item = knight.inventory[item_type][index]
-            knight.inventory[item_type].remove(item)
+            item = knight.inventory.remove(item_type, item_ids[index])
             knight.equip_item(item, item_type)
 
         # Go Back
@@ -333,36 +312,24 @@ def buy_items(item_type: str, arena: Arena):
     # Get player knight
     knight = arena.knights[0]
 
-    # Build list of items for vendor
-    keep = []
-    for item in load_file(item_type):
-        if item['level'] in [arena.level - 1, arena.level, arena.level + 1]:
-            item.pop('level')
-            keep.append(item)
+    # Get items for vendor, cached by the arena for the current level
+    templates, table = arena.shop(item_type)
 
     # Loop for purchasing items
     while True:
         print(f'{item_type.capitalize()}::')
         # Build purchase menu
         print(f'Player: {knight.name}' + ' ' * (30 - len(knight.name)) + f'Gold: {knight.gold}')
-        print(pandas.read_json(json.dumps(keep)))
-        print(f'{len(keep)}. Back')
-        index = get_index(0, len(keep))
+        print(table)
+        index = get_index(0, len(templates))
 
-        if index < len(keep):
+        if index < len(templates):
             # Error handling if cost exceeds player's gold
-            if knight.gold >= keep[index]['value']:
-                # Creates item
-                if item_type == 'weapons':
-                    item = Weapon(**keep[index])
-                elif item_type == 'shields':
-                    item = Shield(**keep[index])
-                elif item_type == 'armours':
-                    item = Armour(**keep[index])
-
+            value = templates[index].item.value
+            if knight.gold >= value:
                 # Adds item to player inventory and removes gold
-                knight.inventory[item_type].append(item)
-                knight.gold -= keep[index]['value']
+                knight.inventory.add(item_type, templates[index].build())
+                knight.gold -= value
 
             # Error message if cost exceeds player's gold
             else:
@@ -385,17 +352,25 @@ def sell_items(item_type: str, knight: Knight):
 
     # Loop for continuous sale if wanted by user
     while True:
-        num_items = len(knight.inventory[item_type])
+        item_ids = knight.inventory.ids(item_type)
+        num_items = len(item_ids)
         # Display items to select for sale
         if num_items > 0:
             print(f'{item_type.capitalize()}::')
             knight.display_items(item_type)
-            print(f'{num_items}. Back')
-            index = get_index(0, num_items)
+            print(f'{num_items}. Sell All Below Value')
+            print(f'{num_items + 1}. Back')
+            index = get_index(0, num_items + 1)
 
             # Sell item
             if index < num_items:
-                knight.sell_item(index, item_type)
+                knight.sell_item(item_ids[index], item_type)
+
+            # Sell every item of this type worth less than the value entered
+            elif index == num_items:
+                print(f'Enter the value below which {item_type} are sold.')
+                gold = knight.sell_below(get_index(0, 1000000), [item_type])
+                print(f'Sold for {gold} gold.')
 
             # Go Back
             else:
@@ -547,3 +522,29 @@ def find_winner(arena: Arena):
                 if knight.name == name:
                     knight.win_string()
                     return
+
+def optimise_menu(arena: Arena):
+    """Suggest the best loadout for the player knight and optionally apply it.
+
+    ### Parameters:
+    ----
+    arena : Arena
+        arena housing knights for the main game
+    """
+
+    # Find best loadout against the rest of the arena
+    knight = arena.knights[0]
+    loadout = optimise_loadout(knight, shop_items(arena), arena.knights[1:])
+
+    # Display suggestion
+    print('\n' * 5)
+    print('Suggested Loadout::')
+    print(loadout)
+    print('0. Apply Loadout')
+    print('1. Back')
+    index = get_index(0, 1)
+
+    # Buy and equip suggested items
+    if index == 0:
+        apply_loadout(knight, loadout)
+        print('Loadout applied!')
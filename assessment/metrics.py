@@ -0,0 +1,183 @@
+"""Resource usage of long-running simulations, sampled into a snapshot file.
+
+A MetricsSampler reads counters the simulation already keeps: the duels
+fought by each arena (Arena.duels), the hits and misses of the catalog caches
+(classes.cache_counters), and the records waiting to be written by event
+writers such as a TraceRecorder (backlog()). Nothing is added to the combat
+path, so sampling only costs the time taken to read the counters, which is
+measured and reported as a share of the run time. Each sample is written as
+json, replacing the previous snapshot in one step so readers never see a
+partial file, and can be taken on a background thread every interval seconds
+or by calling sample() directly.
+
+A snapshot holds:
+
+    time, uptime             : seconds since the epoch and since the start
+    duels, duels_per_second  : duels fought in every arena, overall and since
+                               the previous sample
+    process_memory_bytes     : resident memory of the process, None if the
+                               platform does not expose it
+    arenas                   : duels, level, knights, items, and estimated
+                               bytes of each arena
+    caches                   : hits, misses, and hit rate of each cache
+    writers                  : backlog of each event writer
+    sampling_overhead        : time spent sampling over the uptime, counting
+                               the writes of earlier snapshots
+
+### Classes
+----
+MetricsSampler(arenas : list, path : str, interval : float, writers : dict)
+    samples the resource usage of arenas into a snapshot file
+"""
+
+# Import dependencies
+from assessment import os, sys, json, time, Thread, Event
+from assessment.classes import cache_counters
+
+
+def _process_memory() -> int:
+    """Resident memory of the process in bytes, None if unknown."""
+
+    if not os.path.exists('/proc/self/statm'):
+        return None
+
+    with open('/proc/self/statm', mode='r', encoding='utf-8') as file:
+        pages = int(file.read().split()[1])
+
+    return pages * os.sysconf('SC_PAGE_SIZE')
+
+
+def _object_bytes(instance) -> int:
+    """Size of an object and its attribute dictionary."""
+
+    return sys.getsizeof(instance) + sys.getsizeof(instance.__dict__)
+
+
+class MetricsSampler():
+    """Samples the resource usage of arenas into a snapshot file.
+
+    ### Attributes:
+    ----
+    arenas : list
+        arenas whose counters are sampled
+    path : str
+        json file each snapshot is written to, None to keep snapshots in
+        memory only
+    interval : float
+        seconds between samples taken by the background thread
+    writers : dict
+        event writers by name, each with a backlog() method
+    snapshot : dict
+        latest snapshot, None before the first sample
+
+    ### Methods:
+    ----
+    sample() -> dict
+        reads every counter and writes the snapshot
+    start()
+        samples every interval seconds on a background thread
+    stop()
+        stops the background thread and takes a final sample
+    """
+
+    def __init__(self, arenas: list, path: str = None, interval: float = 5.0, writers: dict = None):
+        self.arenas = arenas
+        self.path = path
+        self.interval = interval
+        self.writers = {} if writers is None else writers
+        self.snapshot = None
+        self._started = time.perf_counter()
+        self._last = (self._started, 0)
+        self._sampling = 0
+        self._sizes = None
+        self._stopped = Event()
+        self._thread = None
+
+    def _arena_usage(self, arena) -> dict:
+        """Counters and estimated memory of an arena."""
+
+        knights = list(arena.knights)
+        items = sum(len(knight.inventory) for knight in knights)
+        items += sum(1 for knight in knights for item in knight.equipped.values() if item is not None)
+
+        # Sizes of a knight and an item, measured once
+        if self._sizes is None and knights:
+            item = next((item for item in knights[0].equipped.values() if item is not None), None)
+            self._sizes = (_object_bytes(knights[0]), _object_bytes(item) if item is not None else 0)
+        knight_bytes, item_bytes = self._sizes or (0, 0)
+
+        return {
+            'duels': arena.duels,
+            'level': arena.level,
+            'knights': len(knights),
+            'items': items,
+            'estimated_bytes': len(knights) * knight_bytes + items * item_bytes,
+        }
+
+    def sample(self) -> dict:
+        """Reads every counter and writes the snapshot.
+
+        ### Returns:
+        ----
+        dict
+            the snapshot, as described in the module docstring
+        """
+
+        start = time.perf_counter()
+        arenas = [self._arena_usage(arena) for arena in list(self.arenas)]
+        duels = sum(arena['duels'] for arena in arenas)
+        last_time, last_duels = self._last
+        elapsed = start - last_time
+        self._last = (start, duels)
+
+        snapshot = {
+            'time': time.time(),
+            'uptime': start - self._started,
+            'duels': duels,
+            'duels_per_second': (duels - last_duels) / elapsed if elapsed > 0 else 0.0,
+            'process_memory_bytes': _process_memory(),
+            'arenas': arenas,
+            'caches': {
+                name: {'hits': counters.hits, 'misses': counters.misses, 'hit_rate': counters.hit_rate()}
+                for name, counters in cache_counters.items()
+            },
+            'writers': {name: writer.backlog() for name, writer in self.writers.items()},
+        }
+
+        # The time taken to write this snapshot is counted in the next one
+        now = time.perf_counter()
+        snapshot['sampling_overhead'] = (self._sampling + now - start) / max(now - self._started, 1e-9)
+        self.snapshot = snapshot
+
+        # Write to a temporary file first so readers never see a partial snapshot
+        if self.path is not None:
+            temp_path = self.path + '.tmp'
+            with open(temp_path, mode='w', encoding='utf-8') as file:
+                json.dump(snapshot, file, indent=4)
+            os.replace(temp_path, self.path)
+
+        self._sampling += time.perf_counter() - start
+
+        return snapshot
+
+    def _run(self):
+        """Samples until stopped."""
+
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        """Samples every interval seconds on a background thread."""
+
+        self._stopped.clear()
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the background thread and takes a final sample."""
+
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.sample()
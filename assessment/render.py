@@ -0,0 +1,366 @@
+"""Frame-based terminal renderer and precompiled display templates.
+
+Static menu screens are joined into a single string once, and screens which
+show knight-specific values fill a precompiled format layout, so each screen
+is printed with a single write instead of rebuilding the text line by line.
+
+Each combat frame is composed into a list of lines and written to the
+terminal with a single write. When the terminal understands ANSI escape
+codes, a new frame is drawn over the previous one by moving the cursor back
+to the top of the frame and rewriting only the lines that changed, instead of
+scrolling the screen.
+
+### Classes
+----
+Renderer(stream : TextIO, ansi : bool)
+    draws frames to a terminal stream
+
+### Functions
+----
+health_bar(health : float, max_health : float) -> str
+    health bar of a knight
+item_table(items : list, labels : list) -> str
+    fixed-width table of items
+knight_screen(knight : Knight) -> str
+    stats and equipped items of a knight
+train_screen(knight : Knight, chances : list) -> str
+    training menu with the win chance after each option
+combat_frame(player : Knight, opponent : Knight, message : str) -> list
+    lines of the combat display
+combat_message(branch : str, attacker : str, defender : str, damage : int) -> str
+    status message of an attack
+
+### Parameters:
+----
+bar_width
+    number of characters in a full health bar
+health_bars
+    pre-built health bar for every number of filled characters
+setup_menu
+    static setup menu screen
+play_menu
+    static main menu screen
+item_menu
+    static item type selection screen
+item_columns
+    item attributes shown in item tables
+row_layout
+    layout of each row of an item table
+knight_layout
+    layout of the knight stats screen
+train_layout
+    layout of the training menu screen
+message_layouts
+    layout of the status message for each branch of an attack
+draw_message
+    message written when a duel ends in a draw
+renderer
+    renderer shared by the game's displays
+"""
+
+# Import dependencies
+from assessment import os, sys
+
+bar_width = 50
+health_bars = [' ' * (bar_width - filled) + '=' * filled for filled in range(bar_width + 1)]
+
+setup_menu = '\n'.join([
+    '0. Create New Knight',
+    '1. Start the Tournament',
+    '2. Exit',
+])
+play_menu = '\n' * 5 + '\n'.join([
+    '0. Begin Combat Round',
+    '1. Select Knight',
+    '2. Train Knight',
+    '3. Equip Items',
+    '4. Buy Items',
+    '5. Sell Items',
+    '6. Heal Damage',
+    '7. Optimise Loadout',
+    '8. Exit',
+])
+item_menu = '\n'.join([
+    '0. Weapons',
+    '1. Shields',
+    '2. Armours',
+    '3. Back',
+])
+
+item_columns = ['name', 'min_stat', 'max_stat', 'weight', 'value']
+row_layout = '{:<{width}}{:<28}{:>10}{:>10}{:>8}{:>7}'
+knight_layout = '\n'.join([
+    'Name: {name:<30}Gold: {gold}',
+    'Base Speed: {base_speed:<23}Speed: {speed}',
+    'Health: {base_health:<22}Max Health: {max_health}',
+    'Base Damage: {base_damage:<15}Base Defence: {base_defence}',
+    'Equipped::',
+])
+train_layout = '\n' * 5 + '\n'.join([
+    'Current win chance: {:.0%}',
+    '0. Improve Max Health ..... {max_health} (win chance {:.0%})',
+    '1. Improve Base Speed ..... {base_speed} (win chance {:.0%})',
+    '2. Improve Base Damage .... {base_damage} (win chance {:.0%})',
+    '3. Improve Base Defence ... {base_defence} (win chance {:.0%})',
+    '4. Back',
+])
+
+message_layouts = {
+    'unblocked': "{defender} wasn't fast enough and couldn't block {attacker}'s attack! {damage} damage delt.",
+    'dodged': "{defender} was too fast and successfully dodged {attacker}'s attack! 0 damage delt.",
+    'blocked': "{defender} was able to block {attacker}'s attack! {damage} damage made it through.",
+    'absorbed': "{defender} was able to completely block {attacker}'s attack! 0 damage delt.",
+    'knockout': '{defender} was knocked out! {attacker} WON!!',
+}
+draw_message = 'The duel was a draw. Neither side wins!'
+
+
+def health_bar(health: float, max_health: float) -> str:
+    """Health bar of a knight.
+
+    ### Parameters:
+    ----
+    health : float
+        remaining health
+    max_health : float
+        total health pool
+
+    ### Returns:
+    ----
+    str
+        bar filled in proportion to the remaining health
+    """
+
+    filled = int(health / max_health * bar_width) if max_health > 0 else 0
+    return health_bars[min(max(filled, 0), bar_width)]
+
+
+def item_table(items: list, labels: list = None) -> str:
+    """Fixed-width table of items.
+
+    ### Parameters:
+    ----
+    items : list
+        items to be displayed, None for an empty slot
+    labels : list
+        label of each row, the index of the row if None
+
+    ### Returns:
+    ----
+    str
+        header followed by a row for each item
+    """
+
+    if labels is None:
+        labels = range(len(items))
+    labels = [str(label) for label in labels]
+    width = max([len(label) for label in labels], default=0) + 2
+
+    rows = [row_layout.format('', *item_columns, width=width)]
+    for label, item in zip(labels, items):
+        if item is None:
+            values = ['-'] * len(item_columns)
+        else:
+            values = [getattr(item, column) for column in item_columns]
+        rows.append(row_layout.format(label, *values, width=width))
+
+    return '\n'.join(rows)
+
+
+def knight_screen(knight) -> str:
+    """Stats and equipped items of a knight.
+
+    ### Parameters:
+    ----
+    knight : Knight
+        knight to be displayed
+
+    ### Returns:
+    ----
+    str
+        screen displayed when the knight wins
+    """
+
+    stats = knight_layout.format(
+        name=knight.name, gold=knight.gold, base_speed=knight.base_speed, speed=knight.speed,
+        base_health=knight.base_health, max_health=knight.max_health,
+        base_damage=knight.base_damage, base_defence=knight.base_defence
+    )
+    items = [knight.equipped[item_type] for item_type in knight.item_types]
+
+    return stats + '\n\n' + item_table(items, knight.item_types)
+
+
+def train_screen(knight, chances: list) -> str:
+    """Training menu with the win chance after each option.
+
+    ### Parameters:
+    ----
+    knight : Knight
+        knight to be trained
+    chances : list
+        win chance without training followed by the win chance after each
+        training option
+
+    ### Returns:
+    ----
+    str
+        training menu screen
+    """
+
+    return train_layout.format(
+        *chances, max_health=knight.max_health, base_speed=knight.base_speed,
+        base_damage=knight.base_damage, base_defence=knight.base_defence
+    )
+
+
+def combat_frame(player, opponent, message: str) -> list:
+    """Lines of the combat display.
+
+    ### Parameters:
+    ----
+    player : Knight
+        knight representing the player
+    opponent : Knight
+        knight opposing the player
+    message : str
+        status of the combat
+
+    ### Returns:
+    ----
+    list
+        lines of the frame
+    """
+
+    return [
+        f'Player: {player.name}' + ' ' * (30 - len(player.name)) + f'Gold: {player.gold}',
+        f'Health: {player.base_health} / {player.max_health}',
+        health_bar(player.base_health, player.max_health),
+        '',
+        message,
+        '',
+        f'Opponent: {opponent.name}' + ' ' * (30 - len(opponent.name)) + f'Gold: {opponent.gold}',
+        f'Health: {opponent.base_health} / {opponent.max_health}',
+        health_bar(opponent.base_health, opponent.max_health),
+    ]
+
+
+def combat_message(branch: str, attacker: str, defender: str, damage: int) -> str:
+    """Status message of an attack.
+
+    ### Parameters:
+    ----
+    branch : str
+        'unblocked', 'dodged', 'blocked', 'absorbed', or 'knockout'
+    attacker : str
+        name of the attacking knight
+    defender : str
+        name of the defending knight
+    damage : int
+        damage dealt
+
+    ### Returns:
+    ----
+    str
+        message displayed in the combat frame
+    """
+
+    return message_layouts[branch].format(attacker=attacker, defender=defender, damage=damage)
+
+
+class Renderer():
+    """Draws frames to a terminal stream.
+
+    The last frame drawn (front buffer) is kept so the next frame (back
+    buffer) can be drawn in place, rewriting only the lines that changed.
+
+    ### Attributes:
+    ----
+    stream : TextIO
+        stream the frames are written to, standard output if None
+    ansi : bool
+        whether frames are redrawn in place using ANSI escape codes,
+        detected from the stream if None
+
+    ### Methods:
+    ----
+    write(text: str)
+        writes text below the current frame and starts a new frame region
+    draw(lines: list)
+        draws a frame, over the previous frame if possible
+    reset()
+        starts a new frame region below any previous frame
+    """
+
+    def __init__(self, stream=None, ansi: bool = None):
+        self.stream = stream
+        self.ansi = ansi
+        self._front = None
+
+    def _target(self):
+        """Stream to write to, standard output at the time of writing if no
+        stream was given."""
+
+        stream = self.stream if self.stream is not None else sys.stdout
+        if self.ansi is None:
+            self.ansi = stream.isatty() and os.environ.get('TERM') != 'dumb'
+
+            # Enable escape code processing in the Windows console
+            if self.ansi and os.name == 'nt':
+                os.system('')
+
+        return stream
+
+    def write(self, text: str):
+        """Writes text below the current frame and starts a new frame region.
+
+        ### Parameters:
+        ----
+        text : str
+            text to be written, a new line is added at the end
+        """
+
+        stream = self._target()
+        self._front = None
+        stream.write(text + '\n')
+        stream.flush()
+
+    def draw(self, lines: list):
+        """Draws a frame, over the previous frame if possible.
+
+        ### Parameters:
+        ----
+        lines : list
+            lines of the frame
+        """
+
+        stream = self._target()
+
+        # Without ANSI support or a previous frame, scroll the frame onto the
+        # screen below a gap
+        if not self.ansi or self._front is None:
+            buffer = '\n' * 3 + '\n'.join(lines) + '\n'
+
+        # Move to the top of the previous frame and rewrite changed lines
+        else:
+            parts = [f'\x1b[{len(self._front)}F']
+            for num in range(max(len(lines), len(self._front))):
+                line = lines[num] if num < len(lines) else ''
+                previous = self._front[num] if num < len(self._front) else None
+                if line != previous:
+                    parts.append('\x1b[2K' + line)
+                parts.append('\n')
+            buffer = ''.join(parts)
+            lines = lines + [''] * (len(self._front) - len(lines))
+
+        stream.write(buffer)
+        stream.flush()
+        self._front = lines
+
+    def reset(self):
+        """Starts a new frame region below any previous frame."""
+
+        self._front = None
+
+
+renderer = Renderer()
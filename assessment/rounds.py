@@ -0,0 +1,161 @@
+"""Round engine which resolves a duel for every pair of knights in an arena
+at once, as numpy array operations.
+
+Every duel of a round is encoded into one set of rows and resolved together
+by engine.play_duels(). The results are then committed in two steps: the
+stats and gold of every knight are read into arrays, the training bonuses
+and purse losses of Knight._lose() are applied to every loser at once, and
+the arrays are written back. Each knockout is then handed to
+Arena._knockout() in the order of the pairs, which pays the winner, grows
+the pot, and re-equips the winner, while the losers are moved to the end of
+the queue together, so a committed round leaves the arena as kernel.commit()
+would for the same results.
+
+### Functions
+----
+resolve_round(arena : Arena, pairs : list, rng : numpy.random.Generator) -> tuple
+    resolves a duel for every pair and commits the results to the arena
+commit_round(arena : Arena, pairs : list, outcome : numpy.ndarray, turns : numpy.ndarray, player_health : numpy.ndarray, opponent_health : numpy.ndarray)
+    applies the results of a round of duels to the knights and the arena
+
+### Parameters:
+----
+columns
+    knight stats read into an array in the commit step, alongside gold
+"""
+
+# Import dependencies
+from assessment import numpy
+from assessment.engine import encode_knights, play_duels
+from assessment.inventory import Inventory
+
+columns = ['base_health', 'max_health', 'base_speed', 'base_damage', 'base_defence']
+
+
+def _shuffled_pairs(arena, rng) -> list:
+    """Random disjoint pairs of the arena's knights from one shuffle, as
+    kernel.round_pairs() without removing knights from a list one at a
+    time."""
+
+    order = rng.permutation(len(arena.knights)).tolist()
+    knights = [arena.knights[num] for num in order]
+
+    return list(zip(knights[0::2], knights[1::2]))
+
+
+def resolve_round(arena, pairs: list = None, rng=None) -> tuple:
+    """Resolves a duel for every pair at once and commits the results to the
+    arena.
+
+    ### Parameters:
+    ----
+    arena : Arena
+        arena the duels are fought in
+    pairs : list
+        (player, opponent) tuples, no knight may appear in more than one
+        pair; random disjoint pairs of the arena's knights if None
+    rng : numpy.random.Generator
+        random number generator for every roll, a new one if None
+
+    ### Returns:
+    ----
+    tuple
+        (pairs, outcome, turns) where outcome is 1 if the player of a pair
+        won, -1 if the opponent won, and 0 for a draw, and turns is the
+        number of attacks made in each duel
+    """
+
+    if rng is None:
+        rng = numpy.random.default_rng()
+    if pairs is None:
+        pairs = _shuffled_pairs(arena, rng)
+    if not pairs:
+        return (pairs, numpy.zeros(0, dtype=int), numpy.zeros(0, dtype=int))
+
+    players = encode_knights([player for player, _ in pairs])
+    opponents = encode_knights([opponent for _, opponent in pairs])
+    outcome, turns, player_health, opponent_health = play_duels(players, opponents, rng)
+    commit_round(arena, pairs, outcome, turns, player_health, opponent_health)
+
+    return (pairs, outcome, turns)
+
+
+def commit_round(arena, pairs: list, outcome: numpy.ndarray, turns: numpy.ndarray,
+                 player_health: numpy.ndarray, opponent_health: numpy.ndarray):
+    """Applies the results of a round of duels to the knights and the arena,
+    with the same updates as kernel.commit() applied to each pair in order.
+    Each pair's knockout event, if any, and duel event are sent in the order
+    of the pairs.
+
+    ### Parameters:
+    ----
+    arena : Arena
+        arena the duels were fought in
+    pairs : list
+        (player, opponent) tuples the duels were fought between
+    outcome : numpy.ndarray
+        1 if the player of a pair won, -1 if the opponent won, 0 for a draw
+    turns : numpy.ndarray
+        number of attacks made in each duel
+    player_health : numpy.ndarray
+        health left to the player of each pair
+    opponent_health : numpy.ndarray
+        health left to the opponent of each pair
+    """
+
+    # Knights in rows, each pair's player followed by its opponent
+    knights = [knight for pair in pairs for knight in pair]
+    knockouts = numpy.flatnonzero(outcome != 0)
+    winners = 2 * knockouts + (outcome[knockouts] == -1)
+    losers = 2 * knockouts + (outcome[knockouts] == 1)
+
+    # Gold stays exact as Python integers once it outgrows int64
+    gold = [knight.gold for knight in knights]
+    gold = numpy.array(gold, dtype=object if max(gold) >= 2 ** 62 else numpy.int64)
+    stats = numpy.array([[getattr(knight, column) for column in columns] for knight in knights], dtype=numpy.int64)
+    health, max_health, speed, damage, defence = (stats[:, num] for num in range(len(columns)))
+    health[0::2] = player_health
+    health[1::2] = opponent_health
+
+    # Same updates as Knight._lose()
+    lost = gold[losers] // 2
+    gold[losers] -= lost
+    health[losers] = max_health[losers]
+    speed[losers] += 2
+    damage[losers] += 5
+    defence[losers] += 5
+    max_health[losers] += 10
+
+    for knight, row, knight_gold in zip(knights, stats.tolist(), gold.tolist()):
+        knight.gold = knight_gold
+        for column, value in zip(columns, row):
+            setattr(knight, column, value)
+    level = arena.level
+    arena.duels += len(pairs)
+
+    # Move losers to end of list of knights, in the order they lost, in one
+    # pass rather than removing each from the list
+    moved = [knights[loser] for loser in losers.tolist() if knights[loser] is not arena.knights[0]]
+    moved_ids = {id(knight) for knight in moved}
+    arena.knights[:] = [knight for knight in arena.knights if id(knight) not in moved_ids] + moved
+
+    # Hand each loser's items and lost gold to the winner, staying within
+    # the catalog as kernel.commit(), sending each duel's events together so
+    # listeners can tell the duels apart
+    knockouts = iter(zip(winners.tolist(), losers.tolist(), lost.tolist()))
+    for (player, opponent), result, duel_turns in zip(pairs, outcome.tolist(), turns.tolist()):
+        if result != 0:
+            winner, loser, loser_gold = next(knockouts)
+            loot = (knights[loser].inventory, loser_gold)
+            knights[loser].inventory = Inventory()
+            arena._knockout(knights[winner], knights[loser], loot, clamp=True, requeue=False)
+
+        if arena.listeners:
+            arena._emit('duel', {
+                'level': level,
+                'player': player,
+                'opponent': opponent,
+                'turns': duel_turns,
+                'result': 'draw' if result == 0 else 'knockout',
+                'predicted': False
+            })
@@ -0,0 +1,278 @@
+"""Season mode: many tournaments chained in one arena, run headless.
+
+The knights keep their stats, gold, equipment, and inventory from one
+tournament to the next, while the arena level and the gold pot are reset
+and every knight is healed at the start of each tournament. Each knight's
+inventory is capped so the memory used stays the same however many
+tournaments are run, and standings are produced after every tournament
+instead of being collected. Fights whose outcome is certain are resolved
+without rolling any attacks (see Arena.predict()), and by default winners
+only equip new items which improve their loadout (see Knight.upgrade()). The
+season can be saved to a checkpoint file
+and resumed from it, with the same random numbers as an uninterrupted run.
+
+Run this module directly to play a season and print the standings:
+
+    python -m assessment.season TOURNAMENTS [CHECKPOINT] [METRICS]
+
+where METRICS is a json file resource usage snapshots are written to while the
+season is played (see metrics.MetricsSampler).
+
+### Classes
+----
+Season(knights : int, inventory_cap : int, max_fights : int, season_seed : int, sparse_upgrades : bool)
+    chained tournaments with persistent knights
+
+### Parameters:
+----
+max_level
+    arena level at which a tournament ends, as in the main game
+"""
+
+# Import dependencies
+from assessment import os, sys, pickle, seed, getstate, setstate
+from assessment.classes import Arena
+from assessment.metrics import MetricsSampler
+
+max_level = 8
+
+
+class Season():
+    """Chained tournaments with persistent knights.
+
+    ### Attributes:
+    ----
+    arena : Arena
+        arena every tournament is fought in
+    tournament : int
+        number of tournaments completed
+    records : dict
+        wins, losses, draws, and tournament wins of each knight, by name
+    inventory_cap : int
+        most items kept in each knight's inventory
+    max_fights : int
+        fights after which a tournament ends if max_level is not reached
+
+    ### Methods:
+    ----
+    play_tournament() -> list
+        plays one tournament and returns the standings
+    run(tournaments: int, checkpoint: str, every: int) -> iterable
+        plays tournaments, yielding the standings after each one
+    standings() -> list
+        knights ordered by gold
+    save(path: str)
+        writes a checkpoint of the season
+    load(path: str) -> Season
+        resumes a season from a checkpoint
+    """
+
+    def __init__(self, knights: int = 8, inventory_cap: int = 50, max_fights: int = 200,
+                 season_seed: int = None, sparse_upgrades: bool = True):
+        if season_seed is not None:
+            seed(season_seed)
+
+        self.arena = Arena()
+        self.tournament = 0
+        self.records = {}
+        self.inventory_cap = inventory_cap
+        self.max_fights = max_fights
+        self.arena.precheck = True
+        self.arena.sparse_upgrades = sparse_upgrades
+        for num in range(knights):
+            self.arena.add_knight(f'Knight {num}')
+        for knight in self.arena.knights:
+            knight.inventory_cap = inventory_cap
+            self.records[knight.name] = {'wins': 0, 'losses': 0, 'draws': 0, 'titles': 0}
+        self.arena.add_listener(self._record)
+
+    def _record(self, event: str, data: dict):
+        """Counts the results of each duel."""
+
+        if event == 'knockout':
+            self.records[data['winner'].name]['wins'] += 1
+            self.records[data['loser'].name]['losses'] += 1
+        elif event == 'duel' and data['result'] == 'draw':
+            self.records[data['player'].name]['draws'] += 1
+            self.records[data['opponent'].name]['draws'] += 1
+
+    def play_tournament(self) -> list:
+        """Plays one tournament and returns the standings. The knight who
+        gained the most gold during the tournament wins its title, with ties
+        going to the most knockouts.
+
+        ### Returns:
+        ----
+        list
+            standings after the tournament, as standings()
+        """
+
+        # Reset the arena and heal every knight
+        self.arena.level = 0
+        self.arena.gold = 5
+        for knight in self.arena.knights:
+            knight.base_health = knight.max_health
+        gold = {knight.name: knight.gold for knight in self.arena.knights}
+        wins = {name: record['wins'] for name, record in self.records.items()}
+
+        fights = 0
+        while self.arena.level < max_level and fights < self.max_fights:
+            self.arena.fight(display=False)
+            fights += 1
+
+        # The title goes to the most gold gained in this tournament, then the
+        # most knockouts, as gold carried from earlier tournaments would
+        # otherwise keep the title with the same knight
+        self.tournament += 1
+        if self.arena.knights:
+            champion = max(self.arena.knights, key=lambda knight: (
+                knight.gold - gold[knight.name], self.records[knight.name]['wins'] - wins[knight.name]
+            ))
+            self.records[champion.name]['titles'] += 1
+
+        return self.standings()
+
+    def run(self, tournaments: int, checkpoint: str = None, every: int = 100):
+        """Plays tournaments, yielding the standings after each one.
+
+        ### Parameters:
+        ----
+        tournaments : int
+            number of tournaments to play
+        checkpoint : str
+            file the season is saved to, None to never save
+        every : int
+            number of tournaments between checkpoints
+
+        ### Returns:
+        ----
+        iterable
+            (tournament, standings) after each tournament
+        """
+
+        for _ in range(tournaments):
+            standings = self.play_tournament()
+            if checkpoint is not None and self.tournament % every == 0:
+                self.save(checkpoint)
+
+            yield self.tournament, standings
+
+        if checkpoint is not None:
+            self.save(checkpoint)
+
+    def standings(self) -> list:
+        """Knights ordered by gold.
+
+        ### Returns:
+        ----
+        list
+            dictionaries with the name, gold, stats, inventory size, and
+            record of each knight, most gold first
+        """
+
+        rows = []
+        for knight in self.arena.knights:
+            row = {
+                'name': knight.name,
+                'gold': knight.gold,
+                'max_health': knight.max_health,
+                'base_damage': knight.base_damage,
+                'base_defence': knight.base_defence,
+                'base_speed': knight.base_speed,
+                'items': len(knight.inventory),
+            }
+            row.update(self.records[knight.name])
+            rows.append(row)
+
+        rows.sort(key=lambda row: row['gold'], reverse=True)
+        return rows
+
+    def save(self, path: str):
+        """Writes a checkpoint of the season, replacing any previous
+        checkpoint only once the new one is complete.
+
+        ### Parameters:
+        ----
+        path : str
+            location of the checkpoint file
+        """
+
+        state = {
+            'knights': self.arena.knights,
+            'tournament': self.tournament,
+            'records': self.records,
+            'inventory_cap': self.inventory_cap,
+            'max_fights': self.max_fights,
+            'sparse_upgrades': self.arena.sparse_upgrades,
+            'turns_saved': self.arena.turns_saved,
+            'random': getstate(),
+        }
+
+        temp_path = path + '.tmp'
+        with open(temp_path, mode='wb') as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        """Resumes a season from a checkpoint.
+
+        ### Parameters:
+        ----
+        path : str
+            location of the checkpoint file
+
+        ### Returns:
+        ----
+        Season
+            season continuing after the last saved tournament
+        """
+
+        with open(path, mode='rb') as file:
+            state = pickle.load(file)
+
+        season = cls(
+            knights=0, inventory_cap=state['inventory_cap'], max_fights=state['max_fights'],
+            sparse_upgrades=state.get('sparse_upgrades', True)
+        )
+        season.arena.knights = state['knights']
+        season.tournament = state['tournament']
+        season.records = state['records']
+        season.arena.turns_saved = state.get('turns_saved', 0)
+        setstate(state['random'])
+
+        return season
+
+
+# Play a season and print the standings if run directly
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print('Usage: python -m assessment.season TOURNAMENTS [CHECKPOINT] [METRICS]')
+        sys.exit(1)
+
+    tournaments = int(sys.argv[1])
+    checkpoint = sys.argv[2] if len(sys.argv) > 2 else None
+    if checkpoint is not None and os.path.exists(checkpoint):
+        season = Season.load(checkpoint)
+    else:
+        season = Season()
+
+    # Sample resource usage on a background thread while playing
+    sampler = None
+    if len(sys.argv) > 3:
+        sampler = MetricsSampler([season.arena], sys.argv[3])
+        sampler.start()
+
+    layout = '{:<12}{:>14}{:>7}{:>7}{:>7}{:>8}{:>7}'
+    for tournament, standings in season.run(max(tournaments - season.tournament, 0), checkpoint):
+        if tournament % 100 == 0 or tournament == tournaments:
+            print(f'\nAfter tournament {tournament}::')
+            print(layout.format('name', 'gold', 'wins', 'losses', 'draws', 'titles', 'items'))
+            for row in standings:
+                print(layout.format(
+                    row['name'], row['gold'], row['wins'], row['losses'], row['draws'], row['titles'], row['items']
+                ))
+
+    if sampler is not None:
+        sampler.stop()
+        print(f'\nMetrics written to {sys.argv[3]}')
@@ -0,0 +1,256 @@
+"""Sharded arena runner for season simulations.
+
+Independent arenas are split across worker processes (shards). Each worker
+owns the Arena and Knight objects of its arenas and, after every fight,
+writes the roster state of those arenas into numpy arrays backed by a
+multiprocessing shared memory block. The coordinating process reads live
+standings straight from the same arrays, without serializing anything
+between processes. Rows may be read while a worker is part-way through
+updating them, so live standings are a snapshot accurate to within a fight.
+
+### Classes
+----
+ShardedRunner(shards : int, arenas : int, knights : int, tournaments : int, base_seed : int)
+    runs many headless arenas across worker processes
+
+### Parameters:
+----
+knight_columns
+    columns of the shared knight roster
+arena_columns
+    columns of the shared arena table
+max_level
+    arena level at which a tournament ends, as in the main game
+"""
+
+# Import dependencies
+from assessment import seed, numpy, multiprocessing, shared_memory
+from assessment.classes import Arena
+
+knight_columns = ['arena', 'gold', 'wins', 'losses', 'draws']
+arena_columns = ['level', 'pot', 'fights', 'tournaments', 'done']
+max_level = 8
+
+
+def _views(buffer, arenas: int, knights: int) -> tuple:
+    """Knight roster and arena table arrays over a shared memory buffer."""
+
+    roster_size = arenas * knights * len(knight_columns)
+    roster = numpy.ndarray((arenas * knights, len(knight_columns)), dtype=numpy.float64, buffer=buffer)
+    table = numpy.ndarray(
+        (arenas, len(arena_columns)), dtype=numpy.float64, buffer=buffer,
+        offset=roster_size * numpy.dtype(numpy.float64).itemsize
+    )
+
+    return roster, table
+
+
+class _RosterWriter():
+    """Arena listener writing knight results into the shared roster."""
+
+    def __init__(self, roster, rows: dict):
+        self.roster = roster
+        self.rows = rows
+
+    def __call__(self, event: str, data: dict):
+        if event == 'knockout':
+            winner = self.rows[data['winner']]
+            loser = self.rows[data['loser']]
+            self.roster[winner, 2] += 1
+            self.roster[loser, 3] += 1
+            self.roster[winner, 1] = data['winner'].gold
+            self.roster[loser, 1] = data['loser'].gold
+
+        elif event == 'duel' and data['result'] == 'draw':
+            self.roster[self.rows[data['player']], 4] += 1
+            self.roster[self.rows[data['opponent']], 4] += 1
+
+
+def _run_shard(name: str, arenas: int, knights: int, arena_ids: list, tournaments: int, shard_seed: int):
+    """Runs the arenas of one shard, writing their state into shared memory."""
+
+    memory = shared_memory.SharedMemory(name=name)
+    roster, table = _views(memory.buf, arenas, knights)
+    seed(shard_seed)
+
+    # Build the arenas of the shard, mapping each knight to its roster row
+    shard = []
+    for arena_id in arena_ids:
+        arena = Arena()
+        arena.precheck = True
+        rows = {}
+        for num in range(knights):
+            arena.add_knight(f'Knight {arena_id}-{num}')
+            rows[arena.knights[-1]] = arena_id * knights + num
+        arena.add_listener(_RosterWriter(roster, rows))
+        shard.append((arena_id, arena))
+
+    # Interleave fights between the arenas so every arena progresses together
+    running = list(shard)
+    while running:
+        for arena_id, arena in list(running):
+            arena.fight(display=False)
+            table[arena_id, 2] += 1
+
+            # Start the next tournament with the same knights
+            if arena.level >= max_level:
+                table[arena_id, 3] += 1
+                arena.level = 0
+                arena.gold = 5
+            table[arena_id, 0] = arena.level
+            table[arena_id, 1] = arena.gold
+
+            if table[arena_id, 3] >= tournaments:
+                table[arena_id, 4] = 1
+                running.remove((arena_id, arena))
+
+    # Release the views before closing the shared memory
+    del roster, table
+    memory.close()
+
+
+class ShardedRunner():
+    """Runs many headless arenas across worker processes, with the roster of
+    every arena kept in shared memory.
+
+    ### Attributes:
+    ----
+    shards : int
+        number of worker processes
+    arenas : int
+        total number of arenas, split evenly between shards
+    knights : int
+        number of knights in each arena
+    tournaments : int
+        number of tournaments each arena runs before it is done
+    base_seed : int
+        seed of the first shard, each shard is seeded with base_seed + shard
+    roster : numpy.ndarray
+        live knight roster, one row per knight and one column per entry of
+        knight_columns
+    table : numpy.ndarray
+        live arena table, one row per arena and one column per entry of
+        arena_columns
+
+    ### Methods:
+    ----
+    start()
+        starts every shard
+    running() -> bool
+        whether any shard is still running
+    join()
+        waits for every shard to finish
+    standings(top: int) -> list
+        knights with the most gold across every shard
+    progress() -> dict
+        fights and tournaments completed across every shard
+    close()
+        stops any running shard and frees the shared memory
+    """
+
+    def __init__(self, shards: int = 4, arenas: int = 16, knights: int = 8, tournaments: int = 10,
+                 base_seed: int = 0):
+        self.shards = shards
+        self.arenas = arenas
+        self.knights = knights
+        self.tournaments = tournaments
+        self.base_seed = base_seed
+
+        cells = arenas * knights * len(knight_columns) + arenas * len(arena_columns)
+        size = cells * numpy.dtype(numpy.float64).itemsize
+        self._memory = shared_memory.SharedMemory(create=True, size=size)
+        self.roster, self.table = _views(self._memory.buf, arenas, knights)
+        self.roster[:] = 0
+        self.table[:] = 0
+        self.roster[:, 0] = numpy.repeat(numpy.arange(arenas), knights)
+        self.table[:, 1] = 5
+        self._processes = []
+
+    def start(self):
+        """Starts every shard."""
+
+        for shard in range(self.shards):
+            arena_ids = list(range(shard, self.arenas, self.shards))
+            if not arena_ids:
+                continue
+
+            process = multiprocessing.Process(target=_run_shard, args=(
+                self._memory.name, self.arenas, self.knights, arena_ids, self.tournaments,
+                self.base_seed + shard
+            ))
+            process.start()
+            self._processes.append(process)
+
+    def running(self) -> bool:
+        """Whether any shard is still running.
+
+        ### Returns:
+        ----
+        bool
+            True while any worker process is alive
+        """
+
+        return any(process.is_alive() for process in self._processes)
+
+    def join(self):
+        """Waits for every shard to finish."""
+
+        for process in self._processes:
+            process.join()
+
+    def standings(self, top: int = 10) -> list:
+        """Knights with the most gold across every shard.
+
+        ### Parameters:
+        ----
+        top : int
+            number of knights to include
+
+        ### Returns:
+        ----
+        list
+            dictionaries with arena, knight, gold, wins, losses, and draws
+            for each knight, most gold first
+        """
+
+        snapshot = self.roster.copy()
+        order = numpy.argsort(-snapshot[:, 1], kind='stable')[:top]
+
+        return [{
+            'arena': int(snapshot[row, 0]),
+            'knight': int(row % self.knights),
+            'gold': int(snapshot[row, 1]),
+            'wins': int(snapshot[row, 2]),
+            'losses': int(snapshot[row, 3]),
+            'draws': int(snapshot[row, 4]),
+        } for row in order]
+
+    def progress(self) -> dict:
+        """Fights and tournaments completed across every shard.
+
+        ### Returns:
+        ----
+        dict
+            total fights, tournaments, and arenas done
+        """
+
+        snapshot = self.table.copy()
+        return {
+            'fights': int(snapshot[:, 2].sum()),
+            'tournaments': int(snapshot[:, 3].sum()),
+            'arenas_done': int(snapshot[:, 4].sum()),
+        }
+
+    def close(self):
+        """Stops any running shard and frees the shared memory."""
+
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+        self._processes = []
+
+        # Views must be released before the shared memory is closed
+        self.roster = self.table = None
+        self._memory.close()
+        self._memory.unlink()
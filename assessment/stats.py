@@ -0,0 +1,498 @@
+"""Online statistics for tournaments, fed by the combat events of an Arena.
+
+Every statistic is updated one value at a time in constant memory, so they
+can follow millions of duels: running mean and variance (Welford's
+algorithm), quantile sketches (a merging t-digest), and fixed-bin
+histograms.
+
+### Classes
+----
+RunningStats()
+    streaming count, mean, variance, minimum, and maximum
+QuantileSketch(compression : int, buffer_size : int)
+    streaming quantile estimates in bounded memory
+Histogram(lower : float, upper : float, bins : int)
+    fixed-width bins with underflow and overflow counts
+Distribution(lower : float, upper : float, bins : int)
+    running stats, quantile sketch, and histogram of the same values
+TournamentStats()
+    arena listener aggregating per-round distributions
+"""
+
+# Import dependencies
+from assessment import sqrt, asin, sin, pi
+
+
+class RunningStats():
+    """Streaming count, mean, variance, minimum, and maximum.
+
+    ### Attributes:
+    ----
+    count : int
+        number of values added
+    mean : float
+        mean of the values
+    minimum : float
+        smallest value, None if empty
+    maximum : float
+        largest value, None if empty
+
+    ### Methods:
+    ----
+    add(value: float)
+        adds a value
+    merge(other: RunningStats)
+        adds every value summarised by another RunningStats
+    variance() -> float
+        sample variance of the values
+    std() -> float
+        sample standard deviation of the values
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.minimum = None
+        self.maximum = None
+        self._m2 = 0.0
+
+    def add(self, value: float):
+        """Adds a value.
+
+        ### Parameters:
+        ----
+        value : float
+            value to be added
+        """
+
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other):
+        """Adds every value summarised by another RunningStats.
+
+        ### Parameters:
+        ----
+        other : RunningStats
+            statistics to be merged in
+        """
+
+        if other.count == 0:
+            return
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.minimum = other.minimum if self.minimum is None else min(self.minimum, other.minimum)
+        self.maximum = other.maximum if self.maximum is None else max(self.maximum, other.maximum)
+
+    def variance(self) -> float:
+        """Sample variance of the values.
+
+        ### Returns:
+        ----
+        float
+            sample variance, 0 with fewer than 2 values
+        """
+
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def std(self) -> float:
+        """Sample standard deviation of the values.
+
+        ### Returns:
+        ----
+        float
+            sample standard deviation, 0 with fewer than 2 values
+        """
+
+        return sqrt(self.variance())
+
+
+class QuantileSketch():
+    """Streaming quantile estimates in bounded memory, using a merging
+    t-digest. Values are buffered and periodically merged into weighted
+    centroids, which are kept small near the tails so extreme quantiles stay
+    accurate.
+
+    ### Attributes:
+    ----
+    compression : int
+        controls accuracy, at most about compression centroids are kept
+    buffer_size : int
+        number of values buffered before they are merged
+    count : float
+        total weight of the values added
+
+    ### Methods:
+    ----
+    add(value: float, weight: float)
+        adds a value
+    merge(other: QuantileSketch)
+        adds every value summarised by another QuantileSketch
+    quantile(q: float) -> float
+        estimated value at quantile q
+    """
+
+    def __init__(self, compression: int = 100, buffer_size: int = 500):
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self.count = 0
+        self._centroids = []
+        self._buffer = []
+        self._minimum = None
+        self._maximum = None
+
+    def _scale(self, q: float) -> float:
+        """Scale function mapping a quantile to a centroid index."""
+
+        return self.compression / (2 * pi) * asin(2 * q - 1)
+
+    def _inverse(self, k: float) -> float:
+        """Quantile at which a centroid index is reached."""
+
+        k = min(k, self.compression / 4)
+        return (sin(k * 2 * pi / self.compression) + 1) / 2
+
+    def add(self, value: float, weight: float = 1):
+        """Adds a value.
+
+        ### Parameters:
+        ----
+        value : float
+            value to be added
+        weight : float
+            number of times the value is counted
+        """
+
+        self._buffer.append((value, weight))
+        self.count += weight
+        if self._minimum is None or value < self._minimum:
+            self._minimum = value
+        if self._maximum is None or value > self._maximum:
+            self._maximum = value
+        if len(self._buffer) >= self.buffer_size:
+            self._flush()
+
+    def merge(self, other):
+        """Adds every value summarised by another QuantileSketch.
+
+        ### Parameters:
+        ----
+        other : QuantileSketch
+            sketch to be merged in
+        """
+
+        other._flush()
+        for mean, weight in other._centroids:
+            self.add(mean, weight)
+        if other._minimum is not None:
+            self._minimum = min(self._minimum, other._minimum)
+            self._maximum = max(self._maximum, other._maximum)
+
+    def _flush(self):
+        """Merges buffered values into the centroids."""
+
+        if not self._buffer:
+            return
+
+        points = sorted(self._centroids + self._buffer)
+        self._buffer = []
+        total = sum(weight for _, weight in points)
+
+        # Merge neighbouring points while the centroid stays within one unit
+        # of the scale function
+        centroids = []
+        before = 0
+        limit = self._inverse(self._scale(0) + 1) * total
+        mean, weight = points[0]
+        for point_mean, point_weight in points[1:]:
+            if before + weight + point_weight <= limit:
+                weight += point_weight
+                mean += (point_mean - mean) * point_weight / weight
+            else:
+                centroids.append((mean, weight))
+                before += weight
+                limit = self._inverse(self._scale(before / total) + 1) * total
+                mean, weight = point_mean, point_weight
+        centroids.append((mean, weight))
+        self._centroids = centroids
+
+    def quantile(self, q: float) -> float:
+        """Estimated value at quantile q.
+
+        ### Parameters:
+        ----
+        q : float
+            quantile between 0 and 1
+
+        ### Returns:
+        ----
+        float
+            estimated value, None if no values were added
+        """
+
+        self._flush()
+        if not self._centroids:
+            return None
+
+        target = q * self.count
+        # Interpolate between centroid centres, anchored at the extremes
+        previous_position, previous_mean = 0, self._minimum
+        position = 0
+        for mean, weight in self._centroids:
+            centre = position + weight / 2
+            if target < centre:
+                span = centre - previous_position
+                fraction = (target - previous_position) / span if span > 0 else 0
+                return previous_mean + (mean - previous_mean) * fraction
+            previous_position, previous_mean = centre, mean
+            position += weight
+
+        span = self.count - previous_position
+        fraction = (target - previous_position) / span if span > 0 else 0
+        return previous_mean + (self._maximum - previous_mean) * fraction
+
+
+class Histogram():
+    """Fixed-width bins with underflow and overflow counts.
+
+    ### Attributes:
+    ----
+    lower : float
+        lower edge of the first bin
+    upper : float
+        upper edge of the last bin
+    counts : list
+        number of values in each bin
+    underflow : int
+        number of values below lower
+    overflow : int
+        number of values at or above upper
+
+    ### Methods:
+    ----
+    add(value: float)
+        adds a value
+    merge(other: Histogram)
+        adds the counts of another histogram with the same bins
+    edges() -> list
+        edges of every bin
+    """
+
+    def __init__(self, lower: float, upper: float, bins: int):
+        self.lower = lower
+        self.upper = upper
+        self.counts = [0] * bins
+        self.underflow = 0
+        self.overflow = 0
+        self._width = (upper - lower) / bins
+
+    def add(self, value: float):
+        """Adds a value.
+
+        ### Parameters:
+        ----
+        value : float
+            value to be added
+        """
+
+        if value < self.lower:
+            self.underflow += 1
+        elif value >= self.upper:
+            self.overflow += 1
+        else:
+            self.counts[min(int((value - self.lower) / self._width), len(self.counts) - 1)] += 1
+
+    def merge(self, other):
+        """Adds the counts of another histogram with the same bins.
+
+        ### Parameters:
+        ----
+        other : Histogram
+            histogram to be merged in
+        """
+
+        self.counts = [mine + theirs for mine, theirs in zip(self.counts, other.counts)]
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+
+    def edges(self) -> list:
+        """Edges of every bin.
+
+        ### Returns:
+        ----
+        list
+            len(counts) + 1 bin edges
+        """
+
+        return [self.lower + self._width * num for num in range(len(self.counts) + 1)]
+
+
+class Distribution():
+    """Running stats, quantile sketch, and histogram of the same values.
+
+    ### Attributes:
+    ----
+    stats : RunningStats
+        count, mean, variance, minimum, and maximum
+    sketch : QuantileSketch
+        quantile estimates
+    histogram : Histogram
+        counts per bin
+
+    ### Methods:
+    ----
+    add(value: float)
+        adds a value
+    merge(other: Distribution)
+        adds every value summarised by another Distribution
+    summary() -> dict
+        count, mean, standard deviation, extremes, and quartiles
+    """
+
+    def __init__(self, lower: float, upper: float, bins: int):
+        self.stats = RunningStats()
+        self.sketch = QuantileSketch()
+        self.histogram = Histogram(lower, upper, bins)
+
+    def add(self, value: float):
+        """Adds a value.
+
+        ### Parameters:
+        ----
+        value : float
+            value to be added
+        """
+
+        self.stats.add(value)
+        self.sketch.add(value)
+        self.histogram.add(value)
+
+    def merge(self, other):
+        """Adds every value summarised by another Distribution.
+
+        ### Parameters:
+        ----
+        other : Distribution
+            distribution with the same bins to be merged in
+        """
+
+        self.stats.merge(other.stats)
+        self.sketch.merge(other.sketch)
+        self.histogram.merge(other.histogram)
+
+    def summary(self) -> dict:
+        """Count, mean, standard deviation, extremes, and quartiles.
+
+        ### Returns:
+        ----
+        dict
+            summary of the values
+        """
+
+        return {
+            'count': self.stats.count,
+            'mean': self.stats.mean,
+            'std': self.stats.std(),
+            'min': self.stats.minimum,
+            'p25': self.sketch.quantile(0.25),
+            'p50': self.sketch.quantile(0.5),
+            'p75': self.sketch.quantile(0.75),
+            'p99': self.sketch.quantile(0.99),
+            'max': self.stats.maximum,
+        }
+
+
+class TournamentStats():
+    """Arena listener aggregating per-round distributions: damage per hit,
+    turns to knockout, draw frequency, and gold inflation from the pot.
+
+    Register with Arena.add_listener(stats); statistics are kept separately
+    for each round (arena level the duel started at) and for all rounds.
+
+    ### Attributes:
+    ----
+    rounds : dict
+        statistics for each round, keyed by arena level
+    total : dict
+        statistics for all rounds
+
+    ### Methods:
+    ----
+    summary() -> dict
+        summary of every statistic for each round and for all rounds
+    """
+
+    def __init__(self):
+        self.rounds = {}
+        self.total = self._new_round()
+
+    def _new_round(self) -> dict:
+        """Empty statistics for a round."""
+
+        return {
+            'damage': Distribution(0, 200, 40),
+            'turns': Distribution(0, 24, 24),
+            'pot': RunningStats(),
+            'pot_growth': RunningStats(),
+            'duels': 0,
+            'draws': 0,
+            'dodged': 0,
+            'absorbed': 0,
+        }
+
+    def __call__(self, event: str, data: dict):
+        if data['level'] not in self.rounds:
+            self.rounds[data['level']] = self._new_round()
+
+        for stats in (self.rounds[data['level']], self.total):
+            if event == 'exchange':
+                if data['damage'] > 0:
+                    stats['damage'].add(data['damage'])
+                elif data['branch'] in ('dodged', 'absorbed'):
+                    stats[data['branch']] += 1
+
+            elif event == 'knockout':
+                stats['pot'].add(data['pot'])
+                if data['pot'] > 0:
+                    stats['pot_growth'].add(data['new_pot'] / data['pot'])
+
+            elif event == 'duel':
+                stats['duels'] += 1
+                if data['result'] == 'draw':
+                    stats['draws'] += 1
+                else:
+                    stats['turns'].add(data['turns'])
+
+    def summary(self) -> dict:
+        """Summary of every statistic for each round and for all rounds.
+
+        ### Returns:
+        ----
+        dict
+            summary keyed by arena level, with 'total' for all rounds
+        """
+
+        summaries = {}
+        for key, stats in sorted(self.rounds.items()) + [('total', self.total)]:
+            summaries[key] = {
+                'duels': stats['duels'],
+                'draw_rate': stats['draws'] / stats['duels'] if stats['duels'] else 0,
+                'damage': stats['damage'].summary(),
+                'turns_to_knockout': stats['turns'].summary(),
+                'dodged': stats['dodged'],
+                'absorbed': stats['absorbed'],
+                'pot_mean': stats['pot'].mean,
+                'pot_growth_mean': stats['pot_growth'].mean,
+            }
+
+        return summaries
@@ -0,0 +1,354 @@
+"""Generates synthetic equipment catalogs of any size for benchmarks and load
+tests.
+
+Every generated item is a variation of an item of the same type and level in
+the catalogs shipped with the game: its stats, weight, and value are scaled
+by a random factor within spread of the original, so stat ranges stay
+consistent with the Equipment formulas and the balance of the real catalogs.
+Levels above the highest shipped level reuse the highest level's items,
+doubled for each level above it. At least one item is generated for every
+level so the catalog covers required_levels like the shipped catalogs, and
+a catalog must have at least as many items as levels.
+
+Catalogs are generated a level at a time in numpy chunks, and written as
+json and as a compiled catalog (the layout of catalog.compile_catalog())
+without holding the whole catalog in memory, so catalogs of millions of
+items can be written.
+
+Run this module directly to write armours, shields, and weapons catalogs of
+COUNT items each to DIRECTORY:
+
+    python -m assessment.synthetic DIRECTORY COUNT [SEED]
+
+### Functions
+----
+reference_items(item_type : str) -> dict
+    shipped items of a type by level
+generate_catalog(item_type : str, count : int, levels : list, level_weights : list, spread : float, catalog_seed : int) -> list
+    serialized items of a synthetic catalog
+write_catalog(directory : str, item_type : str, count : int, levels : list, level_weights : list, spread : float, catalog_seed : int, compiled : bool) -> int
+    writes a synthetic catalog as json and as a compiled catalog
+write_catalogs(directory : str, count : int, catalog_seed : int, compiled : bool) -> dict
+    writes a synthetic catalog of every item type
+
+### Parameters:
+----
+chunk_size
+    most items generated at once
+"""
+
+# Import dependencies
+from assessment import numpy, os, sys, json
+from assessment.catalog import magic, version, header, record, record_dtype
+from assessment.classes import item_classes
+
+chunk_size = 100000
+
+
+def reference_items(item_type: str) -> dict:
+    """Shipped items of a type by level.
+
+    ### Parameters:
+    ----
+    item_type : str
+        can be 'weapons', 'shields', or 'armours' - type of item
+
+    ### Returns:
+    ----
+    dict
+        list of serialized items for each level of the shipped catalog
+    """
+
+    file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), item_type + '.json')
+    with open(file_path, mode='r', encoding='utf-8') as file:
+        entries = json.load(file)
+
+    references = {}
+    for entry in entries:
+        references.setdefault(int(entry['level']), []).append(entry)
+
+    return references
+
+
+def _level_counts(count: int, levels: list, level_weights: list, rng) -> list:
+    """Number of items at each level, at least one per level."""
+
+    weights = numpy.ones(len(levels)) if level_weights is None else numpy.asarray(level_weights, dtype=float)
+    counts = rng.multinomial(count - len(levels), weights / weights.sum()) + 1
+
+    return counts.tolist()
+
+
+def _check_count(count: int, levels: list):
+    """Raises a ValueError if there are too few items for one per level."""
+
+    if count < len(levels):
+        raise ValueError(f'count must be at least the number of levels ({len(levels)}).')
+
+
+def _generate_chunk(references: dict, level: int, count: int, spread: float, rng) -> dict:
+    """Stats and names of count items at a level."""
+
+    top = max(references)
+    bases = references[min(level, top)]
+    scale = 2.0 ** max(level - top, 0)
+
+    # Vary each stat of a random base item within spread
+    base = rng.integers(0, len(bases), count)
+    min_stat = numpy.array([entry['min_stat'] for entry in bases])[base] * scale
+    max_stat = numpy.array([entry['max_stat'] for entry in bases])[base] * scale
+    weight = numpy.array([entry['weight'] for entry in bases], dtype=float)[base]
+    value = numpy.array([entry['value'] for entry in bases], dtype=float)[base] * scale
+    factor = 1 + spread * (2 * rng.random(count) - 1)
+    bulk = 1 + spread * (2 * rng.random(count) - 1)
+
+    # Stats keep 0 <= min_stat <= max_stat and value follows the stats
+    min_stat = numpy.round(min_stat * factor, 2)
+    max_stat = numpy.maximum(numpy.round(max_stat * factor, 2), min_stat)
+    weight = numpy.maximum(numpy.round(weight * bulk, 2), 0.01)
+    value = numpy.maximum(numpy.round(value * factor), 0).astype(numpy.int64)
+    names = [bases[num]['name'] for num in base.tolist()]
+
+    return {
+        'names': names,
+        'min_stat': min_stat,
+        'max_stat': max_stat,
+        'weight': weight,
+        'value': value,
+    }
+
+
+def _chunks(item_type: str, count: int, levels: list, level_weights: list, spread: float, catalog_seed: int):
+    """Chunks of generated items sorted by level, as (level, chunk)."""
+
+    rng = numpy.random.default_rng(catalog_seed)
+    references = reference_items(item_type)
+    serial = 0
+    for level, level_count in zip(levels, _level_counts(count, levels, level_weights, rng)):
+        for start in range(0, level_count, chunk_size):
+            chunk = _generate_chunk(references, level, min(chunk_size, level_count - start), spread, rng)
+
+            # Numbered names keep every item unique
+            chunk['names'] = [f'{name} #{serial + num}' for num, name in enumerate(chunk['names'])]
+            serial += len(chunk['names'])
+            yield level, chunk
+
+
+def _entries(level: int, chunk: dict) -> list:
+    """Serialized items of a chunk."""
+
+    return [
+        {'name': name, 'min_stat': min_stat, 'max_stat': max_stat, 'weight': weight, 'value': value, 'level': level}
+        for name, min_stat, max_stat, weight, value in zip(
+            chunk['names'], chunk['min_stat'].tolist(), chunk['max_stat'].tolist(),
+            chunk['weight'].tolist(), chunk['value'].tolist()
+        )
+    ]
+
+
+def generate_catalog(item_type: str, count: int, levels: list = range(0, 8), level_weights: list = None,
+                     spread: float = 0.25, catalog_seed: int = None) -> list:
+    """Serialized items of a synthetic catalog, sorted by level.
+
+    ### Parameters:
+    ----
+    item_type : str
+        can be 'weapons', 'shields', or 'armours' - type of item
+    count : int
+        number of items
+    levels : list
+        levels items are generated at
+    level_weights : list
+        relative number of items at each level, the same for every level if
+        None
+    spread : float
+        most an item's stats differ from the shipped item it is based on, as
+        a fraction
+    catalog_seed : int
+        seed for the random number generator
+
+    ### Returns:
+    ----
+    list
+        serialized items, as in the json catalogs
+
+    ### Raises:
+    ----
+    ValueError
+        if count is less than the number of levels
+    """
+
+    _check_count(count, levels)
+    entries = []
+    for level, chunk in _chunks(item_type, count, list(levels), level_weights, spread, catalog_seed):
+        entries += _entries(level, chunk)
+
+    return entries
+
+
+def _write_chunks(chunks, count: int, json_file, bin_file=None) -> int:
+    """Writes chunks of a synthetic catalog to an open json file and, if
+    given, an open compiled catalog file, returning the number of items
+    written."""
+
+    records_at = header.size
+    names_at = header.size + count * record.size
+    names_size = 0
+    written = 0
+
+    json_file.write('[')
+    for level, chunk in chunks:
+        lines = [json.dumps(entry) for entry in _entries(level, chunk)]
+        json_file.write(('\n    ' if written == 0 else ',\n    ') + ',\n    '.join(lines))
+
+        if bin_file is not None:
+            names = [name.encode('utf-8') for name in chunk['names']]
+            lengths = numpy.array([len(name) for name in names], dtype=numpy.int64)
+            records = numpy.zeros(len(names), dtype=record_dtype)
+            records['level'] = level
+            records['min_stat'] = chunk['min_stat']
+            records['max_stat'] = chunk['max_stat']
+            records['weight'] = chunk['weight']
+            records['value'] = chunk['value']
+            records['drop_weight'] = 1.0
+            records['offset'] = names_size + numpy.cumsum(lengths) - lengths
+            records['length'] = lengths
+
+            # Records and names go to their own sections of the file
+            bin_file.seek(records_at)
+            bin_file.write(records.tobytes())
+            bin_file.seek(names_at + names_size)
+            bin_file.write(b''.join(names))
+            records_at += records.nbytes
+            names_size += int(lengths.sum())
+
+        written += len(chunk['names'])
+    json_file.write('\n]\n')
+
+    # The json file is flushed before the header so the compiled catalog is
+    # the newer file
+    json_file.flush()
+    if bin_file is not None:
+        bin_file.seek(0)
+        bin_file.write(header.pack(magic, version, written))
+
+    return written
+
+
+def write_catalog(directory: str, item_type: str, count: int, levels: list = range(0, 8),
+                  level_weights: list = None, spread: float = 0.25, catalog_seed: int = None,
+                  compiled: bool = True) -> int:
+    """Writes a synthetic catalog as json and as a compiled catalog, a chunk
+    at a time. The compiled catalog is written last so it is newer than the
+    json file and is used by the game.
+
+    ### Parameters:
+    ----
+    directory : str
+        directory the catalog is written to, as <item_type>.json and
+        <item_type>.bin
+    item_type : str
+        can be 'weapons', 'shields', or 'armours' - type of item
+    count : int
+        number of items
+    levels : list
+        levels items are generated at
+    level_weights : list
+        relative number of items at each level, the same for every level if
+        None
+    spread : float
+        most an item's stats differ from the shipped item it is based on, as
+        a fraction
+    catalog_seed : int
+        seed for the random number generator
+    compiled : bool
+        whether the compiled catalog is written
+
+    ### Returns:
+    ----
+    int
+        number of items written
+
+    ### Raises:
+    ----
+    ValueError
+        if item_type is not an item type, or count is less than the number
+        of levels
+    """
+
+    if item_type not in item_classes:
+        raise ValueError(f'{item_type} is not an item type.')
+    _check_count(count, levels)
+
+    os.makedirs(directory, exist_ok=True)
+    json_path = os.path.join(directory, item_type + '.json')
+    bin_path = os.path.join(directory, item_type + '.bin')
+
+    # Write to temporary files first so readers never see a partial catalog,
+    # removing them if anything goes wrong
+    temp_paths = [json_path + '.tmp', bin_path + '.tmp']
+    chunks = _chunks(item_type, count, list(levels), level_weights, spread, catalog_seed)
+    try:
+        with open(temp_paths[0], mode='w', encoding='utf-8') as json_file:
+            if compiled:
+                with open(temp_paths[1], mode='wb') as bin_file:
+                    written = _write_chunks(chunks, count, json_file, bin_file)
+            else:
+                written = _write_chunks(chunks, count, json_file)
+    except BaseException:
+        for path in temp_paths:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+
+    os.replace(temp_paths[0], json_path)
+    if compiled:
+        os.replace(temp_paths[1], bin_path)
+
+    return written
+
+
+def write_catalogs(directory: str, count: int, catalog_seed: int = None, compiled: bool = True) -> dict:
+    """Writes a synthetic catalog of every item type, which the game reads
+    after classes.use_catalogs(directory).
+
+    ### Parameters:
+    ----
+    directory : str
+        directory the catalogs are written to
+    count : int
+        number of items in each catalog, at least one for each of the 8
+        levels
+    catalog_seed : int
+        seed for the random number generator
+    compiled : bool
+        whether the compiled catalogs are written
+
+    ### Returns:
+    ----
+    dict
+        number of items written for each item type
+
+    ### Raises:
+    ----
+    ValueError
+        if count is less than the number of levels
+    """
+
+    written = {}
+    for num, item_type in enumerate(item_classes):
+        item_seed = None if catalog_seed is None else catalog_seed + num
+        written[item_type] = write_catalog(directory, item_type, count, catalog_seed=item_seed, compiled=compiled)
+
+    return written
+
+
+# Write synthetic catalogs if run directly
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        print('Usage: python -m assessment.synthetic DIRECTORY COUNT [SEED]')
+        sys.exit(1)
+
+    catalog_seed = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    for item_type, written in write_catalogs(sys.argv[1], int(sys.argv[2]), catalog_seed).items():
+        print(f'Wrote {written} {item_type} to {sys.argv[1]}')
@@ -0,0 +1,123 @@
+"""Per-item performance telemetry for tournaments.
+
+Every item built from a catalog refers back to its template, which holds the
+ItemCounters of the catalog entry. An ItemTelemetry listener updates those
+counters from the combat events of an Arena, so each hit only increments a
+few attributes and nothing is stored per item copy or per hit. The counters
+can be queried after a batch of fights with item_telemetry().
+
+### Classes
+----
+ItemTelemetry()
+    arena listener updating the counters of every equipped item
+
+### Functions
+----
+item_telemetry(item_types : list) -> list
+    counters and derived rates of every catalog entry built into a template
+reset_telemetry(item_types : list)
+    sets the counters of every catalog entry built into a template back to 0
+"""
+
+# Import dependencies
+from assessment.catalog import ItemCounters
+from assessment.classes import loot_table, item_classes
+
+
+class ItemTelemetry():
+    """Arena listener updating the counters of every equipped item built from
+    a catalog. Register with Arena.add_listener(ItemTelemetry()).
+
+    Damage dealt is credited to every item of the attacker and damage blocked
+    to every item of the defender, while crits and failures are counted from
+    each item's own roll.
+    """
+
+    def __call__(self, event: str, data: dict):
+        if event == 'exchange':
+            # Damage stopped by the defender
+            if data['branch'] in ('dodged', 'absorbed'):
+                blocked = data['attack']
+            elif data['branch'] == 'blocked':
+                blocked = data['defence']
+            else:
+                blocked = 0
+
+            for item in data['attacker'].equipped.values():
+                if item is not None and item.template is not None:
+                    counters = item.template.counters
+                    counters.attacks += 1
+                    counters.damage_dealt += data['damage']
+                    self._count_roll(item, counters)
+
+            for item in data['defender'].equipped.values():
+                if item is not None and item.template is not None:
+                    counters = item.template.counters
+                    counters.defences += 1
+                    counters.damage_blocked += blocked
+                    self._count_roll(item, counters)
+
+        elif event == 'knockout':
+            for item in data['winner'].equipped.values():
+                if item is not None and item.template is not None:
+                    item.template.counters.knockouts += 1
+            for item in data['loser'].equipped.values():
+                if item is not None and item.template is not None:
+                    item.template.counters.knocked_out += 1
+
+    def _count_roll(self, item, counters: ItemCounters):
+        """Counts a critical hit or failure from the item's last roll."""
+
+        outcome = item.outcome(item.roll)
+        if outcome == 'critical':
+            counters.crits += 1
+        elif outcome == 'failure':
+            counters.failures += 1
+
+
+def item_telemetry(item_types: list = None) -> list:
+    """Counters and derived rates of every catalog entry built into a
+    template. Entries which have never been drawn or listed have no
+    template, and so no counters to report.
+
+    ### Parameters:
+    ----
+    item_types : list
+        item types to include, every item type if None
+
+    ### Returns:
+    ----
+    list
+        dictionaries with item_type, name, level, every counter, and the
+        average damage dealt, damage blocked, and crit rate, ordered by
+        knockouts won
+    """
+
+    rows = []
+    for item_type in item_types or list(item_classes):
+        for template in loot_table(item_type).templates.values():
+            counters = template.counters
+            rolls = counters.attacks + counters.defences
+            row = {'item_type': item_type, 'name': template.item.name, 'level': template.level}
+            row.update(vars(counters))
+            row['average_dealt'] = counters.damage_dealt / counters.attacks if counters.attacks else 0
+            row['average_blocked'] = counters.damage_blocked / counters.defences if counters.defences else 0
+            row['crit_rate'] = counters.crits / rolls if rolls else 0
+            rows.append(row)
+
+    rows.sort(key=lambda row: row['knockouts'], reverse=True)
+    return rows
+
+def reset_telemetry(item_types: list = None):
+    """Sets the counters of every catalog entry built into a template back
+    to 0.
+
+    ### Parameters:
+    ----
+    item_types : list
+        item types to reset, every item type if None
+    """
+
+    for item_type in item_types or list(item_classes):
+        for template in loot_table(item_type).templates.values():
+            template.counters = ItemCounters()
@@ -0,0 +1,485 @@
+"""Combat trace recorder with a fixed-size binary record per attack, and a
+replayer which rebuilds the combat display from a trace.
+
+A TraceRecorder listens to an Arena and stores every attack as one record
+of record_dtype (67 bytes) in a numpy ring buffer, holding the state of both
+knights before the attack, followed by a knockout record holding their state
+after a knockout. Knockout records are built from the knockout event alone,
+so fights resolved without any attack (see Arena.predict() and rounds.py)
+are recorded as a single knockout record, whose attacker is the winner. Each
+duel ends with a duel record whose attacker and defender are the player and
+the opponent of the duel, holding their state after it. Turns and gold beyond the range of
+their fields are stored as the largest value the field holds. Without a
+file, the oldest records are overwritten once the buffer is full, so the
+oldest duel left in the buffer may be incomplete. With a file, the buffer is
+appended to the file each time it fills, so any number of attacks can be
+kept. A trace file holds a header
+followed by the records, and the name of every knight is kept in a json file
+alongside it.
+
+A TraceReplayer reads a trace as a numpy array in a single call, finds each
+duel by searching the sorted duel numbers, and rebuilds the state shown in
+every frame of display_combat() from the records alone, as numpy array
+operations over the duel's records and without rolling any random numbers.
+Frames are only formatted into lines when they are asked for or drawn.
+
+### Classes
+----
+TraceRecorder(capacity : int, path : str)
+    arena listener storing every attack as a binary record
+TraceReplayer(records : numpy.ndarray, knights : list)
+    rebuilds combat displays from recorded attacks
+
+### Parameters:
+----
+magic
+    bytes identifying a trace file
+version
+    version of the trace file layout
+header
+    struct for the header of a trace file
+record_dtype
+    numpy layout of each record
+branches
+    branch of an attack stored in each record by code, 'knockout' for a
+    knockout record, or 'duel' for the record ending a duel
+frame_dtype
+    numpy layout of the state shown in each replayed frame
+start
+    branch code of the first frame of a duel, before any attack
+turn_limit
+    largest turn a record holds
+gold_limit
+    largest gold a record holds
+"""
+
+# Import dependencies
+from assessment import numpy, struct, json, os, sleep
+from assessment.render import renderer, combat_frame, combat_message, draw_message
+
+magic = b'KTRC'
+version = 2
+header = struct.Struct('<4sHH')
+record_dtype = numpy.dtype([
+    ('duel', '<u4'),
+    ('turn', '<u2'),
+    ('branch', 'u1'),
+    ('attacker', '<u4'),
+    ('defender', '<u4'),
+    ('attack_speed', '<i4'),
+    ('defend_speed', '<i4'),
+    ('attack', '<i4'),
+    ('defence', '<i4'),
+    ('damage', '<i4'),
+    ('attacker_health', '<f4'),
+    ('defender_health', '<f4'),
+    ('attacker_max', '<f4'),
+    ('defender_max', '<f4'),
+    ('attacker_gold', '<i8'),
+    ('defender_gold', '<i8'),
+])
+branches = ['unblocked', 'dodged', 'blocked', 'absorbed', 'knockout', 'duel']
+frame_dtype = numpy.dtype([
+    ('branch', 'u1'),
+    ('attacker', '<u4'),
+    ('defender', '<u4'),
+    ('damage', '<i4'),
+    ('player_health', '<i8'),
+    ('player_max', '<i8'),
+    ('player_gold', '<i8'),
+    ('opponent_health', '<i8'),
+    ('opponent_max', '<i8'),
+    ('opponent_gold', '<i8'),
+])
+start = len(branches)
+turn_limit = int(numpy.iinfo(numpy.uint16).max)
+gold_limit = int(numpy.iinfo(numpy.int64).max)
+
+
+class TraceRecorder():
+    """Arena listener storing every attack as a binary record. Register with
+    Arena.add_listener(recorder).
+
+    ### Attributes:
+    ----
+    capacity : int
+        number of records held in the ring buffer
+    path : str
+        file the records are appended to, None to keep only the latest
+        capacity records in memory
+    knights : list
+        name of each knight, indexed by the knight ids used in the records
+    written : int
+        number of records written since the recorder was created
+
+    ### Methods:
+    ----
+    records() -> numpy.ndarray
+        records held in memory, oldest first
+    backlog() -> int
+        records waiting to be appended to the file
+    flush()
+        appends the records held in memory to the file
+    close()
+        flushes the records and writes the knights file
+    """
+
+    def __init__(self, capacity: int = 65536, path: str = None):
+        self.capacity = capacity
+        self.path = path
+        self.knights = []
+        self.written = 0
+        self._buffer = numpy.zeros(capacity, dtype=record_dtype)
+        self._ids = {}
+        self._duel = 0
+        self._turn = 0
+        self._flushed = 0
+        self._branches = {branch: code for code, branch in enumerate(branches)}
+
+        # Start the file with its header
+        if path is not None:
+            with open(path, mode='wb') as file:
+                file.write(header.pack(magic, version, record_dtype.itemsize))
+
+    def _knight(self, knight) -> int:
+        """Id of a knight, registering it the first time it is seen."""
+
+        if knight not in self._ids:
+            self._ids[knight] = len(self.knights)
+            self.knights.append(knight.name)
+
+        return self._ids[knight]
+
+    def _write(self, branch: str, attacker, defender, health: float, attack: tuple):
+        """Writes a record to the ring buffer, flushing it to the file first
+        if it is full."""
+
+        if self.path is not None and self.written - self._flushed == self.capacity:
+            self.flush()
+
+        # Gold can outgrow int64 (see rounds.py) and turns can outgrow uint16
+        # if duel events are missed, so both are kept within their fields
+        self._buffer[self.written % self.capacity] = (
+            self._duel, min(self._turn, turn_limit), self._branches[branch],
+            self._knight(attacker), self._knight(defender), *attack,
+            attacker.base_health, health, attacker.max_health, defender.max_health,
+            min(attacker.gold, gold_limit), min(defender.gold, gold_limit)
+        )
+        self.written += 1
+
+    def __call__(self, event: str, data: dict):
+        if event == 'exchange':
+            self._turn += 1
+            self._write(data['branch'], data['attacker'], data['defender'], data['health'], (
+                data['attack_speed'], data['defend_speed'], data['attack'], data['defence'], data['damage']
+            ))
+
+        # Knockouts change health, max health, and gold after the attack
+        elif event == 'knockout':
+            self._write('knockout', data['winner'], data['loser'], data['loser'].base_health, (0, 0, 0, 0, 0))
+
+        # The player and the opponent are kept, as the first record of a duel
+        # may be a knockout won by the opponent
+        elif event == 'duel':
+            self._write('duel', data['player'], data['opponent'], data['opponent'].base_health, (0, 0, 0, 0, 0))
+            self._duel += 1
+            self._turn = 0
+
+    def records(self) -> numpy.ndarray:
+        """Records held in memory, oldest first.
+
+        ### Returns:
+        ----
+        numpy.ndarray
+            copy of the records of record_dtype not yet flushed to the file,
+            or the latest capacity records if there is no file
+        """
+
+        start = max(self._flushed, self.written - self.capacity)
+        indexes = numpy.arange(start, self.written) % self.capacity
+
+        return self._buffer[indexes]
+
+    def backlog(self) -> int:
+        """Records waiting to be appended to the file.
+
+        ### Returns:
+        ----
+        int
+            records held in memory since the last flush, 0 without a file
+        """
+
+        if self.path is None:
+            return 0
+
+        return self.written - self._flushed
+
+    def flush(self):
+        """Appends the records held in memory to the file."""
+
+        if self.path is None:
+            return
+
+        with open(self.path, mode='ab') as file:
+            file.write(self.records().tobytes())
+        self._flushed = self.written
+
+    def close(self):
+        """Flushes the records and writes the knights file."""
+
+        self.flush()
+        if self.path is not None:
+            with open(self.path + '.json', mode='w', encoding='utf-8') as file:
+                json.dump(self.knights, file)
+
+
+class TraceReplayer():
+    """Rebuilds combat displays from recorded attacks, without rolling any
+    random numbers.
+
+    ### Attributes:
+    ----
+    records : numpy.ndarray
+        recorded attacks of record_dtype, ordered by duel
+    knights : list
+        name of each knight, indexed by knight id
+
+    ### Methods:
+    ----
+    from_file(path: str) -> TraceReplayer
+        reads a trace file and its knights file
+    from_recorder(recorder: TraceRecorder) -> TraceReplayer
+        replays the records held in memory by a recorder
+    duels() -> numpy.ndarray
+        numbers of the duels in the trace
+    attacks(duel: int) -> numpy.ndarray
+        records of a duel
+    timeline(duel: int) -> numpy.ndarray
+        state shown in every frame displayed during a duel
+    frames(duel: int) -> list
+        lines of every frame displayed during a duel
+    play(duel: int, delay: float)
+        draws the frames of a duel with the game's renderer
+    """
+
+    def __init__(self, records: numpy.ndarray, knights: list):
+        self.records = records
+        self.knights = knights
+
+    @classmethod
+    def from_file(cls, path: str):
+        """Reads a trace file and its knights file.
+
+        ### Parameters:
+        ----
+        path : str
+            location of the trace file
+
+        ### Returns:
+        ----
+        TraceReplayer
+            replayer of every record in the file
+
+        ### Raises:
+        ----
+        ValueError
+            if the file is not a trace or uses another layout
+        """
+
+        with open(path, mode='rb') as file:
+            file_magic, file_version, size = header.unpack(file.read(header.size))
+        if file_magic != magic or file_version != version or size != record_dtype.itemsize:
+            raise ValueError(f'{path} is not a version {version} trace file.')
+
+        records = numpy.fromfile(path, dtype=record_dtype, offset=header.size)
+        knights = []
+        if os.path.exists(path + '.json'):
+            with open(path + '.json', mode='r', encoding='utf-8') as file:
+                knights = json.load(file)
+
+        return cls(records, knights)
+
+    @classmethod
+    def from_recorder(cls, recorder: TraceRecorder):
+        """Replays the records held in memory by a recorder.
+
+        ### Parameters:
+        ----
+        recorder : TraceRecorder
+            recorder to be replayed
+
+        ### Returns:
+        ----
+        TraceReplayer
+            replayer of the recorder's records
+        """
+
+        return cls(recorder.records(), list(recorder.knights))
+
+    def duels(self) -> numpy.ndarray:
+        """Numbers of the duels in the trace.
+
+        ### Returns:
+        ----
+        numpy.ndarray
+            duel numbers in order
+        """
+
+        return numpy.unique(self.records['duel'])
+
+    def attacks(self, duel: int) -> numpy.ndarray:
+        """Records of a duel.
+
+        ### Parameters:
+        ----
+        duel : int
+            number of the duel
+
+        ### Returns:
+        ----
+        numpy.ndarray
+            records of the duel in order, empty if it is not in the trace
+        """
+
+        duels = self.records['duel']
+        start, end = numpy.searchsorted(duels, [duel, duel + 1])
+
+        return self.records[start:end]
+
+    def _name(self, knight_id: int) -> str:
+        """Name of a knight, with a placeholder if unknown."""
+
+        if knight_id < len(self.knights):
+            return self.knights[knight_id]
+
+        return f'Knight {knight_id}'
+
+    def timeline(self, duel: int) -> numpy.ndarray:
+        """State shown in every frame displayed during a duel, computed with
+        numpy over the duel's records.
+
+        ### Parameters:
+        ----
+        duel : int
+            number of the duel
+
+        ### Returns:
+        ----
+        numpy.ndarray
+            one row of frame_dtype per frame, starting with the frame before
+            any attack (branch start) whose attacker and defender are the
+            player and the opponent
+        """
+
+        records = self.attacks(duel)
+        if len(records) == 0:
+            return numpy.zeros(0, dtype=frame_dtype)
+
+        # A knockout record's attacker is the winner, so knights are labelled
+        # from the duel record, or from the first attack, made by the player,
+        # while the duel is still being fought
+        ended = records['branch'] == branches.index('duel')
+        labels = records[ended][0] if ended.any() else records[0]
+        player_id, opponent_id = int(labels['attacker']), int(labels['defender'])
+        records = records[~ended]
+
+        # Health after each attack, as Knight.take_damage()
+        hit = (records['branch'] == branches.index('unblocked')) | (records['branch'] == branches.index('blocked'))
+        attacker = (records['attacker_health'], records['attacker_max'], records['attacker_gold'])
+        defender_health = records['defender_health'].astype(float) - numpy.where(hit, records['damage'], 0)
+        defender = (defender_health, records['defender_max'], records['defender_gold'])
+
+        # The start frame shows the state before the first attack, or after
+        # the duel if no attack was recorded
+        is_player = records['attacker'] == player_id
+        first = records[0] if len(records) > 0 else labels
+        if first['attacker'] == player_id:
+            player, opponent = 'attacker_', 'defender_'
+        else:
+            player, opponent = 'defender_', 'attacker_'
+        timeline = numpy.zeros(len(records) + 1, dtype=frame_dtype)
+        timeline[0] = (
+            start, player_id, opponent_id, 0, first[player + 'health'], first[player + 'max'],
+            first[player + 'gold'], first[opponent + 'health'], first[opponent + 'max'], first[opponent + 'gold']
+        )
+        frames = timeline[1:]
+        for field in ['branch', 'attacker', 'defender', 'damage']:
+            frames[field] = records[field]
+        for num, column in enumerate(['health', 'max', 'gold']):
+            frames['player_' + column] = numpy.where(is_player, attacker[num], defender[num])
+            frames['opponent_' + column] = numpy.where(is_player, defender[num], attacker[num])
+
+        # A knockout replaces the frame of the attack which caused it, and
+        # the start frame is always kept so it names the player and opponent
+        keep = numpy.ones(len(timeline), dtype=bool)
+        keep[:-1][records['branch'] == branches.index('knockout')] = False
+        keep[0] = True
+
+        return timeline[keep]
+
+    def _frame(self, row: tuple, player: str, opponent: str) -> list:
+        """Lines of a frame from a row of a timeline."""
+
+        branch, attacker, defender, damage = row[0:4]
+        if branch == start:
+            message = 'Start!'
+        else:
+            message = combat_message(branches[branch], self._name(attacker), self._name(defender), damage)
+
+        return combat_frame(_State(player, *row[4:7]), _State(opponent, *row[7:10]), message)
+
+    def frames(self, duel: int) -> list:
+        """Lines of every frame displayed during a duel, starting with the
+        'Start!' frame.
+
+        ### Parameters:
+        ----
+        duel : int
+            number of the duel
+
+        ### Returns:
+        ----
+        list
+            lines of each frame, as combat_frame()
+        """
+
+        rows = self.timeline(duel).tolist()
+        if not rows:
+            return []
+
+        player, opponent = self._name(rows[0][1]), self._name(rows[0][2])
+        return [self._frame(row, player, opponent) for row in rows]
+
+    def play(self, duel: int, delay: float = 0):
+        """Draws the frames of a duel with the game's renderer, formatting
+        each frame as it is drawn.
+
+        ### Parameters:
+        ----
+        duel : int
+            number of the duel
+        delay : float
+            seconds each frame stays on screen
+        """
+
+        rows = self.timeline(duel).tolist()
+        if not rows:
+            return
+
+        player, opponent = self._name(rows[0][1]), self._name(rows[0][2])
+        for row in rows:
+            renderer.draw(self._frame(row, player, opponent))
+            sleep(delay)
+
+        if rows[-1][0] != branches.index('knockout'):
+            renderer.write(draw_message)
+
+
+class _State():
+    """Knight attributes shown in a replayed combat frame."""
+
+    def __init__(self, name: str, health: int, max_health: int, gold: int):
+        self.name = name
+        self.base_health = health
+        self.max_health = max_health
+        self.gold = gold
@@ -0,0 +1,95 @@
+"""Functions used to estimate how much each training option improves a
+knight's chances in the arena, using the batched duel engine.
+
+### Functions
+----
+apply_training(knight : Knight, index : int)
+    applies a training option to a knight
+evaluate_training(knight : Knight, opponents : list, duels : int, seed : int) -> list
+    win probability against the opponents after each training option
+
+### Parameters:
+----
+training_options
+    name of each training option offered by the training menu and the stat
+    increases it provides
+"""
+
+# Import dependencies
+from assessment import numpy
+from assessment.engine import encode_knights, repeat, concat, run_duels
+
+training_options = [
+    ('Max Health', {'base_health': 10, 'max_health': 10}),
+    ('Base Speed', {'base_speed': 2}),
+    ('Base Damage', {'base_damage': 5}),
+    ('Base Defence', {'base_defence': 5}),
+]
+
+# Knight attribute changed by training for each encoded stat
+_encoded_stats = {
+    'base_health': 'health',
+    'max_health': 'max_health',
+    'base_speed': 'base_speed',
+    'base_damage': 'damage',
+    'base_defence': 'defence',
+}
+
+
+def apply_training(knight, index: int):
+    """Applies a training option to a knight.
+
+    ### Parameters:
+    ----
+    knight : Knight
+        knight to be trained
+    index : int
+        index of the option in training_options
+    """
+
+    for stat, increase in training_options[index][1].items():
+        setattr(knight, stat, getattr(knight, stat) + increase)
+
+
+def evaluate_training(knight, opponents: list, duels: int = 200, seed: int = None) -> list:
+    """Win probability against the opponents after each training option.
+
+    All options are resolved in a single batch of duels so the estimate is
+    quick enough to display in the training menu.
+
+    ### Parameters:
+    ----
+    knight : Knight
+        knight to be trained
+    opponents : list
+        knights likely to be fought
+    duels : int
+        number of duels simulated against each opponent for each option
+    seed : int
+        seed for the random number generator
+
+    ### Returns:
+    ----
+    list
+        win probability without training followed by the win probability
+        after each option in training_options
+    """
+
+    # Encode the knight once per option (untrained first) and apply training
+    base = encode_knights([knight])
+    options = [base]
+    for _, increases in training_options:
+        trained = {key: value.copy() for key, value in base.items()}
+        for stat, increase in increases.items():
+            trained[_encoded_stats[stat]] += increase
+        options.append(trained)
+
+    # Pair every option with every opponent, duels times each
+    per_option = len(opponents) * duels
+    player = repeat(concat(options), per_option)
+    opponent = concat([repeat(encode_knights(opponents), duels)] * len(options))
+
+    outcome, _ = run_duels(player, opponent, numpy.random.default_rng(seed))
+    wins = (outcome == 1).reshape(len(options), per_option)
+
+    return wins.mean(axis=1).tolist()